@@ -103,7 +103,7 @@ class BacktestEngine:
 
 if __name__ == "__main__":
     from data.data_storage import load_historical_data
-    df = load_historical_data('BTC_USD_1h.csv')
+    df = load_historical_data('BTC_USD_1h.csv', require_continuous=True)
     if not df.empty:
         engine = BacktestEngine()
         engine.run(df)
@@ -17,6 +17,25 @@ TRADE_HISTORY_PAPER = 'data/paper_trade_history.csv'
 PORTFOLIO_HISTORY_LIVE = 'data/portfolio_history.csv'
 PORTFOLIO_HISTORY_PAPER = 'data/paper_portfolio_history.csv'
 
+# Indexed SQLite (WAL) history used by the dashboard; the CSVs above are migrated into it
+TRADE_DB_LIVE = 'data/trade_history.db'
+TRADE_DB_PAPER = 'data/paper_trade_history.db'
+
+# Trade recorder write-behind: flush (+fsync) every N seconds or N queued rows
+RECORDER_FLUSH_INTERVAL = 5.0
+RECORDER_FLUSH_BATCH = 50
+
+# L2 order book / ticker snapshots captured on every signal, for replay and slippage tuning
+BOOK_RECORDER_ENABLED = True
+BOOK_DATA_DIR = 'data_storage/order_books'
+BOOK_RECORDER_DEPTH = 25              # Levels kept per side (float32, NaN padded)
+BOOK_RECORDER_ROTATE_ROWS = 500       # Snapshots per compressed segment
+BOOK_RECORDER_ROTATE_SECONDS = 3600   # Or at least one segment per hour
+
+# ML model hot reload: poll models/ for newer files of the served model, validate, swap in
+MODEL_WATCH_ENABLED = True
+MODEL_WATCH_SETTLE_SECONDS = 5.0      # Files must be unchanged this long (the .zip is not written atomically)
+
 # Settings
 DEFAULT_PAPER_CAPITAL = 10000.0
 DEFAULT_WATCHLIST_PAPER = ['BTC/USD', 'ETH/USD', 'SOL/USD', 'LUNC/USD']
@@ -24,6 +43,16 @@ TOP_10_CRYPTO = ["BTC/USD", "ETH/USD", "SOL/USD", "BNB/USD", "XRP/USD", "ADA/USD
 DEFAULT_SYMBOL = 'BTC/USD'
 DEFAULT_TIMEFRAME = '1m'
 
+# Startup warm-up: every pair's strategy is primed on this many stored + fetched candles
+WARMUP_CANDLES = 500          # IndicatorCache holds 500; NewtonAgent needs 200, MLStrategy 50
+WARMUP_MAX_GAP = 5            # Longest gap (candles) bridged; Kraken omits minutes without trades
+
+# Council state snapshots: per-pair strategy state restored at startup instead of re-primed
+COUNCIL_STATE_ENABLED = True
+COUNCIL_STATE_DIR = 'data/council_state'
+COUNCIL_STATE_INTERVAL = 300  # Seconds between snapshots (also written at shutdown)
+COUNCIL_STATE_MAX_DRIFT = 0.02  # Median close deviation from fetched candles above which a snapshot is discarded
+
 # Intervals
 MAIN_LOOP_DELAY = 60
 PORTFOLIO_LOG_INTERVAL = 1800  # 30 minutes
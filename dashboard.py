@@ -252,6 +252,7 @@ try:
         STATUS_FILE_LIVE, STATUS_FILE_PAPER,
         TRADE_HISTORY_LIVE, TRADE_HISTORY_PAPER,
         PORTFOLIO_HISTORY_LIVE, PORTFOLIO_HISTORY_PAPER,
+        TRADE_DB_LIVE, TRADE_DB_PAPER,
         HEARTBEAT_TIMEOUT, DATA_DIR, 
         SETTINGS_FILE, TOP_10_CRYPTO, COMMANDS_FILE,
         MAX_DRAWDOWN_PCT, MAX_POSITION_SIZE_PCT, MAX_SLIPPAGE_PCT, STOP_LOSS_PCT, TAKE_PROFIT_PCT
@@ -264,19 +265,48 @@ try:
     STATUS_FILE = None
     TRADE_FILE = None
     PORTFOLIO_FILE = None
+    TRADE_DB = None
 
     if view_mode == "Paper":
         STATUS_FILE = STATUS_FILE_PAPER
         TRADE_FILE = TRADE_HISTORY_PAPER
         PORTFOLIO_FILE = PORTFOLIO_HISTORY_PAPER
+        TRADE_DB = TRADE_DB_PAPER
     elif view_mode == "Live":
         STATUS_FILE = STATUS_FILE_LIVE
         TRADE_FILE = TRADE_HISTORY_LIVE
         PORTFOLIO_FILE = PORTFOLIO_HISTORY_LIVE
+        TRADE_DB = TRADE_DB_LIVE
     else:
         STATUS_FILE = STATUS_FILE_PAPER 
         TRADE_FILE = TRADE_HISTORY_PAPER
         PORTFOLIO_FILE = PORTFOLIO_HISTORY_PAPER
+        TRADE_DB = TRADE_DB_PAPER
+
+    @st.cache_resource
+    def get_trade_store(db_path):
+        """Shared read connection to the bot's SQLite history (None until the bot creates it)."""
+        from data.trade_store import TradeStore
+        return TradeStore(db_path)
+
+    def open_trade_store(db_path):
+        if db_path and os.path.exists(db_path):
+            try: return get_trade_store(db_path)
+            except Exception: return None
+        return None
+
+    def load_portfolio_history(db_path, csv_path, max_points=2000):
+        store = open_trade_store(db_path)
+        if store:
+            return store.get_portfolio_history(max_points=max_points)
+        if os.path.exists(csv_path): return pd.read_csv(csv_path)
+        return pd.DataFrame()
+
+    def latest_equity(db_path, history):
+        """Newest portfolio value (not the last point of a downsampled chart series)."""
+        store = open_trade_store(db_path)
+        value = store.get_latest_portfolio_value() if store else None
+        return value if value is not None else history['TotalValueUSD'].iloc[-1]
 
     status_data = {}
     if STATUS_FILE:
@@ -506,6 +536,45 @@ try:
         st.sidebar.error("PANIC SIGNAL SENT!")
         st.toast("Panic command sent!", icon="🚨")
 
+    # --- ACTIVE MODEL SELECTOR (hot swap, STRATEGY_TYPE=ML) ---
+    st.sidebar.markdown("### 🧠 Active Model Selector")
+    inference_status = status_data.get('inference') or {}
+    st.sidebar.caption(f"Serving: `{inference_status.get('model') or 'none'}`")
+    models_dir = os.path.join(os.getcwd(), "models")
+    served_models = sorted(f[:-4] for f in os.listdir(models_dir) if f.endswith(".zip")) if os.path.exists(models_dir) else []
+    if served_models:
+        current_model = inference_status.get('model')
+        active_model = st.sidebar.selectbox("Model", served_models,
+                                            index=served_models.index(current_model) if current_model in served_models else 0,
+                                            key="side_active_model")
+        if st.sidebar.button("🔁 Activate Model", key="side_set_model"):
+            cmd = {
+                "id": str(uuid.uuid4()),
+                "action": "SET_MODEL",
+                "model": active_model,
+                "timestamp": time.time()
+            }
+            current_cmds = safe_read_json(COMMANDS_FILE, default=[])
+            current_cmds.append(cmd)
+            with open(COMMANDS_FILE, 'w') as f:
+                json.dump(current_cmds, f)
+            st.toast(f"Command Queued: SET_MODEL {active_model}", icon="🧠")
+        if st.sidebar.button("♻️ Reload From Disk", key="side_reload_model"):
+            cmd = {
+                "id": str(uuid.uuid4()),
+                "action": "RELOAD_MODEL",
+                "timestamp": time.time()
+            }
+            current_cmds = safe_read_json(COMMANDS_FILE, default=[])
+            current_cmds.append(cmd)
+            with open(COMMANDS_FILE, 'w') as f:
+                json.dump(current_cmds, f)
+            st.toast("Command Queued: RELOAD_MODEL", icon="♻️")
+        if inference_status.get('last_reload_error'):
+            st.sidebar.warning(f"Last reload rejected: {inference_status['last_reload_error']}")
+    else:
+        st.sidebar.caption("No models found in `models/`.")
+
 
     # --- PROCESS CONTROL ---
     import subprocess
@@ -1063,11 +1132,16 @@ try:
             # COLUMN 2: TRADE HISTORY
             with c2:
                 st.markdown("#### recent trades")
-                st.caption("Clears local trade history CSV.")
+                st.caption("Clears local trade history (CSV and database).")
                 if st.button("🗑️ Clear History"):
                     try:
-                        if TRADE_FILE and os.path.exists(TRADE_FILE):
+                        trade_store = open_trade_store(TRADE_DB)
+                        had_csv = bool(TRADE_FILE and os.path.exists(TRADE_FILE))
+                        if trade_store:
+                            trade_store.clear_trades()
+                        if had_csv:
                             os.remove(TRADE_FILE)
+                        if trade_store or had_csv:
                             st.success("Trade history cleared.")
                         else:
                             st.warning("No history file.")
@@ -1242,20 +1316,19 @@ try:
                 col1, col2 = st.columns(2)
                 
                 # Load Data
-                pt_live = pd.DataFrame(); pt_paper = pd.DataFrame()
-                if os.path.exists(PORTFOLIO_HISTORY_LIVE): pt_live = pd.read_csv(PORTFOLIO_HISTORY_LIVE)
-                if os.path.exists(PORTFOLIO_HISTORY_PAPER): pt_paper = pd.read_csv(PORTFOLIO_HISTORY_PAPER)
+                pt_live = load_portfolio_history(TRADE_DB_LIVE, PORTFOLIO_HISTORY_LIVE)
+                pt_paper = load_portfolio_history(TRADE_DB_PAPER, PORTFOLIO_HISTORY_PAPER)
                 
                 with col1:
                     st.caption("⚡ Live Bot")
                     if not pt_live.empty:
-                        st.metric("Live Equity", f"${pt_live['TotalValueUSD'].iloc[-1]:,.2f}")
+                        st.metric("Live Equity", f"${latest_equity(TRADE_DB_LIVE, pt_live):,.2f}")
                     else: st.info("No Live Data")
                     
                 with col2:
                     st.caption("🎭 Paper/Shadow Bot")
                     if not pt_paper.empty:
-                        st.metric("Paper Equity", f"${pt_paper['TotalValueUSD'].iloc[-1]:,.2f}")
+                        st.metric("Paper Equity", f"${latest_equity(TRADE_DB_PAPER, pt_paper):,.2f}")
                     else: st.info("No Paper Data")
                     
                 # Comparison Chart
@@ -1543,7 +1616,15 @@ try:
             st.divider()
             st.subheader("📋 Recent Trades / Order Book")
             df_trades = pd.DataFrame()
-            if TRADE_FILE and os.path.exists(TRADE_FILE):
+            trade_store = open_trade_store(TRADE_DB)
+            if trade_store:
+                # Server-side pagination: only the requested page is read from SQLite
+                total_trades = trade_store.count_trades()
+                n_pages = max(1, -(-total_trades // 10))
+                page = st.number_input(f"Page (of {n_pages}, {total_trades} trades)", min_value=1, max_value=n_pages,
+                                       value=1, step=1, key=f"trade_page_{selected_pair}")
+                df_trades = trade_store.get_trades(page=page - 1, page_size=10)
+            elif TRADE_FILE and os.path.exists(TRADE_FILE):
                 try: df_trades = pd.read_csv(TRADE_FILE)
                 except: pass
             if not df_trades.empty:
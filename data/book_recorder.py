@@ -0,0 +1,229 @@
+import os
+import time
+import glob
+import heapq
+import queue
+import threading
+import numpy as np
+from typing import Dict, Iterator, List, Optional
+from utils.logger import setup_logger
+
+from config import BOOK_DATA_DIR, BOOK_RECORDER_DEPTH, BOOK_RECORDER_ROTATE_ROWS, BOOK_RECORDER_ROTATE_SECONDS
+
+# Ticker fields kept per snapshot (ccxt unified names), stored as float32 columns
+TICKER_FIELDS = ('last', 'bid', 'ask', 'high', 'low', 'baseVolume')
+
+def _safe(name: str) -> str:
+    return name.replace('/', '_').replace(':', '_')
+
+def _encode_ts(ts: np.ndarray) -> Dict[str, np.ndarray]:
+    """Delta-encodes ms timestamps: first value + int32 deltas (int64 if a delta overflows)."""
+    deltas = np.diff(ts, prepend=ts[0])
+    if deltas.size and np.abs(deltas).max() < 2 ** 31:
+        deltas = deltas.astype(np.int32)
+    return {'t0': np.int64(ts[0]), 'dt': deltas}
+
+def _decode_ts(t0, dt) -> np.ndarray:
+    return np.int64(t0) + np.cumsum(dt.astype(np.int64))
+
+def _levels_to_array(levels, depth: int) -> np.ndarray:
+    """[[price, amount, ...], ...] -> (depth, 2) float32, NaN padded."""
+    out = np.full((depth, 2), np.nan, dtype=np.float32)
+    if levels:
+        rows = np.asarray([lvl[:2] for lvl in levels[:depth]], dtype=np.float64)
+        out[:len(rows)] = rows
+    return out
+
+def _array_to_levels(arr: np.ndarray) -> List[List[float]]:
+    valid = ~np.isnan(arr[:, 0])
+    return arr[valid].astype(float).tolist()
+
+class BookRecorder:
+    """
+    Records L2 order book and ticker snapshots into compressed columnar segments.
+    Each (kind, exchange, symbol) stream is buffered in memory and rotated into a
+    new .npz segment every `rotate_rows` snapshots or `rotate_seconds`:
+      book:   bids/asks (n, depth, 2) float32, NaN padded to a fixed depth
+      ticker: one float32 column per TICKER_FIELDS entry
+    Timestamps (ms) are delta-encoded. Read back with BookReader.
+    record_* calls only buffer a row; rotated buffers are encoded, compressed and
+    written by a background writer thread, off the event loop. Call close() on
+    shutdown to write the open buffers and drain the queue.
+    """
+    def __init__(self, base_dir: str = BOOK_DATA_DIR, depth: int = BOOK_RECORDER_DEPTH,
+                 rotate_rows: int = BOOK_RECORDER_ROTATE_ROWS, rotate_seconds: float = BOOK_RECORDER_ROTATE_SECONDS):
+        self.logger = setup_logger("BookRecorder")
+        self.base_dir = base_dir
+        self.depth = depth
+        self.rotate_rows = rotate_rows
+        self.rotate_seconds = rotate_seconds
+        os.makedirs(self.base_dir, exist_ok=True)
+        # (kind, exchange, symbol) -> {'ts': [], 'rows': [], 'opened': monotonic}
+        self._buffers: Dict[tuple, Dict] = {}
+
+        # Write-behind queue of rotated buffers
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="BookRecorderWriter", daemon=True)
+        self._writer.start()
+
+    def _append(self, kind, exchange, symbol, ts, row):
+        if self._closed:
+            self.logger.error(f"Recorder closed. Dropping {kind} snapshot for {symbol}.")
+            return
+        key = (kind, exchange, symbol)
+        buf = self._buffers.get(key)
+        if buf is None:
+            buf = self._buffers[key] = {'ts': [], 'rows': [], 'opened': time.monotonic()}
+        buf['ts'].append(int(ts))
+        buf['rows'].append(row)
+        if len(buf['ts']) >= self.rotate_rows or time.monotonic() - buf['opened'] >= self.rotate_seconds:
+            self._rotate(key)
+
+    def record_order_book(self, exchange: str, symbol: str, order_book: Dict, timestamp: Optional[int] = None):
+        """Buffers one ccxt order book. timestamp: ms (defaults to the book's own, then now)."""
+        if not order_book or not (order_book.get('bids') or order_book.get('asks')):
+            return
+        ts = timestamp or order_book.get('timestamp') or int(time.time() * 1000)
+        row = (_levels_to_array(order_book.get('bids'), self.depth), _levels_to_array(order_book.get('asks'), self.depth))
+        self._append('book', exchange, symbol, ts, row)
+
+    def record_ticker(self, exchange: str, symbol: str, ticker: Dict, timestamp: Optional[int] = None):
+        """Buffers one ccxt ticker (TICKER_FIELDS only)."""
+        if not ticker:
+            return
+        ts = timestamp or ticker.get('timestamp') or int(time.time() * 1000)
+        row = tuple(np.nan if ticker.get(f) is None else float(ticker[f]) for f in TICKER_FIELDS)
+        self._append('ticker', exchange, symbol, ts, row)
+
+    def _rotate(self, key):
+        """Hands a stream's buffer to the writer thread and starts a new one."""
+        buf = self._buffers.pop(key, None)
+        if buf and buf['ts']:
+            self._queue.put(('segment', (key, buf)))
+
+    def _write_segment(self, key, buf) -> Optional[str]:
+        kind, exchange, symbol = key
+        ts = np.asarray(buf['ts'], dtype=np.int64)
+        arrays = _encode_ts(ts)
+        arrays['symbol'] = np.array(symbol)
+        arrays['exchange'] = np.array(exchange)
+        if kind == 'book':
+            arrays['bids'] = np.stack([r[0] for r in buf['rows']])
+            arrays['asks'] = np.stack([r[1] for r in buf['rows']])
+        else:
+            cols = np.asarray(buf['rows'], dtype=np.float32)
+            for i, field in enumerate(TICKER_FIELDS):
+                arrays[field] = cols[:, i]
+
+        path = os.path.join(self.base_dir, f"{kind}_{_safe(exchange)}_{_safe(symbol)}_{ts[0]}.npz")
+        tmp = path + '.tmp'
+        try:
+            with open(tmp, 'wb') as f:
+                np.savez_compressed(f, **arrays)
+            os.replace(tmp, path)
+            self.logger.info(f"Wrote {len(ts)} {kind} snapshots for {symbol} to {path}")
+            return path
+        except Exception as e:
+            self.logger.error(f"Failed to write {kind} segment for {symbol}: {e}")
+            return None
+
+    def flush(self, timeout=None):
+        """Writes every open buffer out as a segment; blocks until they are on disk."""
+        for key in list(self._buffers):
+            self._rotate(key)
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Writes the open buffers, drains the queue and stops the writer thread (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        for key in list(self._buffers):
+            self._rotate(key)
+        self._queue.put(('stop', None))
+        self._writer.join(timeout)
+
+    # --- BACKGROUND WRITER ---
+
+    def _writer_loop(self):
+        while True:
+            kind, payload = self._queue.get()
+            if kind == 'segment':
+                self._write_segment(*payload)
+            elif kind == 'flush':
+                payload.set()
+            elif kind == 'stop':
+                return
+
+class BookReader:
+    """
+    Streams recorded snapshots back in timestamp order, merged across symbols,
+    for backtests and paper-trading replay.
+    """
+    def __init__(self, base_dir: str = BOOK_DATA_DIR):
+        self.logger = setup_logger("BookReader")
+        self.base_dir = base_dir
+
+    def _segments(self, kind, exchange=None, symbol=None) -> Dict[tuple, List[str]]:
+        """
+        {(exchange, symbol): segment paths in start order}. File names only narrow the
+        search: they are ambiguous ('BTC/USD' is a prefix of 'BTC/USD:USD', exchange ids
+        may contain '_'), so each candidate's stored exchange and symbol must match exactly.
+        """
+        pattern = f"{kind}_{_safe(exchange) if exchange else '*'}_{_safe(symbol) if symbol else '*'}_*.npz"
+        streams: Dict[tuple, List[str]] = {}
+        for path in glob.glob(os.path.join(self.base_dir, pattern)):
+            try:
+                with np.load(path) as seg:
+                    stream = (str(seg['exchange']), str(seg['symbol']))
+                start = int(os.path.basename(path)[:-4].rsplit('_', 1)[1])
+            except Exception as e:
+                self.logger.error(f"Failed to read segment {path}: {e}")
+                continue
+            if (exchange and stream[0] != exchange) or (symbol and stream[1] != symbol):
+                continue
+            streams.setdefault(stream, []).append((start, path))
+        return {k: [p for _, p in sorted(v)] for k, v in streams.items()}
+
+    def _iter_stream(self, kind, paths, start, end) -> Iterator[Dict]:
+        for path in paths:
+            try:
+                with np.load(path) as seg:
+                    ts = _decode_ts(seg['t0'], seg['dt'])
+                    symbol, exchange = str(seg['symbol']), str(seg['exchange'])
+                    if kind == 'book':
+                        cols = {'bids': seg['bids'], 'asks': seg['asks']}
+                    else:
+                        cols = {f: seg[f] for f in TICKER_FIELDS}
+            except Exception as e:
+                self.logger.error(f"Failed to read segment {path}: {e}")
+                continue
+
+            for i in np.argsort(ts, kind='stable'):
+                t = int(ts[i])
+                if (start is not None and t < start) or (end is not None and t > end):
+                    continue
+                snap = {'timestamp': t, 'symbol': symbol, 'exchange': exchange}
+                if kind == 'book':
+                    snap['bids'] = _array_to_levels(cols['bids'][i])
+                    snap['asks'] = _array_to_levels(cols['asks'][i])
+                else:
+                    snap.update({f: (None if np.isnan(cols[f][i]) else float(cols[f][i])) for f in TICKER_FIELDS})
+                yield snap
+
+    def iter_snapshots(self, kind: str = 'book', symbols: Optional[List[str]] = None, exchange: Optional[str] = None,
+                       start: Optional[int] = None, end: Optional[int] = None) -> Iterator[Dict]:
+        """
+        Yields ccxt-shaped snapshots ({'timestamp', 'symbol', 'exchange', 'bids', 'asks'} for
+        books, ticker fields for tickers) in time order. start/end: ms bounds (inclusive).
+        """
+        streams = []
+        for sym in (symbols or [None]):
+            for paths in self._segments(kind, exchange, sym).values():
+                streams.append(self._iter_stream(kind, paths, start, end))
+        return heapq.merge(*streams, key=lambda s: s['timestamp'])
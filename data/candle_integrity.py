@@ -0,0 +1,169 @@
+import os
+import numpy as np
+import pandas as pd
+from typing import Dict, Any, List, Optional
+
+"""
+CANDLE INTEGRITY: Gap & Duplicate Scanner for stored OHLCV series
+-----------------------------------------------------------------
+Missed loop cycles, exchange outages and file overwrites leave holes in the
+candle files under data_storage/. Holes silently distort rolling indicators
+and the RL environment, so every loader can ask for a continuity report.
+All checks are a single vectorized pass over the timestamp column.
+"""
+
+TIMEFRAME_SECONDS = {
+    '1m': 60, '5m': 300, '15m': 900, '30m': 1800,
+    '1h': 3600, '4h': 14400, '1d': 86400, '1w': 604800
+}
+
+# Files written by DataStorage.update_*_data use a label instead of a timeframe
+FILENAME_TIMEFRAMES = {'intraday': '1m', 'yearly': '1d'}
+
+
+def infer_timeframe(filename: Optional[str] = None, timestamps: Optional[pd.Series] = None) -> Optional[str]:
+    """
+    Resolves the candle timeframe from the file name (BTC_USD_1h.csv, BTC_USD_intraday.csv)
+    or, failing that, from the most common spacing between timestamps.
+    """
+    if filename:
+        suffix = os.path.splitext(os.path.basename(filename))[0].split('_')[-1]
+        if suffix in TIMEFRAME_SECONDS:
+            return suffix
+        if suffix in FILENAME_TIMEFRAMES:
+            return FILENAME_TIMEFRAMES[suffix]
+
+    if timestamps is not None and len(timestamps) > 1:
+        diffs = np.diff(_to_epoch_seconds(timestamps))
+        diffs = diffs[diffs > 0]
+        if len(diffs):
+            values, counts = np.unique(diffs, return_counts=True)
+            step = values[np.argmax(counts)]
+            for tf, seconds in TIMEFRAME_SECONDS.items():
+                if seconds == step:
+                    return tf
+    return None
+
+
+def _to_epoch_seconds(timestamps) -> np.ndarray:
+    """Converts datetime-like or millisecond timestamps to int64 epoch seconds."""
+    ts = pd.Series(timestamps)
+    if pd.api.types.is_numeric_dtype(ts):
+        # ccxt style milliseconds
+        return (ts.to_numpy(dtype=np.int64) // 1000)
+    ts = pd.to_datetime(ts)
+    return ts.to_numpy(dtype='datetime64[s]').astype(np.int64)
+
+
+def scan_candles(df: pd.DataFrame, timeframe: str) -> Dict[str, Any]:
+    """
+    Scans a candle DataFrame for gaps, duplicate timestamps and ordering problems.
+    Returns a report dict; report['continuous'] is True only for a strictly
+    increasing series with exactly one candle per timeframe step.
+    """
+    step = TIMEFRAME_SECONDS[timeframe]
+    report = {
+        'timeframe': timeframe,
+        'rows': int(len(df)),
+        'start': None,
+        'end': None,
+        'expected_rows': int(len(df)),
+        'duplicates': 0,
+        'unsorted': 0,
+        'misaligned': 0,
+        'missing': 0,
+        'gaps': [],
+        'continuous': True
+    }
+    if df.empty or 'timestamp' not in df.columns:
+        return report
+
+    ts = _to_epoch_seconds(df['timestamp'])
+    diffs = np.diff(ts)
+
+    report['duplicates'] = int(np.count_nonzero(diffs == 0))
+    report['unsorted'] = int(np.count_nonzero(diffs < 0))
+
+    # Gap analysis runs on the sorted, de-duplicated axis so one bad row doesn't hide others
+    uniq = np.unique(ts)
+    report['start'] = pd.Timestamp(uniq[0], unit='s')
+    report['end'] = pd.Timestamp(uniq[-1], unit='s')
+    report['expected_rows'] = int((uniq[-1] - uniq[0]) // step + 1)
+
+    u_diffs = np.diff(uniq)
+    report['misaligned'] = int(np.count_nonzero(u_diffs % step))
+
+    gap_idx = np.flatnonzero(u_diffs > step)
+    missing = (u_diffs[gap_idx] - 1) // step
+    report['missing'] = int(missing.sum())
+    report['gaps'] = [
+        {
+            # First and last missing candle (inclusive)
+            'start': pd.Timestamp(uniq[i] + step, unit='s'),
+            'end': pd.Timestamp(uniq[i + 1] - step, unit='s'),
+            'missing': int(m)
+        }
+        for i, m in zip(gap_idx, missing)
+    ]
+
+    report['continuous'] = not (report['duplicates'] or report['unsorted']
+                                or report['misaligned'] or report['missing'])
+    return report
+
+
+def merge_candles(df: pd.DataFrame, patch: pd.DataFrame) -> pd.DataFrame:
+    """
+    Merges refetched candles into a stored series.
+    Later rows win on duplicate timestamps; the result is sorted by time.
+    """
+    merged = pd.concat([df, patch], ignore_index=True)
+    merged['timestamp'] = pd.to_datetime(merged['timestamp'])
+    merged = merged.drop_duplicates(subset='timestamp', keep='last')
+    return merged.sort_values('timestamp').reset_index(drop=True)
+
+
+def contiguous_tail(df: pd.DataFrame, timeframe: str, max_gap: int = 1) -> pd.DataFrame:
+    """
+    The newest run of a sorted candle series in which consecutive candles are at most
+    max_gap steps apart. Older candles behind a longer outage are dropped, so indicators
+    warmed up on the result never bridge it.
+    """
+    if len(df) < 2:
+        return df.reset_index(drop=True)
+    step = TIMEFRAME_SECONDS[timeframe]
+    breaks = np.flatnonzero(np.diff(_to_epoch_seconds(df['timestamp'])) > max_gap * step)
+    start = breaks[-1] + 1 if len(breaks) else 0
+    return df.iloc[start:].reset_index(drop=True)
+
+
+def format_report(name: str, report: Dict[str, Any], max_gaps: int = 5) -> str:
+    """Human readable one-file summary for logs and the CLI."""
+    status = "OK" if report['continuous'] else "BROKEN"
+    lines = [
+        f"[{status}] {name} ({report['timeframe']}): {report['rows']}/{report['expected_rows']} rows, "
+        f"missing={report['missing']} in {len(report['gaps'])} gaps, dupes={report['duplicates']}, "
+        f"unsorted={report['unsorted']}, misaligned={report['misaligned']}"
+    ]
+    for gap in report['gaps'][:max_gaps]:
+        lines.append(f"    gap {gap['start']} -> {gap['end']} ({gap['missing']} candles)")
+    if len(report['gaps']) > max_gaps:
+        lines.append(f"    ... {len(report['gaps']) - max_gaps} more gaps")
+    return "\n".join(lines)
+
+
+def gap_fetch_plan(report: Dict[str, Any], max_batch: int = 720) -> List[Dict[str, Any]]:
+    """
+    Converts a report's gaps into targeted fetch requests (since_ms, limit),
+    splitting long outages into exchange-sized batches.
+    """
+    step = TIMEFRAME_SECONDS[report['timeframe']]
+    plan = []
+    for gap in report['gaps']:
+        since = int(gap['start'].timestamp())
+        remaining = gap['missing']
+        while remaining > 0:
+            limit = min(remaining, max_batch)
+            plan.append({'since': since * 1000, 'limit': limit})
+            since += limit * step
+            remaining -= limit
+    return plan
@@ -0,0 +1,177 @@
+import os
+import zlib
+import pickle
+import struct
+import asyncio
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from strategy.base_strategy import BaseStrategy, state_id
+from utils.ring_buffer import OHLCVBuffer
+from utils.logger import setup_logger
+
+from config import COUNCIL_STATE_DIR, COUNCIL_STATE_MAX_DRIFT
+
+"""
+COUNCIL STATE: Per-pair strategy snapshots for near-instant restarts
+--------------------------------------------------------------------
+A snapshot holds what a strategy would otherwise rebuild from candles or lose on a
+restart: for MetaStrategy the shared indicator cache, shadow votes, merit weights,
+regime statistics and every agent's streaming state (BaseStrategy.get_state()).
+It also holds the pair's metadata from the trading loop, such as last_regime.
+
+    dumps()        pickles a strategy's state on the event loop thread, between
+                   candles, so the snapshot is consistent
+    write_many()   compresses (zlib) and writes the snapshots in a worker thread;
+                   each file is replaced atomically
+    restore()      checks the snapshot against freshly fetched candles, restores it,
+                   then primes the strategy on the candles it missed
+
+Each file is MAGIC + format version + a zlib-compressed pickle. The strategy's state
+and each agent's state are tagged with their class and STATE_VERSION. A changed
+strategy rejects the snapshot, and the strategy primes from candles as before. A
+changed agent only re-primes that agent.
+"""
+
+MAGIC = b'CNCL'
+SNAPSHOT_FORMAT = 1
+CHECK_CANDLES = 20  # Recent candles recorded to check a snapshot against fetched candles
+_HEADER = struct.Struct('>4sH')
+
+class CouncilStateStore:
+    """Versioned, compressed snapshots of per-pair strategy state in data/council_state/."""
+    def __init__(self, directory: str = COUNCIL_STATE_DIR, max_drift: float = COUNCIL_STATE_MAX_DRIFT):
+        self.logger = setup_logger("CouncilState")
+        self.directory = directory
+        self.max_drift = max_drift
+        os.makedirs(self.directory, exist_ok=True)
+
+    def path(self, exchange: str, symbol: str) -> str:
+        return os.path.join(self.directory, f"{exchange}_{symbol.replace('/', '_')}.bin")
+
+    @staticmethod
+    def _recent_candles(strategy: BaseStrategy, last_candle: Optional[Dict[str, Any]]) -> np.ndarray:
+        """(n, 2) timestamps (epoch ms) and closes of the newest candles the strategy has seen."""
+        cache = strategy.indicators
+        if cache is not None and len(cache):
+            frame = cache.frame(CHECK_CANDLES)
+            return np.column_stack((OHLCVBuffer._column(frame, 'timestamp'), frame['close'].to_numpy(dtype=float)))
+        if last_candle is not None:
+            return np.array([[OHLCVBuffer._value(last_candle.get('timestamp')), float(last_candle['close'])]])
+        return np.empty((0, 2))
+
+    def dumps(self, strategy: BaseStrategy, last_candle: Optional[Dict[str, Any]] = None,
+              meta: Optional[Dict[str, Any]] = None) -> bytes:
+        """
+        Pickles a strategy's snapshot. Call it on the event loop between candles.
+        last_candle: the newest candle fed to it (used when the strategy has no indicator cache).
+        meta: pair metadata from the trading loop, returned by restore().
+        """
+        snapshot = {
+            'strategy': state_id(strategy),
+            'saved_at': datetime.now().isoformat(),
+            'recent': self._recent_candles(strategy, last_candle),
+            'meta': meta or {},
+            'state': strategy.get_state(),
+        }
+        return pickle.dumps(snapshot, protocol=pickle.HIGHEST_PROTOCOL)
+
+    def _write(self, path: str, payload: bytes):
+        tmp = path + ".tmp"
+        with open(tmp, 'wb') as f:
+            f.write(_HEADER.pack(MAGIC, SNAPSHOT_FORMAT))
+            f.write(zlib.compress(payload, 1))
+        os.replace(tmp, path)
+
+    def save(self, exchange: str, symbol: str, strategy: BaseStrategy, last_candle: Optional[Dict[str, Any]] = None,
+             meta: Optional[Dict[str, Any]] = None) -> bool:
+        """Writes one snapshot synchronously (used at shutdown)."""
+        try:
+            self._write(self.path(exchange, symbol), self.dumps(strategy, last_candle, meta))
+            return True
+        except Exception as e:
+            self.logger.error(f"Failed to save council state for {exchange} {symbol}: {e}")
+            return False
+
+    async def write_many(self, payloads: List[Tuple[str, bytes]]) -> int:
+        """Compresses and writes (path, dumps()) pairs off the event loop; returns how many were written."""
+        def write_all():
+            written = 0
+            for path, payload in payloads:
+                try:
+                    self._write(path, payload)
+                    written += 1
+                except Exception as e:
+                    self.logger.error(f"Failed to write council state {path}: {e}")
+            return written
+        return await asyncio.to_thread(write_all)
+
+    def load(self, exchange: str, symbol: str) -> Optional[Dict[str, Any]]:
+        """The pair's snapshot, or None if it has none or it cannot be read."""
+        path = self.path(exchange, symbol)
+        if not os.path.exists(path):
+            return None
+        try:
+            with open(path, 'rb') as f:
+                magic, version = _HEADER.unpack(f.read(_HEADER.size))
+                if magic != MAGIC or version != SNAPSHOT_FORMAT:
+                    self.logger.warning(f"Ignoring council state {path}: format {magic!r} v{version}")
+                    return None
+                return pickle.loads(zlib.decompress(f.read()))
+        except Exception as e:
+            self.logger.error(f"Failed to load council state {path}: {e}")
+            return None
+
+    def validate(self, snapshot: Dict[str, Any], strategy: BaseStrategy, history: pd.DataFrame) -> Optional[str]:
+        """
+        Why the snapshot must not be restored into strategy, or None if it may be. The
+        strategy's class and state version must match. The snapshot's newest candle must
+        fall inside the fetched history (no gap between them). Its recent closes must agree
+        with the fetched ones: the median deviation must be at most max_drift. The candles
+        may have still been forming when the snapshot was saved.
+        """
+        if snapshot.get('strategy') != state_id(strategy):
+            return f"saved by {snapshot.get('strategy')}, running {state_id(strategy)}"
+        recent = snapshot['recent']
+        if not len(recent) or not len(history):
+            return "no candles to check it against"
+
+        ts = OHLCVBuffer._column(history, 'timestamp')
+        last = recent[-1, 0]
+        if last < ts[0] or (last <= ts[-1] and last not in ts):
+            return "its candles are not contiguous with the fetched history"
+        matched = np.isin(recent[:, 0], ts)
+        if not matched.any():
+            return "no overlap with the fetched history"
+        fetched = pd.Series(history['close'].to_numpy(dtype=float), index=ts)
+        drift = float(np.median(np.abs(recent[matched, 1] / fetched.loc[recent[matched, 0]].to_numpy() - 1)))
+        if not drift <= self.max_drift:
+            return f"prices differ from the fetched history by {drift:.2%}"
+        return None
+
+    def restore(self, exchange: str, symbol: str, strategy: BaseStrategy, history: pd.DataFrame) -> Optional[Dict[str, Any]]:
+        """
+        Restores the pair's snapshot into a fresh strategy, then primes it on the fetched
+        candles newer than the snapshot. Returns the snapshot's pair metadata, or None
+        when there is no usable snapshot (the strategy is untouched and should be primed
+        on history). Raises if a valid snapshot cannot be applied; the strategy is then
+        half-restored and must be replaced.
+        """
+        snapshot = self.load(exchange, symbol)
+        if snapshot is None:
+            return None
+        reason = self.validate(snapshot, strategy, history)
+        if reason:
+            self.logger.warning(f"Discarding council state for {exchange} {symbol}: {reason}")
+            return None
+
+        ts = OHLCVBuffer._column(history, 'timestamp')
+        covered = ts <= snapshot['recent'][-1, 0]
+        strategy.set_state(snapshot['state'], history[covered])
+        newer = history[~covered]
+        if len(newer):
+            strategy.prime(newer)
+        self.logger.info(f"Restored {exchange} {symbol} from council state saved {snapshot['saved_at']} "
+                         f"(+{len(newer)} newer candles)")
+        return snapshot['meta']
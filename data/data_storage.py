@@ -3,9 +3,17 @@ import os
 from typing import Optional
 import asyncio
 from utils.logger import setup_logger
+from data.candle_integrity import (
+    scan_candles, infer_timeframe, merge_candles, format_report, gap_fetch_plan, contiguous_tail, FILENAME_TIMEFRAMES,
+)
 
 from config import DATA_DIR
 
+OHLCV_COLUMNS = ['timestamp', 'open', 'high', 'low', 'close', 'volume']
+
+# Files in DATA_DIR that are not candle series
+NON_CANDLE_FILES = {'combined_training_data.csv', 'portfolio_history.csv', 'paper_portfolio_history.csv'}
+
 class DataStorage:
     def __init__(self):
         self.logger = setup_logger("DataStorage")
@@ -65,9 +73,11 @@ class DataStorage:
         except Exception as e:
              self.logger.error(f"Failed to update intraday data for {symbol}: {e}")
 
-    def load_historical_data(self, filename: str) -> pd.DataFrame:
+    def load_historical_data(self, filename: str, require_continuous: bool = False) -> pd.DataFrame:
         """
         Loads historical data from CSV.
+        The continuity result is attached as df.attrs['continuous'].
+        require_continuous: Refuse (empty DataFrame) series with gaps or duplicates.
         """
         filepath = os.path.join(self.storage_dir, filename)
         if not os.path.exists(filepath):
@@ -77,11 +87,124 @@ class DataStorage:
         try:
             df = pd.read_csv(filepath)
             df['timestamp'] = pd.to_datetime(df['timestamp'])
-            return df
         except Exception as e:
              self.logger.error(f"Failed to load data: {e}")
              return pd.DataFrame()
 
+        groups = df.groupby('symbol', sort=False) if 'symbol' in df.columns else [(filename, df)]
+        continuous = True
+        for label, group in groups:
+            timeframe = infer_timeframe(filename, group['timestamp'])
+            if not timeframe:
+                self.logger.warning(f"Cannot verify continuity of {filename} ({label}): timeframe unknown.")
+                continuous = False
+                continue
+            report = scan_candles(group, timeframe)
+            if not report['continuous']:
+                continuous = False
+                self.logger.warning(format_report(f"{filename} [{label}]", report))
+        df.attrs['continuous'] = continuous
+
+        if require_continuous and not continuous:
+            self.logger.error(f"Refusing discontinuous series: {filename}")
+            return pd.DataFrame()
+        return df
+
+    def load_warmup_history(self, symbol: str, ohlcv: list, timeframe: str, limit: int, max_gap: int = 1) -> pd.DataFrame:
+        """
+        Closed candles to warm a pair's strategy up on: the stored intraday series (when it
+        is in this timeframe) merged with freshly fetched ohlcv, whose newest candle is still
+        forming and is left to the live loop. Cut to the newest run without gaps longer than
+        max_gap candles and to the last `limit` rows. Timestamps are datetimes, oldest first.
+        """
+        fresh = pd.DataFrame(ohlcv or [], columns=OHLCV_COLUMNS)
+        if fresh.empty:
+            return fresh
+        fresh['timestamp'] = pd.to_datetime(fresh['timestamp'], unit='ms')
+        forming = fresh['timestamp'].iloc[-1]
+        stored = fresh.iloc[0:0]
+
+        filepath = os.path.join(self.storage_dir, f"{symbol.replace('/', '_')}_intraday.csv")
+        if FILENAME_TIMEFRAMES['intraday'] == timeframe and os.path.exists(filepath):
+            try:
+                stored = pd.read_csv(filepath, usecols=OHLCV_COLUMNS)
+                stored['timestamp'] = pd.to_datetime(stored['timestamp'])
+            except Exception as e:
+                self.logger.error(f"Failed to load stored candles for {symbol}: {e}")
+                stored = fresh.iloc[0:0]
+
+        history = merge_candles(stored, fresh)
+        history = history[history['timestamp'] < forming]
+        return contiguous_tail(history, timeframe, max_gap).tail(limit).reset_index(drop=True)
+
+    def scan_gaps(self, filename: str, timeframe: Optional[str] = None) -> Optional[dict]:
+        """
+        Returns the gap/duplicate report for one stored candle file.
+        """
+        filepath = os.path.join(self.storage_dir, filename)
+        if not os.path.exists(filepath):
+            self.logger.error(f"File not found: {filepath}")
+            return None
+        try:
+            df = pd.read_csv(filepath, usecols=['timestamp'])
+        except Exception as e:
+            self.logger.error(f"Failed to scan {filename}: {e}")
+            return None
+        timeframe = timeframe or infer_timeframe(filename, df['timestamp'])
+        if not timeframe:
+            self.logger.warning(f"Could not infer timeframe for {filename}. Skipping.")
+            return None
+        return scan_candles(df, timeframe)
+
+    def scan_all(self) -> dict:
+        """
+        Scans every stored candle series (scenarios excluded). Returns {filename: report}.
+        """
+        reports = {}
+        for filename in sorted(os.listdir(self.storage_dir)):
+            if not filename.endswith('.csv') or filename in NON_CANDLE_FILES:
+                continue
+            report = self.scan_gaps(filename)
+            if report:
+                reports[filename] = report
+        return reports
+
+    async def repair_gaps(self, client, symbol: str, filename: str, timeframe: Optional[str] = None) -> Optional[dict]:
+        """
+        Refetches only the missing ranges of a stored series, merges them in
+        (dropping duplicates) and rewrites the file. Returns the post-repair report.
+        """
+        filepath = os.path.join(self.storage_dir, filename)
+        df = self.load_historical_data(filename)
+        if df.empty:
+            return None
+        timeframe = timeframe or infer_timeframe(filename, df['timestamp'])
+        if not timeframe:
+            self.logger.warning(f"Could not infer timeframe for {filename}. Skipping repair.")
+            return None
+        report = scan_candles(df, timeframe)
+        if report['continuous']:
+            return report
+
+        patches = []
+        for req in gap_fetch_plan(report):
+            ohlcv = await client.fetch_ohlcv(symbol, timeframe=timeframe, limit=req['limit'], since=req['since'])
+            if ohlcv:
+                patch = pd.DataFrame(ohlcv, columns=['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+                patch['timestamp'] = pd.to_datetime(patch['timestamp'], unit='ms')
+                patches.append(patch)
+
+        merged = merge_candles(df, pd.concat(patches, ignore_index=True)) if patches else merge_candles(df, df.iloc[0:0])
+        merged.to_csv(filepath, index=False)
+
+        after = scan_candles(merged, timeframe)
+        self.logger.info(f"Repaired {filename}: missing {report['missing']} -> {after['missing']}, "
+                         f"dupes {report['duplicates']} -> {after['duplicates']}")
+        if after['missing']:
+            # Exchanges (e.g. Kraken) omit candles for minutes without trades
+            self.logger.warning(f"{filename}: {after['missing']} candles unavailable from exchange.")
+        return after
+
 # Wrapper functions for backward compatibility (used by train.py, backtest_engine.py)
 _storage_instance = DataStorage()
 
@@ -101,6 +224,6 @@ async def fetch_and_save_historical_data(exchange_client, symbol: str, timeframe
 
     return await _storage_instance.save_ohlcv(symbol, ohlcv, filename=filename)
 
-def load_historical_data(filename: str) -> pd.DataFrame:
+def load_historical_data(filename: str, require_continuous: bool = False) -> pd.DataFrame:
     """Wrapper for load_historical_data."""
-    return _storage_instance.load_historical_data(filename)
+    return _storage_instance.load_historical_data(filename, require_continuous=require_continuous)
@@ -66,12 +66,13 @@ class ExchangeClient:
             self.logger.error(f"Error fetching ticker for {symbol}: {e}")
             return {}
 
-    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100) -> List:
+    async def fetch_ohlcv(self, symbol: str, timeframe: str = '1m', limit: int = 100, since: Optional[int] = None) -> List:
         """
         Fetches OHLCV (candlestick) data.
+        since: Optional start time in ms (used for targeted gap refetches).
         """
         try:
-            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, limit=limit)
+            ohlcv = await self.exchange.fetch_ohlcv(symbol, timeframe, since=since, limit=limit)
             return ohlcv
         except Exception as e:
             self.logger.error(f"Error fetching OHLCV for {symbol}: {e}")
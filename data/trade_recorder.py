@@ -1,20 +1,50 @@
 import csv
 import os
 import json
+import queue
+import threading
+import time
 from datetime import datetime
 from utils.logger import setup_logger
+from data.trade_store import TradeStore
+from config import RECORDER_FLUSH_INTERVAL, RECORDER_FLUSH_BATCH
 
 class TradeRecorder:
-    def __init__(self, filename='trade_history.csv', portfolio_filename='portfolio_history.csv'):
+    """
+    Write-behind trade/portfolio recorder.
+    log_* calls only enqueue a row; a background writer thread batches rows and
+    flushes (+fsync) every `flush_interval` seconds or `flush_batch` rows, so bursts
+    like PANIC_SELL_ALL never put disk latency on the event loop.
+    Call close() on shutdown to drain the queue.
+    """
+    def __init__(self, filename='trade_history.csv', portfolio_filename='portfolio_history.csv', db_path=None,
+                 flush_interval=RECORDER_FLUSH_INTERVAL, flush_batch=RECORDER_FLUSH_BATCH):
         self.filename = os.path.join(os.getcwd(), filename)
         # Ensure data_storage dir exists for portfolio file
         self.data_dir = os.path.join(os.getcwd(), 'data_storage')
         if not os.path.exists(self.data_dir):
             os.makedirs(self.data_dir)
-            
+
         self.portfolio_filename = os.path.join(self.data_dir, portfolio_filename)
         self.logger = setup_logger("TradeRecorder")
-        self._ensure_file_exists()
+
+        # SQLite backend replaces the CSV files when a db_path is given
+        self.store = None
+        if db_path:
+            is_new = not os.path.exists(db_path)
+            self.store = TradeStore(db_path)
+            if is_new:
+                self.store.migrate_from_csv(self.filename, self.portfolio_filename)
+        else:
+            self._ensure_file_exists()
+
+        # Write-behind queue
+        self.flush_interval = flush_interval
+        self.flush_batch = flush_batch
+        self._queue = queue.Queue()
+        self._closed = False
+        self._writer = threading.Thread(target=self._writer_loop, name="TradeRecorderWriter", daemon=True)
+        self._writer.start()
 
     def _ensure_file_exists(self):
         """Creates the file with headers if it doesn't exist."""
@@ -25,48 +55,128 @@ class TradeRecorder:
             self.logger.info(f"Created new trade log: {self.filename}")
 
     def log_trade(self, symbol, side, price, amount, strategy_name, exchange, timestamp=None):
-        """Appends a trade record to the CSV."""
+        """Queues a trade record for the background writer."""
         if timestamp is None:
             timestamp = datetime.now()
-            
-        date_str = timestamp.strftime('%Y-%m-%d %H:%M:%S')
-        value = price * amount
-        
-        try:
-            with open(self.filename, mode='a', newline='') as f:
-                writer = csv.writer(f)
-                writer.writerow([
-                    timestamp.timestamp(),
-                    date_str,
+        if self._closed:
+            self.logger.error(f"Recorder closed. Dropping trade for {symbol}.")
+            return
+        self._queue.put(('trade', (timestamp, symbol, side, price, amount, strategy_name, exchange)))
+
+    def log_portfolio_snapshot(self, total_value_usd, asset_details):
+        """
+        Queues the total portfolio value for graphing.
+        """
+        if self._closed:
+            self.logger.error("Recorder closed. Dropping portfolio snapshot.")
+            return
+        self._queue.put(('snapshot', (datetime.now(), total_value_usd, asset_details)))
+
+    def flush(self, timeout=None):
+        """Blocks until every queued row has been written and synced."""
+        if not self._writer.is_alive():
+            return
+        done = threading.Event()
+        self._queue.put(('flush', done))
+        done.wait(timeout)
+
+    def close(self, timeout=10.0):
+        """Drains the queue and stops the writer thread (idempotent)."""
+        if self._closed:
+            return
+        self._closed = True
+        self._queue.put(('stop', None))
+        self._writer.join(timeout)
+        if self.store:
+            self.store.close()
+
+    # --- BACKGROUND WRITER ---
+
+    def _writer_loop(self):
+        trades, snapshots = [], []
+        last_flush = time.monotonic()
+        while True:
+            timeout = max(0.0, self.flush_interval - (time.monotonic() - last_flush))
+            try:
+                kind, payload = self._queue.get(timeout=timeout if (trades or snapshots) else None)
+            except queue.Empty:
+                kind, payload = None, None
+
+            if kind == 'trade':
+                trades.append(payload)
+            elif kind == 'snapshot':
+                snapshots.append(payload)
+
+            due = (kind in ('flush', 'stop')
+                   or len(trades) + len(snapshots) >= self.flush_batch
+                   or time.monotonic() - last_flush >= self.flush_interval)
+            if due and (trades or snapshots):
+                self._write_batch(trades, snapshots)
+                trades, snapshots = [], []
+            if due:
+                last_flush = time.monotonic()
+
+            if kind == 'flush':
+                payload.set()
+            elif kind == 'stop':
+                return
+
+    def _write_batch(self, trades, snapshots):
+        if trades:
+            try:
+                self._write_trades(trades)
+                self.logger.info(f"Logged {len(trades)} trade(s) ({', '.join(sorted({t[1] for t in trades}))}) "
+                                 f"to {self.store.db_path if self.store else self.filename}")
+            except Exception as e:
+                self.logger.error(f"Failed to log {len(trades)} trade(s): {e}")
+        if snapshots:
+            try:
+                self._write_snapshots(snapshots)
+                self.logger.info(f"Logged Portfolio Snapshot: ${snapshots[-1][1]:.2f}")
+            except Exception as e:
+                self.logger.error(f"Error logging portfolio snapshot: {e}")
+
+    def _write_trades(self, trades):
+        if self.store:
+            self.store.insert_trades([
+                (ts.timestamp(), symbol, side.upper(), float(price), float(amount), float(price) * float(amount),
+                 strategy_name, exchange)
+                for ts, symbol, side, price, amount, strategy_name, exchange in trades])
+            self.store.sync()
+            return
+
+        with open(self.filename, mode='a', newline='') as f:
+            writer = csv.writer(f)
+            writer.writerows([
+                [
+                    ts.timestamp(),
+                    ts.strftime('%Y-%m-%d %H:%M:%S'),
                     symbol,
                     side.upper(),
                     f"{price:.8f}",
                     f"{amount:.8f}",
-                    f"{value:.2f}",
+                    f"{price * amount:.2f}",
                     strategy_name,
                     exchange
-                ])
-            self.logger.info(f"Logged trade for {symbol} to {self.filename}")
-        except Exception as e:
-            self.logger.error(f"Failed to log trade: {e}")
+                ]
+                for ts, symbol, side, price, amount, strategy_name, exchange in trades])
+            f.flush()
+            os.fsync(f.fileno())
+
+    def _write_snapshots(self, snapshots):
+        if self.store:
+            self.store.insert_snapshots(
+                (ts.timestamp(), total_value_usd, asset_details) for ts, total_value_usd, asset_details in snapshots)
+            self.store.sync()
+            return
 
-    def log_portfolio_snapshot(self, total_value_usd, asset_details):
-        """
-        Logs the total portfolio value for graphing.
-        """
         file_exists = os.path.isfile(self.portfolio_filename)
-        
-        try:
-            with open(self.portfolio_filename, 'a', newline='') as f:
-                writer = csv.writer(f)
-                if not file_exists:
-                    writer.writerow(['Timestamp', 'TotalValueUSD', 'Details']) # Header
-                
-                writer.writerow([
-                    datetime.now().isoformat(),
-                    total_value_usd,
-                    json.dumps(asset_details) # Store breakdown as JSON string
-                ])
-                self.logger.info(f"Logged Portfolio Snapshot: ${total_value_usd:.2f}")
-        except Exception as e:
-            self.logger.error(f"Error logging portfolio snapshot: {e}")
+        with open(self.portfolio_filename, 'a', newline='') as f:
+            writer = csv.writer(f)
+            if not file_exists:
+                writer.writerow(['Timestamp', 'TotalValueUSD', 'Details']) # Header
+            writer.writerows([
+                [ts.isoformat(), total_value_usd, json.dumps(asset_details)] # Store breakdown as JSON string
+                for ts, total_value_usd, asset_details in snapshots])
+            f.flush()
+            os.fsync(f.fileno())
@@ -0,0 +1,244 @@
+import sqlite3
+import os
+import json
+import threading
+import pandas as pd
+from datetime import datetime
+from typing import Dict, Optional, Union
+from utils.logger import setup_logger
+
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS trades (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    side TEXT NOT NULL,
+    price REAL NOT NULL,
+    amount REAL NOT NULL,
+    value REAL NOT NULL,
+    strategy TEXT,
+    exchange TEXT
+);
+CREATE UNIQUE INDEX IF NOT EXISTS ux_trades_row ON trades(ts, symbol, side, amount);
+CREATE INDEX IF NOT EXISTS ix_trades_symbol_ts ON trades(symbol, ts);
+
+CREATE TABLE IF NOT EXISTS portfolio_snapshots (
+    id INTEGER PRIMARY KEY,
+    ts REAL NOT NULL UNIQUE,
+    total_value_usd REAL NOT NULL
+);
+
+CREATE TABLE IF NOT EXISTS holdings (
+    snapshot_id INTEGER NOT NULL REFERENCES portfolio_snapshots(id) ON DELETE CASCADE,
+    ts REAL NOT NULL,
+    symbol TEXT NOT NULL,
+    value_usd REAL NOT NULL,
+    PRIMARY KEY (snapshot_id, symbol)
+);
+CREATE INDEX IF NOT EXISTS ix_holdings_symbol_ts ON holdings(symbol, ts);
+"""
+
+# Column names of the legacy trade CSV, kept so the dashboard renders both sources identically
+TRADE_COLUMNS = ['Timestamp', 'Date', 'Symbol', 'Side', 'Price', 'Amount', 'Value', 'Strategy', 'Exchange']
+
+def _to_epoch(value: Union[float, str, datetime, None]) -> Optional[float]:
+    """Epoch seconds; naive datetimes are local time, as written by datetime.now()."""
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return float(value)
+    return pd.Timestamp(value).to_pydatetime().timestamp()
+
+def _from_epoch(values) -> pd.Series:
+    """Inverse of _to_epoch: epoch seconds -> naive local datetimes."""
+    return pd.Series(pd.to_datetime([datetime.fromtimestamp(v) for v in values]), dtype='datetime64[ns]')
+
+class TradeStore:
+    """
+    Embedded SQLite (WAL) store for trades, portfolio snapshots and per-asset holdings.
+    Rows are normalized and indexed by time and symbol so the dashboard can page
+    and range-query instead of re-reading whole CSV files on every refresh.
+    Writes use synchronous=FULL: every committed insert has its WAL frames fsynced
+    before the insert returns, so it survives a process crash or power loss. The
+    writes come from TradeRecorder's background thread in batches, so the fsync
+    never lands on the event loop.
+    """
+    def __init__(self, db_path: str):
+        self.logger = setup_logger("TradeStore")
+        self.db_path = db_path
+        db_dir = os.path.dirname(db_path)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
+
+        # One connection shared across threads, serialized by a lock
+        self._lock = threading.Lock()
+        self.conn = sqlite3.connect(db_path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        self.conn.execute("PRAGMA foreign_keys=ON")
+        self.conn.executescript(SCHEMA)
+        self.conn.commit()
+
+    def close(self):
+        """Checkpoints the whole WAL into the (fsynced) main database, truncates it and closes."""
+        with self._lock:
+            try:
+                self.conn.execute("PRAGMA wal_checkpoint(TRUNCATE)")
+            except sqlite3.Error as e:
+                self.logger.error(f"Final checkpoint of {self.db_path} failed: {e}")
+            self.conn.close()
+
+    def sync(self):
+        """
+        Committed rows are already durable (synchronous=FULL fsyncs the WAL on commit).
+        This copies as much of the WAL as readers allow into the main database so it
+        stays small between restarts; it is housekeeping, not a durability barrier.
+        """
+        with self._lock:
+            self.conn.execute("PRAGMA wal_checkpoint(PASSIVE)")
+
+    # --- WRITES ---
+
+    def insert_trades(self, rows):
+        """rows: iterable of (ts, symbol, side, price, amount, value, strategy, exchange)."""
+        with self._lock, self.conn:
+            self.conn.executemany(
+                "INSERT OR IGNORE INTO trades (ts, symbol, side, price, amount, value, strategy, exchange) "
+                "VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+
+    def insert_trade(self, ts, symbol, side, price, amount, strategy, exchange):
+        self.insert_trades([(float(ts), symbol, side.upper(), float(price), float(amount),
+                             float(price) * float(amount), strategy, exchange)])
+
+    def insert_snapshots(self, snapshots):
+        """snapshots: iterable of (ts, total_value_usd, {symbol: value_usd})."""
+        with self._lock, self.conn:
+            for ts, total, details in snapshots:
+                cur = self.conn.execute(
+                    "INSERT OR IGNORE INTO portfolio_snapshots (ts, total_value_usd) VALUES (?, ?)",
+                    (float(ts), float(total)))
+                if not cur.rowcount:
+                    continue
+                self.conn.executemany(
+                    "INSERT INTO holdings (snapshot_id, ts, symbol, value_usd) VALUES (?, ?, ?, ?)",
+                    [(cur.lastrowid, float(ts), sym, float(val)) for sym, val in (details or {}).items()])
+
+    def insert_snapshot(self, ts, total_value_usd, asset_details: Dict[str, float]):
+        self.insert_snapshots([(ts, total_value_usd, asset_details)])
+
+    def clear_trades(self):
+        with self._lock, self.conn:
+            self.conn.execute("DELETE FROM trades")
+
+    # --- MIGRATION ---
+
+    def migrate_from_csv(self, trade_csv: Optional[str] = None, portfolio_csv: Optional[str] = None) -> Dict[str, int]:
+        """
+        Imports the legacy CSV history. Safe to re-run: duplicate rows are ignored.
+        """
+        counts = {'trades': 0, 'snapshots': 0}
+        if trade_csv and os.path.exists(trade_csv):
+            try:
+                df = pd.read_csv(trade_csv)
+                if not df.empty:
+                    rows = list(zip(
+                        df['Timestamp'].astype(float), df['Symbol'], df['Side'].str.upper(),
+                        df['Price'].astype(float), df['Amount'].astype(float), df['Value'].astype(float),
+                        df['Strategy'], df['Exchange']))
+                    before = self.count_trades()
+                    self.insert_trades(rows)
+                    counts['trades'] = self.count_trades() - before
+            except Exception as e:
+                self.logger.error(f"Failed to migrate trades from {trade_csv}: {e}")
+
+        if portfolio_csv and os.path.exists(portfolio_csv):
+            try:
+                df = pd.read_csv(portfolio_csv)
+                if not df.empty:
+                    before = self._scalar("SELECT COUNT(*) FROM portfolio_snapshots")
+                    self.insert_snapshots(
+                        (_to_epoch(ts), total, json.loads(details) if isinstance(details, str) else {})
+                        for ts, total, details in zip(df['Timestamp'], df['TotalValueUSD'], df['Details']))
+                    counts['snapshots'] = self._scalar("SELECT COUNT(*) FROM portfolio_snapshots") - before
+            except Exception as e:
+                self.logger.error(f"Failed to migrate portfolio history from {portfolio_csv}: {e}")
+
+        if counts['trades'] or counts['snapshots']:
+            self.logger.info(f"Migrated {counts['trades']} trades and {counts['snapshots']} snapshots into {self.db_path}")
+        return counts
+
+    # --- QUERIES (Dashboard) ---
+
+    def _scalar(self, sql, params=()):
+        with self._lock:
+            return self.conn.execute(sql, params).fetchone()[0]
+
+    def _where(self, symbol=None, start=None, end=None, ts_col='ts'):
+        clauses, params = [], []
+        if symbol:
+            clauses.append("symbol = ?")
+            params.append(symbol)
+        if start is not None:
+            clauses.append(f"{ts_col} >= ?")
+            params.append(_to_epoch(start))
+        if end is not None:
+            clauses.append(f"{ts_col} <= ?")
+            params.append(_to_epoch(end))
+        return (" WHERE " + " AND ".join(clauses)) if clauses else "", params
+
+    def count_trades(self, symbol: Optional[str] = None) -> int:
+        where, params = self._where(symbol)
+        return self._scalar(f"SELECT COUNT(*) FROM trades{where}", params)
+
+    def get_trades(self, page: int = 0, page_size: int = 10, symbol: Optional[str] = None,
+                   start=None, end=None) -> pd.DataFrame:
+        """
+        Newest-first page of trades, with the same columns as the legacy CSV.
+        """
+        where, params = self._where(symbol, start, end)
+        sql = (f"SELECT ts, symbol, side, price, amount, value, strategy, exchange FROM trades{where} "
+               f"ORDER BY ts DESC LIMIT ? OFFSET ?")
+        with self._lock:
+            rows = self.conn.execute(sql, params + [page_size, page * page_size]).fetchall()
+        df = pd.DataFrame(rows, columns=['Timestamp', 'Symbol', 'Side', 'Price', 'Amount', 'Value', 'Strategy', 'Exchange'])
+        df.insert(1, 'Date', _from_epoch(df['Timestamp']).dt.strftime('%Y-%m-%d %H:%M:%S'))
+        return df[TRADE_COLUMNS]
+
+    def get_portfolio_history(self, start=None, end=None, max_points: Optional[int] = None) -> pd.DataFrame:
+        """
+        Portfolio value series for charting (Timestamp, TotalValueUSD).
+        max_points: Downsample evenly (by row id stride) for long ranges; the newest
+        snapshot is always kept so the series ends at the current value.
+        """
+        where, params = self._where(start=start, end=end)
+        stride = 1
+        total = self._scalar(f"SELECT COUNT(*) FROM portfolio_snapshots{where}", params)
+        if max_points and total > 1:
+            # Points 0, stride, 2*stride, ... plus the last stay within max_points
+            stride = max(1, -(-(total - 1) // max(1, max_points - 1)))
+        sql = (f"SELECT ts, total_value_usd FROM ("
+               f"SELECT ts, total_value_usd, ROW_NUMBER() OVER (ORDER BY ts) - 1 AS rn "
+               f"FROM portfolio_snapshots{where}) WHERE rn % ? = 0 OR rn = ? ORDER BY ts")
+        with self._lock:
+            rows = self.conn.execute(sql, params + [stride, total - 1]).fetchall()
+        df = pd.DataFrame(rows, columns=['Timestamp', 'TotalValueUSD'])
+        df['Timestamp'] = _from_epoch(df['Timestamp'])
+        return df
+
+    def get_latest_portfolio_value(self) -> Optional[float]:
+        with self._lock:
+            row = self.conn.execute(
+                "SELECT total_value_usd FROM portfolio_snapshots ORDER BY ts DESC LIMIT 1").fetchone()
+        return row[0] if row else None
+
+    def get_holdings_history(self, symbol: Optional[str] = None, start=None, end=None) -> pd.DataFrame:
+        """
+        Per-asset value over time in long format (Timestamp, Symbol, ValueUSD).
+        """
+        where, params = self._where(symbol, start, end)
+        sql = f"SELECT ts, symbol, value_usd FROM holdings{where} ORDER BY ts"
+        with self._lock:
+            rows = self.conn.execute(sql, params).fetchall()
+        df = pd.DataFrame(rows, columns=['Timestamp', 'Symbol', 'ValueUSD'])
+        df['Timestamp'] = _from_epoch(df['Timestamp'])
+        return df
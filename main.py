@@ -14,12 +14,16 @@ from strategy.ema_strategy import EMAStrategy
 from strategy.keltner_strategy import KeltnerStrategy
 from strategy.combined_strategy import CombinedStrategy
 from strategy.ml_strategy import MLStrategy 
+from ml.inference_service import InferenceService
 from execution.order_executor import OrderExecutor
 from execution.paper_wallet import PaperWallet
 from risk.risk_manager import RiskManager
 from utils.logger import setup_logger
 from data.trade_recorder import TradeRecorder 
 from data.data_storage import DataStorage
+from data.book_recorder import BookRecorder
+from data.council_state import CouncilStateStore
+from utils import vesper_backend
 from utils.telegram_bot import TelegramBot
 
 
@@ -86,9 +90,10 @@ class TelegramStateProvider:
         summary += "Fetch live data via Dashboard."
         return summary
     
-async def process_commands(cmd_file, clients, trading_pairs, risk_manager, paper_wallet, logger, is_paper, slippage, fee, create_strategy_fn):
+async def process_commands(cmd_file, clients, trading_pairs, risk_manager, paper_wallet, logger, is_paper, slippage, fee, create_strategy_fn,
+                           inference_service=None):
     """
-    Check for external commands (ADD_PAIR, REMOVE_PAIR) from dashboard/telegram.
+    Check for external commands (ADD_PAIR, REMOVE_PAIR, SET_MODEL) from dashboard/telegram.
     """
     if not os.path.exists(cmd_file):
         return
@@ -151,6 +156,17 @@ async def process_commands(cmd_file, clients, trading_pairs, risk_manager, paper
                 else:
                     logger.info(f"Command ignored: {symbol} not found.")
 
+            elif action in ('SET_MODEL', 'RELOAD_MODEL'):
+                # Active Model Selector / retrained model: loaded and validated in the background,
+                # every MLStrategy switches on its next candle (RELOAD_MODEL defaults to the served model)
+                model_name = cmd.get('model')
+                if inference_service is None:
+                    logger.warning(f"Command ignored: {action} requires STRATEGY_TYPE=ML.")
+                elif action == 'SET_MODEL' and not model_name:
+                    logger.warning("Command ignored: SET_MODEL without a model name.")
+                elif inference_service.request_reload(model_name):
+                    logger.info(f"🧠 Loading model {model_name or inference_service.active_name} in the background...")
+
     except Exception as e:
         logger.error(f"Command processing error: {e}")
 
@@ -159,10 +175,13 @@ async def main():
         STATUS_FILE_LIVE, STATUS_FILE_PAPER,
         TRADE_HISTORY_LIVE, TRADE_HISTORY_PAPER,
         PORTFOLIO_HISTORY_LIVE, PORTFOLIO_HISTORY_PAPER,
+        TRADE_DB_LIVE, TRADE_DB_PAPER, BOOK_RECORDER_ENABLED,
         DEFAULT_PAPER_CAPITAL, DEFAULT_WATCHLIST_PAPER,
         DEFAULT_SYMBOL, DEFAULT_TIMEFRAME,
         PAPER_TRADING_ENV_VAR,
-        SETTINGS_FILE, MAIN_LOOP_DELAY, COMMANDS_FILE 
+        SETTINGS_FILE, MAIN_LOOP_DELAY, COMMANDS_FILE,
+        MODEL_WATCH_ENABLED, MODEL_WATCH_SETTLE_SECONDS, WARMUP_CANDLES, WARMUP_MAX_GAP,
+        COUNCIL_STATE_ENABLED, COUNCIL_STATE_INTERVAL
     )
 
     # Parse Args
@@ -175,6 +194,8 @@ async def main():
     parser.add_argument('--slippage', type=float, default=0.0, help="Simulated slippage (%%)")
     parser.add_argument('--fee', type=float, default=0.0, help="Simulated exchange fee (%%)")
     parser.add_argument('--model-name', type=str, default='ppo_model', help="Name of the PPO model to load (from models/)")
+    parser.add_argument('--allow-unnormalized', action='store_true',
+                        help="Serve a model even if its normalization stats are missing or unusable")
     args = parser.parse_args()
     print(f"DEBUG: Args: {args}")
 
@@ -185,6 +206,7 @@ async def main():
     status_file = STATUS_FILE_PAPER if IS_PAPER else STATUS_FILE_LIVE
     trade_file = TRADE_HISTORY_PAPER if IS_PAPER else TRADE_HISTORY_LIVE
     port_file = PORTFOLIO_HISTORY_PAPER if IS_PAPER else PORTFOLIO_HISTORY_LIVE
+    trade_db = TRADE_DB_PAPER if IS_PAPER else TRADE_DB_LIVE
     
     logger = setup_logger("Main")
     if IS_PAPER:
@@ -192,6 +214,9 @@ async def main():
     else:
         logger.info("🚀 STARTING IN LIVE TRADING MODE")
 
+    # Compile (or load cached) Vesper kernels now so the first candle doesn't pay for it
+    vesper_backend.warmup()
+
     start_time = datetime.now()
 
     # --- Signal Handling for Graceful Shutdown ---
@@ -230,8 +255,17 @@ async def main():
     if IS_PAPER:
         paper_wallet = PaperWallet(initial_capital=args.capital, initial_holdings=initial_holdings)
     
-    recorder = TradeRecorder(filename=trade_file, portfolio_filename=port_file) 
+    recorder = TradeRecorder(filename=trade_file, portfolio_filename=port_file, db_path=trade_db) 
     data_storage = DataStorage()
+    book_recorder = BookRecorder() if BOOK_RECORDER_ENABLED else None
+    council_states = CouncilStateStore() if COUNCIL_STATE_ENABLED else None
+    state_write = None  # Background snapshot write in flight
+
+    # Shared, batched model inference for every MLStrategy (hot-swapped by SET_MODEL)
+    inference_service = None
+    if STRATEGY_TYPE == 'ML':
+        inference_service = InferenceService(allow_unnormalized=args.allow_unnormalized)
+        inference_service.set_model(args.model_name)
     
     # Helper to instantiate strategy
     def create_strategy():
@@ -279,7 +313,8 @@ async def main():
             model_file = f"{args.model_name}.zip"
             if STRATEGY_TYPE == 'ML' and os.path.exists(os.path.join(os.getcwd(), 'models', model_file)):
                 # Pass peer agents for fusion
-                agents.append(MLStrategy(model_path=f"models/{args.model_name}", analyst_agent=analyst, onchain_agent=onchain))
+                agents.append(MLStrategy(model_path=f"models/{args.model_name}", analyst_agent=analyst, onchain_agent=onchain,
+                                         inference_service=inference_service))
                 logger.info(f"  ✓ Chartist Agent (ML: {args.model_name}) initialized")
             else:
                 agents.append(SMAStrategy(short_window=5, long_window=20))
@@ -297,7 +332,7 @@ async def main():
             if STRATEGY_TYPE == 'ML':
                 model_file = f"{args.model_name}.zip"
                 if os.path.exists(os.path.join(os.getcwd(), 'models', model_file)):
-                    return MLStrategy(model_path=f"models/{args.model_name}")
+                    return MLStrategy(model_path=f"models/{args.model_name}", inference_service=inference_service)
                 else:
                     logger.warning(f"ML Model {args.model_name} not found. Falling back to SMAStrategy.")
                     return SMAStrategy(short_window=5, long_window=20)
@@ -434,13 +469,13 @@ async def main():
                         elif isinstance(agent, OnChainAgent):
                              agent.update_watchlist(active_symbols)
 
-        # Initialize Recorder & Storage
-        recorder = TradeRecorder()
+        # Storage (the recorder is created once above; a second instance would start a second writer thread)
         data_storage = DataStorage()
         
         # Timers
         last_portfolio_log = datetime.now() - timedelta(days=1) # Force immediate log
         last_yearly_fetch = datetime.min
+        last_state_snapshot = datetime.now()
         latest_portfolio_value = args.capital if IS_PAPER else 0.0
         
         # Reset Status File immediately to clear old uptime
@@ -464,17 +499,59 @@ async def main():
         tg_bot = TelegramBot(state_provider=state_provider)
         await tg_bot.start()
 
+        async def prime_pair(task):
+            """
+            Warm-up (once per pair, including pairs added later): the strategy is primed in
+            bulk on stored + freshly fetched candles instead of waiting for them live.
+            A valid council state snapshot is restored first, and only the candles newer
+            than it are primed.
+            """
+            task['primed'] = True
+            if 'strategy' not in task:
+                task['strategy'] = create_strategy() # Use factory
+            strategy = task['strategy']
+            if not hasattr(strategy, 'prime'):
+                return
+            symbol = task['symbol']
+            try:
+                ohlcv = await task['client'].fetch_ohlcv(symbol, timeframe=DEFAULT_TIMEFRAME, limit=WARMUP_CANDLES)
+                history = data_storage.load_warmup_history(symbol, ohlcv, DEFAULT_TIMEFRAME, WARMUP_CANDLES,
+                                                           max_gap=WARMUP_MAX_GAP)
+                meta = None
+                if council_states is not None:
+                    try:
+                        meta = council_states.restore(task['client'].exchange_id, symbol, strategy, history)
+                    except Exception as e:
+                        logger.error(f"Council state restore failed for {symbol}, starting cold: {e}")
+                        strategy = task['strategy'] = create_strategy()
+                if meta is not None:
+                    task.update(meta)
+                    logger.info(f"⚡ Restored {symbol} from its council state snapshot")
+                elif len(history):
+                    strategy.prime(history)
+                    logger.info(f"🔥 Primed {symbol} on {len(history)} candles")
+            except Exception as e:
+                logger.error(f"Warm-up failed for {symbol}: {e}")
+
+        def state_meta(task):
+            """Pair metadata kept in its snapshot (no regime-change alert after a restart)."""
+            return {k: task[k] for k in ('last_regime', 'current_regime') if k in task}
+
         # Main Loop
         while True:
             logger.info(f"❤️ Heartbeat: Scanning {len(trading_pairs)} active pairs...")
             
-            for task in trading_pairs:
-                client = task['client']
-                symbol = task['symbol']
-                executor = task['executor']
-                
-                # 1. Fetch Data
-                ohlcv = await client.fetch_ohlcv(symbol, timeframe=DEFAULT_TIMEFRAME)
+            pairs = list(trading_pairs)
+
+            # 0. Warm-up of new pairs (all concurrently)
+            unprimed = [t for t in pairs if not t.get('primed')]
+            if unprimed:
+                await asyncio.gather(*(prime_pair(t) for t in unprimed))
+
+            # 1. Fetch Data (all pairs concurrently)
+            ohlcvs = await asyncio.gather(*(t['client'].fetch_ohlcv(t['symbol'], timeframe=DEFAULT_TIMEFRAME) for t in pairs))
+            due = []
+            for task, ohlcv in zip(pairs, ohlcvs):
                 if not ohlcv:
                     continue
 
@@ -488,13 +565,21 @@ async def main():
                     'close': last_candle_data[4],
                     'volume': last_candle_data[5]
                 }
-
-                # 2. Strategy
                 if 'strategy' not in task:
                     task['strategy'] = create_strategy() # Use factory
-                
+                due.append((task, candle))
+
+            # 2. Strategy: every due pair in one gather, so MLStrategy pairs share one
+            # batched forward pass through the inference service
+            signals = await asyncio.gather(*(t['strategy'].on_candle(c) for t, c in due))
+
+            # 3. Act on signals one pair at a time (balance reads and risk checks must not interleave)
+            for (task, candle), trade_signal in zip(due, signals):
+                client = task['client']
+                symbol = task['symbol']
+                executor = task['executor']
                 local_strategy = task['strategy']
-                trade_signal = await local_strategy.on_candle(candle)
+                task['last_candle'] = candle
 
                 # Capture Council Meta-Data for Dashboard (Post-Intelligence Upgrade)
                 if hasattr(local_strategy, 'current_regime'):
@@ -507,6 +592,9 @@ async def main():
                 
                 if hasattr(local_strategy, 'agent_weights'):
                     task['agent_weights'] = local_strategy.agent_weights
+                
+                if hasattr(local_strategy, 'indicator_stats'):
+                    task['indicator_stats'] = local_strategy.indicator_stats()
 
                 if trade_signal:
                     logger.info(f"Signal for {symbol}: {trade_signal}")
@@ -543,12 +631,16 @@ async def main():
                         
                     ticker = await client.fetch_ticker(symbol)
                     current_price = ticker.get('last')
+                    if book_recorder:
+                        book_recorder.record_ticker(client.exchange_id, symbol, ticker)
 
                     # Validate with CORRECT balance
                     if risk_manager.validate_trade(trade_signal, action_balance, current_price):
                         
                         # --- Expansion 6: Liquidity Awareness ---
                         order_book = await client.fetch_order_book(symbol)
+                        if book_recorder:
+                            book_recorder.record_order_book(client.exchange_id, symbol, order_book)
                         impact = await client.get_price_impact(symbol, 1.0, trade_signal['side']) # Probe with small size
                         
                         # Calculate Amount with order book adjustment
@@ -664,7 +756,9 @@ async def main():
                     'council_mode': args.council,
                     'council_data': council_data,
                     'portfolio_value': latest_portfolio_value,
-                    'initial_capital': args.capital
+                    'initial_capital': args.capital,
+                    'indicator_cache': {t['symbol']: t['indicator_stats'] for t in trading_pairs if 'indicator_stats' in t},
+                    'inference': inference_service.stats() if inference_service else None
                 }
                 # Atomic Write
                 temp_file = status_file + '.tmp'
@@ -680,7 +774,12 @@ async def main():
 
             # --- Process External Commands (Dynamic Pairs) ---
             await process_commands(COMMANDS_FILE, clients, trading_pairs, risk_manager, 
-                                   paper_wallet, logger, IS_PAPER, args.slippage, args.fee, create_strategy)
+                                   paper_wallet, logger, IS_PAPER, args.slippage, args.fee, create_strategy,
+                                   inference_service=inference_service)
+
+            # --- Model Watcher: retrained served model in models/ -> background reload ---
+            if inference_service and MODEL_WATCH_ENABLED:
+                inference_service.check_for_updates(settle_seconds=MODEL_WATCH_SETTLE_SECONDS)
             
             # --- Interval Updates (Graphs) ---
             now = datetime.now()
@@ -764,6 +863,21 @@ async def main():
                      logger.info("Yearly & Intraday Data Update Complete.")
                  except Exception as e:
                     logger.error(f"Error in data update: {e}")
+
+            # 3. Council State Snapshots: pickled here between candles, compressed and written off the loop
+            if council_states is not None and (now - last_state_snapshot).total_seconds() >= COUNCIL_STATE_INTERVAL \
+                    and (state_write is None or state_write.done()):
+                payloads = []
+                for t in trading_pairs:
+                    if not t.get('primed') or 'strategy' not in t:
+                        continue
+                    try:
+                        payloads.append((council_states.path(t['client'].exchange_id, t['symbol']),
+                                         council_states.dumps(t['strategy'], t.get('last_candle'), state_meta(t))))
+                    except Exception as e:
+                        logger.error(f"Failed to snapshot council state for {t['symbol']}: {e}")
+                state_write = asyncio.create_task(council_states.write_many(payloads))
+                last_state_snapshot = now
                 
                 
                  # --- MANUAL COMMAND PROCESSING ---
@@ -895,7 +1009,18 @@ async def main():
     except Exception as e:
         logger.critical(f"Critical error in main loop: {e}")
     finally:
-        logger.info("Shutting down... Closing exchange connections.")
+        logger.info("Shutting down... Flushing trade recorder.")
+        if council_states is not None:
+            if state_write is not None and not state_write.done():
+                await state_write
+            for t in trading_pairs:
+                if t.get('primed') and 'strategy' in t:
+                    council_states.save(t['client'].exchange_id, t['symbol'], t['strategy'], t.get('last_candle'), state_meta(t))
+            logger.info("Saved council state snapshots.")
+        recorder.close()
+        if book_recorder:
+            book_recorder.close()
+        logger.info("Closing exchange connections.")
         for task in trading_pairs:
             try:
                 await task['client'].close()
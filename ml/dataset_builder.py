@@ -0,0 +1,170 @@
+import os
+import json
+import math
+import shutil
+from functools import partial
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+from concurrent.futures import ProcessPoolExecutor
+from typing import Callable, Dict, List, Optional, Tuple
+from utils.logger import setup_logger
+from data.candle_integrity import scan_candles, infer_timeframe, format_report
+
+DEFAULT_CHUNK_SIZE = 50_000
+DEFAULT_TOLERANCE = 1e-8  # Restart error left in recursive features, relative to the error at the restart
+
+def recursive_warmup(tolerance: float = DEFAULT_TOLERANCE, ema_window: int = 50, wilder_window: int = 14) -> int:
+    """
+    Raw rows to carry into each chunk so the default features agree with a full pass.
+    Windowed features (SMA RSI, Bollinger) are exact once the window fits in the overlap.
+    Recursive ones (EMA_50, MACD, ATR, ADX, Wilder RSI) restart from a different seed
+    on every chunk, and the gap only decays: by (1 - alpha) per row for an EMA, and
+    like (k + 1) * (1 - alpha)^k for ADX (a Wilder average of Wilder averages). The
+    overlap is sized so the slowest of them has shrunk below `tolerance`, plus the
+    rows needed to seed it.
+    """
+    ema_decay = 1 - 2 / (ema_window + 1)
+    ema_rows = math.ceil(math.log(tolerance) / math.log(ema_decay)) + ema_window
+    wilder_decay = 1 - 1 / wilder_window
+    k = 1
+    while (k + 1) * wilder_decay ** k > tolerance:
+        k += 1
+    return max(ema_rows, k + 2 * wilder_window)
+
+DEFAULT_WARMUP = recursive_warmup()  # Raw rows carried into each chunk (~510)
+
+def default_features(df: pd.DataFrame, rsi_method: str = 'sma') -> pd.DataFrame:
+    from ml.feature_engineer import FeatureEngineer
+    return FeatureEngineer(rsi_method=rsi_method).add_technical_indicators(df)
+
+def _symbol_features(symbol: str, csv_path: str, part_path: str, feature_fn: Callable,
+                     chunk_size: int, warmup: int, require_continuous: bool) -> Tuple[str, Optional[str], int]:
+    """
+    Worker: computes features for one symbol chunk by chunk and writes them to a
+    Parquet part file (one row group per chunk). Only one chunk is in memory at a time.
+    A chunk too short for feature_fn (it adds no columns, e.g. FeatureEngineer under
+    50 rows) is carried into the next one instead of being written without features.
+    """
+    logger = setup_logger("DatasetBuilder")
+    try:
+        if require_continuous:
+            ts = pd.read_csv(csv_path, usecols=['timestamp'])
+            ts['timestamp'] = pd.to_datetime(ts['timestamp'])
+            timeframe = infer_timeframe(os.path.basename(csv_path), ts['timestamp'])
+            report = scan_candles(ts, timeframe) if timeframe else None
+            if not report or not report['continuous']:
+                if report:
+                    logger.warning(format_report(f"{csv_path} [{symbol}]", report))
+                logger.error(f"Skipping discontinuous series: {symbol}")
+                return symbol, None, 0
+
+        writer, rows = None, 0
+        carry, emitted = pd.DataFrame(), 0  # Rows carried into the next chunk; the first `emitted` were written
+        for chunk in pd.read_csv(csv_path, chunksize=chunk_size):
+            chunk['timestamp'] = pd.to_datetime(chunk['timestamp'])
+            chunk = chunk.drop(columns=['symbol'], errors='ignore')
+            frame = pd.concat([carry, chunk], ignore_index=True)
+            feats = feature_fn(frame.copy())
+            if feats.columns.difference(frame.columns).empty:
+                carry = frame  # Not enough rows for the features yet
+                continue
+            # Warmup rows were already emitted with the previous chunk
+            feats = feats.loc[feats.index >= emitted]
+            carry = frame.iloc[-warmup:] if warmup else frame.iloc[0:0]
+            emitted = len(carry)
+            if feats.empty:
+                continue
+
+            feats.insert(0, 'symbol', symbol)
+            table = pa.Table.from_pandas(feats, preserve_index=False)
+            if writer is None:
+                writer = pq.ParquetWriter(part_path, table.schema)
+            writer.write_table(table.cast(writer.schema))
+            rows += len(feats)
+
+        if writer is not None:
+            writer.close()
+        if len(carry) > emitted:
+            logger.warning(f"{symbol}: last {len(carry) - emitted} rows too short for features, dropped")
+        return symbol, (part_path if rows else None), rows
+    except Exception as e:
+        logger.error(f"Failed to build features for {symbol}: {e}")
+        return symbol, None, 0
+
+class DatasetBuilder:
+    """
+    Streaming multi-symbol training dataset builder.
+    Features are computed per symbol (no indicator bleed across assets), in chunks
+    with a warmup overlap, in parallel across cores. Windowed features are exact across
+    chunk boundaries; recursive ones match a full pass to within the tolerance the
+    overlap was sized for (see recursive_warmup). Results are streamed into one
+    Parquet file; each symbol is a contiguous episode whose [start, end) row range
+    is stored in the file metadata (see load_training_dataset).
+    """
+    def __init__(self, feature_fn: Callable = default_features, chunk_size: int = DEFAULT_CHUNK_SIZE,
+                 warmup: int = DEFAULT_WARMUP, n_workers: Optional[int] = None):
+        self.logger = setup_logger("DatasetBuilder")
+        self.feature_fn = feature_fn
+        self.chunk_size = chunk_size
+        self.warmup = warmup
+        self.n_workers = n_workers or os.cpu_count() or 1
+
+    def build(self, sources: Dict[str, str], out_path: str, require_continuous: bool = False) -> Optional[str]:
+        """
+        sources: {symbol: candle CSV path}. Returns out_path, or None if no symbol produced rows.
+        """
+        parts_dir = out_path + '.parts'
+        os.makedirs(parts_dir, exist_ok=True)
+        jobs = [(sym, path, os.path.join(parts_dir, f"{i}.parquet"), self.feature_fn,
+                 self.chunk_size, self.warmup, require_continuous)
+                for i, (sym, path) in enumerate(sources.items())]
+        try:
+            if self.n_workers > 1 and len(jobs) > 1:
+                with ProcessPoolExecutor(max_workers=min(self.n_workers, len(jobs))) as pool:
+                    results = list(pool.map(_symbol_features, *zip(*jobs)))
+            else:
+                results = [_symbol_features(*job) for job in jobs]
+            return self._merge(results, out_path)
+        finally:
+            shutil.rmtree(parts_dir, ignore_errors=True)
+
+    def _merge(self, results, out_path) -> Optional[str]:
+        """Streams the part files (row group by row group) into one file with episode metadata."""
+        parts = [(sym, part, rows) for sym, part, rows in results if part]
+        if not parts:
+            self.logger.error("No symbol produced any training rows.")
+            return None
+
+        schema = pq.read_schema(parts[0][1])
+        episodes, start = [], 0
+        for sym, _, rows in parts:
+            episodes.append({'symbol': sym, 'start': start, 'end': start + rows})
+            start += rows
+        schema = schema.with_metadata({**(schema.metadata or {}), b'episodes': json.dumps(episodes).encode()})
+
+        tmp = out_path + '.tmp'
+        with pq.ParquetWriter(tmp, schema) as writer:
+            for _, part, _ in parts:
+                pf = pq.ParquetFile(part)
+                for i in range(pf.num_row_groups):
+                    writer.write_table(pf.read_row_group(i).cast(schema))
+        os.replace(tmp, out_path)
+        self.logger.info(f"Training dataset: {start} rows, {len(episodes)} episodes -> {out_path}")
+        return out_path
+
+def read_episodes(path: str) -> List[Dict]:
+    """Episode boundaries ({'symbol', 'start', 'end'}) stored in a dataset's metadata."""
+    meta = pq.read_schema(path).metadata or {}
+    return json.loads(meta.get(b'episodes', b'[]'))
+
+def load_training_dataset(path: str, columns: Optional[List[str]] = None) -> Tuple[pd.DataFrame, List[Tuple[int, int]]]:
+    """Loads a built dataset and its per-symbol episode bounds as [(start, end), ...]."""
+    df = pq.read_table(path, columns=columns).to_pandas()
+    return df, [(e['start'], e['end']) for e in read_episodes(path)]
+
+def build_training_dataset(sources: Dict[str, str], out_path: str, require_continuous: bool = False,
+                           n_workers: Optional[int] = None, rsi_method: str = 'sma') -> Optional[str]:
+    """Wrapper for DatasetBuilder.build with the default feature set."""
+    builder = DatasetBuilder(feature_fn=partial(default_features, rsi_method=rsi_method), n_workers=n_workers)
+    return builder.build(sources, out_path, require_continuous=require_continuous)
@@ -1,18 +1,22 @@
 import pandas as pd
-import pandas_ta as ta
 from typing import List
 from sklearn.preprocessing import StandardScaler # Changed from MinMaxScaler
 from utils.logger import setup_logger
-from utils.vesper_math import v_rsi, v_bollinger
+from utils.vesper_math import v_rsi, v_bollinger, v_ema, v_macd, v_atr, v_adx
 
 class FeatureEngineer:
-    def __init__(self):
+    def __init__(self, rsi_method: str = 'sma'):
+        """
+        rsi_method: 'sma' (Vesper v1, what existing models were trained on) or 'wilder' (exact, pandas_ta).
+        """
         self.logger = setup_logger("FeatureEngineer")
+        self.rsi_method = rsi_method
         self.scaler = StandardScaler() # Standard scaling (mean=0, std=1) is better for PPO
 
     def add_technical_indicators(self, df: pd.DataFrame) -> pd.DataFrame:
         """
-        Adds technical indicators to the DataFrame using pandas-ta.
+        Adds technical indicators to the DataFrame using Vesper Core kernels.
+        Column names follow pandas-ta so existing models keep their feature layout.
         Expected columns: open, high, low, close, volume
         """
         if df.empty:
@@ -25,13 +29,15 @@ class FeatureEngineer:
              return df
 
         # Use Vesper Core for speed (vectorized NumPy math)
-        closes = df['close'].values
+        closes = df['close'].to_numpy(dtype=float)
+        highs = df['high'].to_numpy(dtype=float)
+        lows = df['low'].to_numpy(dtype=float)
         
         # RSI (Vesper Optimized)
-        df['RSI'] = v_rsi(closes, window=14)
+        df['RSI'] = v_rsi(closes, window=14, method=self.rsi_method)
         
-        # EMA (Pandas-TA C-optimization since v_ema is not implemented)
-        df['EMA_50'] = df.ta.ema(length=50)
+        # EMA (Vesper IIR filter)
+        df['EMA_50'] = v_ema(closes, 50)
         
         # Bollinger Bands (Vesper Optimized)
         upper, mid, lower = v_bollinger(closes, window=20, num_std=2.0)
@@ -39,19 +45,20 @@ class FeatureEngineer:
         df['BBU_20_2.0'] = upper
         df['BBL_20_2.0'] = lower
 
-        # Remaining complex indicators still use Pandas-TA for now
         # MACD
-        macd = df.ta.macd(fast=12, slow=26, signal=9)
-        if macd is not None:
-            df = pd.concat([df, macd], axis=1)
+        macd, hist, signal = v_macd(closes, fast=12, slow=26, signal=9)
+        df['MACD_12_26_9'] = macd
+        df['MACDh_12_26_9'] = hist
+        df['MACDs_12_26_9'] = signal
 
-        # ATR (Volatility)
-        df['ATR'] = df.ta.atr(length=14)
+        # ATR (Volatility, Wilder)
+        df['ATR'] = v_atr(highs, lows, closes, 14)
         
         # ADX (Trend Strength)
-        adx = df.ta.adx(length=14)
-        if adx is not None:
-             df = pd.concat([df, adx], axis=1) # Adds ADX_14, DMP_14, DMN_14
+        adx, dmp, dmn = v_adx(highs, lows, closes, 14)
+        df['ADX_14'] = adx
+        df['DMP_14'] = dmp
+        df['DMN_14'] = dmn
 
         # Drop NaNs created by indicators
         df.dropna(inplace=True)
@@ -0,0 +1,198 @@
+import os
+import json
+import pickle
+import numpy as np
+import pandas as pd
+from datetime import datetime, timezone
+from typing import Any, Dict, List, Optional
+from ml.feature_stream import FeatureStream, FrozenScaler, FEATURE_COLUMNS, INDICATOR_PARAMS
+from utils.logger import setup_logger
+
+"""
+FEATURE PIPELINE: The versioned feature contract between a model and its inference
+-----------------------------------------------------------------------------------
+Saved next to each model as <model>_pipeline.json when it is trained, and replayed
+by MLStrategy when it is served. It records:
+    columns       feature columns in the order the model observes them
+    indicators    indicator parameters (FeatureStream / FeatureEngineer)
+    scaler        FrozenScaler statistics fitted on the training features
+    obs_norm      VecNormalize observation statistics (mean, var, clip, epsilon)
+so inference needs neither a dummy TradingEnv nor a refit, and builds the same
+observation every time.
+"""
+
+PIPELINE_VERSION = 1
+OBS_PREFIX = ['balance', 'holdings']  # Account fields TradingEnv puts before the features
+INFERENCE_BALANCE = 10000.0  # MLStrategy observes a flat 10k account
+
+class FeaturePipeline:
+    """Columns, indicator parameters, scaler and observation normalization of one model."""
+    def __init__(self, columns: Optional[List[str]] = None, indicators: Optional[Dict[str, Dict[str, Any]]] = None,
+                 scaler: Optional[FrozenScaler] = None, obs_norm: Optional[Dict[str, Any]] = None,
+                 version: int = PIPELINE_VERSION, created_at: Optional[str] = None):
+        if version > PIPELINE_VERSION:
+            raise ValueError(f"Feature pipeline v{version} is newer than supported v{PIPELINE_VERSION}")
+        self.version = version
+        self.columns = list(columns or FEATURE_COLUMNS)
+        unknown = [c for c in self.columns if c not in FEATURE_COLUMNS]
+        if unknown:
+            raise ValueError(f"Feature pipeline columns not produced by FeatureStream: {unknown}")
+        self.indicators = {name: dict(p) for name, p in INDICATOR_PARAMS.items()}
+        for name, p in (indicators or {}).items():
+            self.indicators.setdefault(name, {}).update(p)
+        self.scaler = scaler
+        self.obs_norm = obs_norm
+        self.created_at = created_at or datetime.now(timezone.utc).isoformat()
+        # Positions of self.columns in a FeatureStream vector
+        self._order = np.array([FEATURE_COLUMNS.index(c) for c in self.columns], dtype=int)
+        self._set_norm_arrays()
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, rsi_method: str = 'sma', scale: bool = True) -> 'FeaturePipeline':
+        """
+        Pipeline of a training feature frame (FeatureEngineer output): its numeric columns,
+        in the order TradingEnv observes them, and a scaler fitted on them.
+        """
+        columns = list(df.select_dtypes(include=[np.number]).columns)
+        return cls(columns=columns, indicators={'rsi': {'method': rsi_method}},
+                   scaler=FrozenScaler.fit(df) if scale else None)
+
+    @classmethod
+    def from_vec_normalize(cls, stats_path: str, rsi_method: str = 'sma') -> 'FeaturePipeline':
+        """
+        Pipeline for a model trained before pipelines existed: default columns, no scaler,
+        and the observation statistics unpickled from its vec_normalize.pkl
+        (stable-baselines3 must be importable to unpickle it).
+        """
+        pipeline = cls(indicators={'rsi': {'method': rsi_method}})
+        with open(stats_path, 'rb') as f:
+            vec_normalize = pickle.load(f)
+        pipeline.set_obs_normalization(vec_normalize)
+        return pipeline
+
+    def set_obs_normalization(self, vec_normalize):
+        """Copies observation statistics from a (trained) VecNormalize."""
+        if not getattr(vec_normalize, 'norm_obs', True):
+            self.obs_norm = None
+        else:
+            self.obs_norm = {
+                'mean': np.asarray(vec_normalize.obs_rms.mean, dtype=float).tolist(),
+                'var': np.asarray(vec_normalize.obs_rms.var, dtype=float).tolist(),
+                'clip': float(vec_normalize.clip_obs),
+                'epsilon': float(vec_normalize.epsilon),
+            }
+        self._set_norm_arrays()
+
+    def _set_norm_arrays(self):
+        if self.obs_norm:
+            if len(self.obs_norm['mean']) != self.obs_size:
+                raise ValueError(f"Normalization stats cover {len(self.obs_norm['mean'])} observation fields, "
+                                 f"the pipeline builds {self.obs_size}")
+            self._norm_mean = np.asarray(self.obs_norm['mean'], dtype=float)
+            self._norm_std = np.sqrt(np.asarray(self.obs_norm['var'], dtype=float) + self.obs_norm['epsilon'])
+        else:
+            self._norm_mean = self._norm_std = None
+
+    @property
+    def rsi_method(self) -> str:
+        return self.indicators['rsi']['method']
+
+    @property
+    def obs_size(self) -> int:
+        return len(OBS_PREFIX) + len(self.columns)
+
+    def stream(self) -> FeatureStream:
+        """A fresh FeatureStream with this pipeline's indicator parameters."""
+        return FeatureStream(params=self.indicators)
+
+    def observation(self, vector: np.ndarray, balance: float = INFERENCE_BALANCE, holdings: float = 0.0,
+                    normalize: bool = True) -> np.ndarray:
+        """
+        Model observation from a FeatureStream vector: features reordered and scaled,
+        account fields prepended, then normalized and clipped as VecNormalize does
+        (normalize=False leaves that to a runtime that normalizes itself).
+        """
+        features = np.asarray(vector, dtype=float)[self._order]
+        if self.scaler is not None:
+            features = self.scaler.transform(features, self.columns)
+        obs = np.concatenate(([balance, holdings], features))
+        if normalize and self._norm_mean is not None:
+            clip = self.obs_norm['clip']
+            obs = np.clip((obs - self._norm_mean) / self._norm_std, -clip, clip)
+        return obs.astype(np.float32)
+
+    def observations(self, vectors: np.ndarray, balances: Any = INFERENCE_BALANCE, holdings: Any = 0.0,
+                     normalize: bool = True) -> np.ndarray:
+        """
+        observation() for a (rows, features) stack of FeatureStream vectors, one row per
+        symbol: reorder, scale and normalize are each one array operation on the batch.
+        balances / holdings are scalars or one value per row.
+        """
+        features = np.asarray(vectors, dtype=float).reshape(-1, len(FEATURE_COLUMNS))[:, self._order]
+        if self.scaler is not None:
+            features = self.scaler.transform(features, self.columns)
+        n = len(features)
+        account = np.column_stack((np.broadcast_to(balances, n), np.broadcast_to(holdings, n)))
+        obs = np.hstack((account, features))
+        if normalize and self._norm_mean is not None:
+            clip = self.obs_norm['clip']
+            obs = np.clip((obs - self._norm_mean) / self._norm_std, -clip, clip)
+        return obs.astype(np.float32)
+
+    def to_dict(self) -> Dict[str, Any]:
+        return {
+            'version': self.version,
+            'created_at': self.created_at,
+            'columns': self.columns,
+            'indicators': self.indicators,
+            'scaler': self.scaler.to_dict() if self.scaler is not None else None,
+            'obs_norm': self.obs_norm,
+        }
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Any]) -> 'FeaturePipeline':
+        scaler = FrozenScaler.from_dict(data['scaler']) if data.get('scaler') else None
+        return cls(columns=data['columns'], indicators=data.get('indicators'), scaler=scaler,
+                   obs_norm=data.get('obs_norm'), version=data.get('version', 1), created_at=data.get('created_at'))
+
+    def save(self, path: str):
+        """Writes the pipeline atomically (temp file + rename)."""
+        tmp = path + ".tmp"
+        with open(tmp, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+        os.replace(tmp, path)
+
+    @classmethod
+    def load(cls, path: str) -> 'FeaturePipeline':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
+
+def pipeline_path(model_path: str) -> str:
+    """The pipeline saved next to a model (model_path without the .zip)."""
+    return f"{model_path}_pipeline.json"
+
+def load_pipeline(model_path: str, legacy_stats_path: Optional[str] = None,
+                  allow_unnormalized: bool = False) -> FeaturePipeline:
+    """
+    Pipeline of the model at model_path. Models trained before pipelines existed fall
+    back to their VecNormalize statistics (legacy_stats_path).
+    Raises if neither exists or the one found cannot be loaded (e.g. stats of another
+    observation layout): a model fed unnormalized observations trades on garbage.
+    allow_unnormalized: log the problem and serve the default columns unnormalized instead.
+    """
+    logger = setup_logger("FeaturePipeline")
+    path = pipeline_path(model_path)
+    try:
+        if os.path.exists(path):
+            pipeline = FeaturePipeline.load(path)
+            logger.info(f"Loaded feature pipeline v{pipeline.version} from {path}")
+            return pipeline
+        if legacy_stats_path and os.path.exists(legacy_stats_path):
+            logger.warning(f"No feature pipeline at {path}; using legacy normalization stats {legacy_stats_path}")
+            return FeaturePipeline.from_vec_normalize(legacy_stats_path)
+        raise FileNotFoundError(f"No feature pipeline or normalization stats for {model_path}")
+    except Exception as e:
+        if not allow_unnormalized:
+            raise
+        logger.error(f"Failed to load feature pipeline for {model_path}: {e}; observations are unnormalized")
+    return FeaturePipeline()
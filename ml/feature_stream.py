@@ -0,0 +1,173 @@
+import json
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, List, Optional, Sequence
+from utils.ring_buffer import OHLCVBuffer
+from utils.vesper_stream import StreamingRSI, StreamingEMA, StreamingBollinger, StreamingMACD, StreamingATR, StreamingADX
+
+"""
+FEATURE STREAM: O(1) per-candle model features for MLStrategy inference
+-----------------------------------------------------------------------
+FeatureStream keeps Vesper Stream state for every FeatureEngineer indicator and
+emits the latest feature row as a NumPy vector: same columns, same order as the
+numeric columns of FeatureEngineer.add_technical_indicators (what TradingEnv
+observes during training), with no DataFrame per candle.
+
+FrozenScaler holds StandardScaler statistics fitted once on the training
+features and saved with the model; inference only applies them.
+"""
+
+# Numeric FeatureEngineer columns in the order TradingEnv observes them
+FEATURE_COLUMNS = [
+    'open', 'high', 'low', 'close', 'volume',
+    'RSI', 'EMA_50', 'BBM_20_2.0', 'BBU_20_2.0', 'BBL_20_2.0',
+    'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9',
+    'ATR', 'ADX_14', 'DMP_14', 'DMN_14',
+]
+# Columns standardized for the model (the former per-candle scale_data columns)
+SCALED_COLUMNS = ['open', 'high', 'low', 'close', 'volume', 'RSI', 'ATR']
+# FeatureEngineer indicator parameters (the column names above encode them)
+INDICATOR_PARAMS = {
+    'rsi': {'window': 14, 'method': 'sma'},
+    'ema': {'window': 50},
+    'bollinger': {'window': 20, 'num_std': 2.0},
+    'macd': {'fast': 12, 'slow': 26, 'signal': 9},
+    'atr': {'window': 14},
+    'adx': {'window': 14},
+}
+
+class FeatureStream:
+    """
+    Incremental FeatureEngineer: update(candle) returns the newest feature vector
+    (FEATURE_COLUMNS order) or None while any indicator is still warming up
+    (the rows FeatureEngineer drops as NaN). A missing or NaN OHLCV field is a gap:
+    the indicators skip it as the batch kernels do, so vectors resume once it has
+    left the rolling windows (at most 20 candles, the Bollinger window).
+    """
+    def __init__(self, rsi_method: str = 'sma', params: Optional[Dict[str, Dict[str, Any]]] = None):
+        """
+        params: indicator parameters overriding INDICATOR_PARAMS (e.g. a FeaturePipeline's);
+        rsi_method applies unless params['rsi'] sets a method.
+        """
+        self.params = {name: dict(p) for name, p in INDICATOR_PARAMS.items()}
+        self.params['rsi']['method'] = rsi_method
+        for name, p in (params or {}).items():
+            self.params[name].update(p)
+        self.rsi_method = self.params['rsi']['method']
+        self.columns = list(FEATURE_COLUMNS)
+        self.rsi = StreamingRSI(**self.params['rsi'])
+        self.ema = StreamingEMA(**self.params['ema'])
+        self.bollinger = StreamingBollinger(**self.params['bollinger'])
+        self.macd = StreamingMACD(**self.params['macd'])
+        self.atr = StreamingATR(**self.params['atr'])
+        self.adx = StreamingADX(**self.params['adx'])
+        self.candles_seen = 0
+        self.vector: Optional[np.ndarray] = None  # Last complete feature vector
+
+    def update(self, candle: Dict[str, Any]) -> Optional[np.ndarray]:
+        open_, high, low, close, volume = (OHLCVBuffer._value(candle.get(f)) for f in FEATURE_COLUMNS[:5])
+        rsi = self.rsi.update(close)
+        ema = self.ema.update(close)
+        upper, mid, lower = self.bollinger.update(close)
+        macd, hist, signal = self.macd.update(close)
+        atr = self.atr.update((high, low, close))
+        adx, dmp, dmn = self.adx.update((high, low, close))
+        self.candles_seen += 1
+
+        vector = np.array([
+            open_, high, low, close, volume,
+            rsi, ema, mid, upper, lower, macd, hist, signal, atr, adx, dmp, dmn,
+        ], dtype=float)
+        if np.isnan(vector).any():
+            return None
+        self.vector = vector
+        return vector
+
+    def prime(self, history: pd.DataFrame):
+        """
+        Bulk warm-up on past candles: each indicator is primed with whole columns
+        (Vesper Stream prime), leaving the state and last vector update() would.
+        """
+        if not len(history):
+            return
+        high, low, close = (history[c].to_numpy(dtype=float) for c in ('high', 'low', 'close'))
+        hlc = np.column_stack((high, low, close))
+        self.rsi.prime(close)
+        self.ema.prime(close)
+        self.bollinger.prime(close)
+        self.macd.prime(close)
+        self.atr.prime(hlc)
+        self.adx.prime(hlc)
+        self.candles_seen += len(history)
+
+        last = history.iloc[-1]
+        upper, mid, lower = self.bollinger.value
+        macd, hist, signal = self.macd.value
+        adx, dmp, dmn = self.adx.value
+        vector = np.array([
+            last['open'], high[-1], low[-1], close[-1], last['volume'],
+            self.rsi.value, self.ema.value, mid, upper, lower, macd, hist, signal, self.atr.value, adx, dmp, dmn,
+        ], dtype=float)
+        if not np.isnan(vector).any():
+            self.vector = vector
+
+    def as_dict(self) -> Dict[str, float]:
+        """Last feature vector by column name (empty while warming up)."""
+        if self.vector is None:
+            return {}
+        return dict(zip(self.columns, self.vector.tolist()))
+
+class FrozenScaler:
+    """
+    StandardScaler statistics frozen at training time: (x - mean) / scale on a
+    subset of the feature columns, the rest pass through.
+    """
+    def __init__(self, columns: Sequence[str], mean: Sequence[float], scale: Sequence[float]):
+        self.columns = list(columns)
+        self.mean = np.asarray(mean, dtype=float)
+        self.scale = np.asarray(scale, dtype=float)
+        self._positions: Dict[tuple, np.ndarray] = {}
+
+    @classmethod
+    def fit(cls, df: pd.DataFrame, columns: Sequence[str] = SCALED_COLUMNS) -> 'FrozenScaler':
+        """Fits on a training feature frame (population std, zero std -> 1, as StandardScaler)."""
+        columns = [c for c in columns if c in df.columns]
+        values = df[columns].to_numpy(dtype=float)
+        mean = values.mean(axis=0)
+        scale = values.std(axis=0)
+        scale[scale == 0] = 1.0
+        return cls(columns, mean, scale)
+
+    def transform(self, vector: np.ndarray, feature_columns: Sequence[str] = FEATURE_COLUMNS) -> np.ndarray:
+        """
+        Scales a feature vector, or a (rows, features) matrix, laid out as feature_columns
+        (returns a new array).
+        """
+        key = tuple(feature_columns)
+        if key not in self._positions:
+            self._positions[key] = np.array([list(feature_columns).index(c) for c in self.columns], dtype=int)
+        out = np.array(vector, dtype=float)
+        idx = self._positions[key]
+        out[..., idx] = (out[..., idx] - self.mean) / self.scale
+        return out
+
+    def transform_frame(self, df: pd.DataFrame) -> pd.DataFrame:
+        """Scales the scaler's columns of a feature frame in place (training observations)."""
+        df[self.columns] = (df[self.columns].to_numpy(dtype=float) - self.mean) / self.scale
+        return df
+
+    def to_dict(self) -> Dict[str, List]:
+        return {'columns': self.columns, 'mean': self.mean.tolist(), 'scale': self.scale.tolist()}
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, List]) -> 'FrozenScaler':
+        return cls(data['columns'], data['mean'], data['scale'])
+
+    def save(self, path: str):
+        with open(path, 'w') as f:
+            json.dump(self.to_dict(), f, indent=2)
+
+    @classmethod
+    def load(cls, path: str) -> 'FrozenScaler':
+        with open(path, 'r') as f:
+            return cls.from_dict(json.load(f))
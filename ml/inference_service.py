@@ -0,0 +1,302 @@
+import os
+import time
+import asyncio
+import weakref
+import numpy as np
+import pandas as pd
+from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+from ml.feature_pipeline import FeaturePipeline, load_pipeline, pipeline_path, INFERENCE_BALANCE
+from ml.policy_runtime import load_policy, policy_path
+from utils.logger import setup_logger
+
+"""
+INFERENCE SERVICE: One batched forward pass per cycle for every MLStrategy
+--------------------------------------------------------------------------
+Every pair running MLStrategy used to build, normalize and predict its own
+observation. The service is shared by all of them instead:
+    predict()   queues a pair's feature vector and awaits its action
+    _flush()    runs once per event-loop pass (call_soon), after every pair whose
+                strategy runs in the same asyncio.gather has queued its vector;
+                the queued vectors are stacked, turned into observations by the
+                pipeline in one array operation and sent through one forward pass
+    set_model() loads a model (pipeline + policy) once and swaps it in for all
+                pairs (used at startup)
+
+Hot reload (SET_MODEL from the dashboard's Active Model Selector, RELOAD_MODEL, or
+check_for_updates() noticing newer files of the served model in models/):
+request_reload() loads the model in a worker thread, validates it on the recent
+candles of the registered MLStrategy instances and swaps the active reference.
+The trading loop never waits for it; strategies pick the new model up on their
+next candle.
+"""
+
+VALIDATION_CANDLES = 200  # Recent candles each MLStrategy keeps for validating a reloaded model
+
+def model_files(model_path: str) -> List[str]:
+    """Files that make up a saved model (those that exist)."""
+    candidates = [model_path + ".zip", policy_path(model_path), pipeline_path(model_path)]
+    return [p for p in candidates if os.path.exists(p)]
+
+def model_mtime(model_path: str) -> float:
+    """Newest modification time of a model's files (0 when it has none)."""
+    return max((os.path.getmtime(p) for p in model_files(model_path)), default=0.0)
+
+class ServedModel:
+    """A loaded model: its feature pipeline and its policy (exported runtime or SB3 PPO)."""
+    def __init__(self, name: str, path: str, pipeline: FeaturePipeline, policy: Any):
+        self.name = name
+        self.path = path
+        self.pipeline = pipeline
+        self.policy = policy
+        # The runtime normalizes with its own embedded stats; SB3 models get pipeline-normalized observations
+        self.normalize_obs = not getattr(policy, 'normalizes', False)
+        self.loaded_at = datetime.now().isoformat()
+        self.mtime = model_mtime(path)
+
+    @property
+    def obs_size(self) -> Optional[int]:
+        """Observation size the policy takes (None if it cannot tell)."""
+        if hasattr(self.policy, 'obs_size'):
+            return self.policy.obs_size
+        space = getattr(self.policy, 'observation_space', None)
+        return int(space.shape[0]) if space is not None else None
+
+    @property
+    def n_actions(self) -> Optional[int]:
+        if hasattr(self.policy, 'n_actions'):
+            return self.policy.n_actions
+        space = getattr(self.policy, 'action_space', None)
+        return int(space.n) if space is not None and hasattr(space, 'n') else None
+
+    def predict_batch(self, vectors: np.ndarray, balances: Any = INFERENCE_BALANCE, holdings: Any = 0.0) -> np.ndarray:
+        """Actions for a (rows, features) stack of FeatureStream vectors."""
+        obs = self.pipeline.observations(vectors, balances, holdings, normalize=self.normalize_obs)
+        actions, _ = self.policy.predict(obs, deterministic=True)
+        return np.asarray(actions).reshape(-1)
+
+def load_model(model_path: str, legacy_stats_path: Optional[str] = None,
+               allow_unnormalized: bool = False) -> Optional[ServedModel]:
+    """
+    Loads the model at model_path (without the .zip): the exported NumPy policy when there
+    is one, otherwise the stable-baselines3 checkpoint (imported only then). None if missing.
+    Raises if its feature pipeline cannot be loaded (see load_pipeline), unless
+    allow_unnormalized or the policy normalizes its observations itself.
+    """
+    logger = setup_logger("InferenceService")
+    if legacy_stats_path is None:
+        legacy_stats_path = os.path.join(os.path.dirname(model_path), 'vec_normalize.pkl')
+    policy = load_policy(model_path)
+    if policy is not None:
+        logger.info(f"Loaded exported policy for {model_path}")
+    elif os.path.exists(model_path + ".zip"):
+        from stable_baselines3 import PPO
+        policy = PPO.load(model_path)
+        logger.info(f"Loaded ML model from {model_path}")
+    else:
+        logger.error(f"Model not found at {model_path}")
+        return None
+    allow_unnormalized = allow_unnormalized or getattr(policy, 'normalizes', False)
+    pipeline = load_pipeline(model_path, legacy_stats_path=legacy_stats_path, allow_unnormalized=allow_unnormalized)
+    return ServedModel(os.path.basename(model_path), model_path, pipeline, policy)
+
+class InferenceService:
+    """
+    In-process, batched policy inference shared by all MLStrategy instances.
+    """
+    def __init__(self, model_dir: str = 'models', allow_unnormalized: bool = False):
+        """allow_unnormalized: serve models whose normalization stats are missing or unusable (see load_pipeline)."""
+        self.logger = setup_logger("InferenceService")
+        self.model_dir = model_dir
+        self.allow_unnormalized = allow_unnormalized
+        self.active: Optional[ServedModel] = None
+        self._pending: List[Tuple[ServedModel, np.ndarray, float, float, asyncio.Future]] = []
+        self._flush_scheduled = False
+        self.batches = 0
+        self.requests = 0
+        self.last_batch_size = 0
+        self._strategies = weakref.WeakSet()  # MLStrategy instances (their recent candles validate reloads)
+        self._reload_task: Optional[asyncio.Task] = None
+        self._rejected: Dict[str, float] = {}  # Model path -> mtime of files that failed to load or validate
+        self.reloads = 0
+        self.last_reload_error: Optional[str] = None
+
+    @property
+    def active_name(self) -> Optional[str]:
+        return self.active.name if self.active is not None else None
+
+    def model_path(self, name: str) -> str:
+        return name if os.path.dirname(name) else os.path.join(self.model_dir, name)
+
+    def register(self, strategy):
+        """Tracks an MLStrategy whose candle history (strategy.history) validates reloads."""
+        self._strategies.add(strategy)
+
+    def set_model(self, name: str) -> bool:
+        """
+        Loads models/<name> once and makes it the model served to every pair.
+        The previous model stays active if loading fails.
+        """
+        path = self.model_path(name)
+        try:
+            served = load_model(path, allow_unnormalized=self.allow_unnormalized)
+        except Exception as e:
+            self.logger.error(f"Failed to load model {name}: {e}")
+            return False
+        if served is None:
+            return False
+        previous = self.active_name
+        self.active = served  # Single reference swap: queued requests keep the model they were made for
+        self.logger.info(f"Serving model {served.name} (was {previous})")
+        return True
+
+    @property
+    def reloading(self) -> bool:
+        return self._reload_task is not None and not self._reload_task.done()
+
+    def request_reload(self, name: Optional[str] = None) -> Optional[asyncio.Task]:
+        """
+        Starts loading models/<name> (default: the served model, re-read from disk) in the
+        background; returns the task, or None if a reload is already running.
+        """
+        name = name or self.active_name
+        if not name:
+            self.logger.warning("Reload ignored: no model name and no model being served")
+            return None
+        if self.reloading:
+            self.logger.warning(f"Reload of {name} ignored: another reload is in progress")
+            return None
+        self._reload_task = asyncio.get_running_loop().create_task(self.reload_model(name))
+        return self._reload_task
+
+    async def reload_model(self, name: str) -> bool:
+        """
+        Loads and validates a model off the event loop, then swaps it in.
+        The served model is untouched if either step fails.
+        """
+        path = self.model_path(name)
+        # Snapshot recent candles on the loop thread (buffers are written by on_candle)
+        histories = [s.history.to_frame() for s in list(self._strategies) if len(s.history)]
+        try:
+            served = await asyncio.to_thread(load_model, path, None, self.allow_unnormalized)
+            error = "model files not found" if served is None else await asyncio.to_thread(self.validate, served, histories)
+        except Exception as e:
+            served, error = None, str(e)
+        if error:
+            self._rejected[path] = model_mtime(path)
+            self.last_reload_error = f"{name}: {error}"
+            self.logger.error(f"Reload of {name} rejected ({error}); still serving {self.active_name}")
+            return False
+
+        previous = self.active_name
+        self.active = served  # Atomic swap: strategies switch on their next candle
+        self.reloads += 1
+        self.last_reload_error = None
+        self._rejected.pop(path, None)
+        self.logger.info(f"Hot-reloaded model {served.name} (was {previous}), validated on {len(histories)} candle histories")
+        return True
+
+    def validate(self, served: ServedModel, histories: List[pd.DataFrame]) -> Optional[str]:
+        """
+        Why the model must not be served, or None if it passes: its pipeline must build the
+        observation its policy takes, and replaying the recent candles through its pipeline
+        must give finite observations and valid actions.
+        """
+        if served.obs_size is not None and served.obs_size != served.pipeline.obs_size:
+            return f"policy takes {served.obs_size} observation fields, pipeline builds {served.pipeline.obs_size}"
+
+        vectors = []
+        for frame in histories:
+            stream = served.pipeline.stream()
+            for candle in frame.to_dict('records'):
+                vector = stream.update(candle)
+                if vector is not None:
+                    vectors.append(vector)
+        if not vectors:
+            self.logger.warning(f"No warm candle history to validate {served.name} on; checked shapes only")
+            return None
+
+        vectors = np.stack(vectors)
+        obs = served.pipeline.observations(vectors, normalize=served.normalize_obs)
+        if not np.isfinite(obs).all():
+            return "non-finite observations on recent candles"
+        actions = served.predict_batch(vectors)
+        n_actions = served.n_actions
+        if len(actions) != len(vectors) or (n_actions is not None and ((actions < 0) | (actions >= n_actions)).any()):
+            return "invalid actions on recent candles"
+        return None
+
+    def check_for_updates(self, settle_seconds: float = 0.0) -> Optional[asyncio.Task]:
+        """
+        Polls the served model's files (a few stat calls): newer files that have been
+        unchanged for settle_seconds trigger a background reload. Files that already
+        failed are not retried until they change again.
+        """
+        if self.active is None or self.reloading:
+            return None
+        mtime = model_mtime(self.active.path)
+        if mtime <= self.active.mtime or self._rejected.get(self.active.path) == mtime:
+            return None
+        if time.time() - mtime < settle_seconds:
+            return None  # Still being written
+        self.logger.info(f"Detected updated files for model {self.active.name}")
+        return self.request_reload(self.active.name)
+
+    async def predict(self, vector: np.ndarray, model: Optional[ServedModel] = None,
+                      balance: float = INFERENCE_BALANCE, holdings: float = 0.0) -> Optional[int]:
+        """
+        Queues one FeatureStream vector and returns its action once the batch it joined
+        has run (None when no model is being served).
+        """
+        served = model or self.active
+        if served is None:
+            return None
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._pending.append((served, vector, balance, holdings, future))
+        if not self._flush_scheduled:
+            self._flush_scheduled = True
+            loop.call_soon(self._flush)
+        return await future
+
+    def _flush(self):
+        pending, self._pending = self._pending, []
+        self._flush_scheduled = False
+        if not pending:
+            return
+        groups: Dict[int, List[Tuple[ServedModel, np.ndarray, float, float, asyncio.Future]]] = {}
+        for request in pending:
+            groups.setdefault(id(request[0]), []).append(request)
+
+        for requests in groups.values():
+            served = requests[0][0]
+            futures = [r[4] for r in requests]
+            try:
+                actions = served.predict_batch(np.stack([r[1] for r in requests]),
+                                               np.array([r[2] for r in requests], dtype=float),
+                                               np.array([r[3] for r in requests], dtype=float))
+            except Exception as e:
+                self.logger.error(f"Batched inference failed for {served.name} ({len(requests)} requests): {e}")
+                for future in futures:
+                    if not future.done():
+                        future.set_exception(e)
+                continue
+            for future, action in zip(futures, actions):
+                if not future.done():
+                    future.set_result(int(action))
+            self.batches += 1
+            self.requests += len(requests)
+            self.last_batch_size = len(requests)
+
+    def stats(self) -> Dict[str, Any]:
+        """Served model and batching counters for the dashboard status file."""
+        return {
+            'model': self.active_name,
+            'loaded_at': self.active.loaded_at if self.active is not None else None,
+            'batches': self.batches,
+            'requests': self.requests,
+            'last_batch_size': self.last_batch_size,
+            'reloads': self.reloads,
+            'reloading': self.reloading,
+            'last_reload_error': self.last_reload_error,
+        }
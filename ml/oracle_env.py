@@ -12,7 +12,7 @@ class OracleEnv(TradingEnv):
         obs = super()._next_observation()
         
         # Add 'Hindsight' (The future price change)
-        next_step = min(self.current_step + 1, len(self.df) - 1)
+        next_step = min(self.current_step + 1, self.episode_end - 1)
         future_price = self.df.iloc[next_step]['close']
         current_price = self.df.iloc[self.current_step]['close']
         
@@ -0,0 +1,146 @@
+import os
+import numpy as np
+from typing import Any, Dict, List, Optional, Tuple
+from utils.logger import setup_logger
+
+"""
+POLICY RUNTIME: Dependency-free PPO inference
+---------------------------------------------
+export_policy() writes the actor of a trained stable-baselines3 MlpPolicy (its
+Linear layers and activations) plus the VecNormalize observation statistics to a
+plain .npz file next to the model. PolicyRuntime loads it with NumPy only and
+reproduces PPO.predict(obs, deterministic=True): normalize, clip, MLP forward,
+argmax. No torch, gymnasium or stable-baselines3 import, no per-call tensor
+conversion, and a (symbols, features) batch costs one matmul per layer.
+"""
+
+POLICY_FORMAT_VERSION = 1
+ACTIVATIONS = {
+    'Tanh': np.tanh,
+    'ReLU': lambda x: np.maximum(x, 0),
+    'Identity': lambda x: x,
+}
+
+def policy_path(model_path: str) -> str:
+    """The exported policy saved next to a model (model_path without the .zip)."""
+    return f"{model_path}_policy.npz"
+
+def export_policy(policy, path: str, vec_normalize=None):
+    """
+    Exports the actor of an SB3 ActorCriticPolicy (FlattenExtractor, Discrete actions).
+    vec_normalize: the VecNormalize the model was trained in (its observation statistics
+    are embedded so the runtime normalizes exactly as training did).
+    """
+    import torch.nn as nn
+
+    extractor = type(policy.pi_features_extractor if hasattr(policy, 'pi_features_extractor') else policy.features_extractor).__name__
+    if extractor != 'FlattenExtractor':
+        raise ValueError(f"Only MlpPolicy (FlattenExtractor) can be exported, got {extractor}")
+    if not hasattr(policy.action_space, 'n'):
+        raise ValueError("Only Discrete action spaces can be exported")
+
+    # Linear layers of the actor, each followed by its activation (Identity for the logits)
+    modules = list(policy.mlp_extractor.policy_net) + [policy.action_net]
+    arrays: Dict[str, np.ndarray] = {}
+    activations: List[str] = []
+    for module in modules:
+        if isinstance(module, nn.Linear):
+            i = len(activations)
+            arrays[f"W{i}"] = module.weight.detach().cpu().numpy().astype(np.float32)
+            arrays[f"b{i}"] = module.bias.detach().cpu().numpy().astype(np.float32)
+            activations.append('Identity')
+        else:
+            name = type(module).__name__
+            if name not in ACTIVATIONS or not activations:
+                raise ValueError(f"Unsupported policy layer: {name}")
+            activations[-1] = name
+
+    arrays['activations'] = np.array(activations)
+    arrays['format_version'] = np.array(POLICY_FORMAT_VERSION)
+    if vec_normalize is not None and getattr(vec_normalize, 'norm_obs', True):
+        arrays['obs_mean'] = np.asarray(vec_normalize.obs_rms.mean, dtype=np.float64)
+        arrays['obs_var'] = np.asarray(vec_normalize.obs_rms.var, dtype=np.float64)
+        arrays['clip_obs'] = np.array(float(vec_normalize.clip_obs))
+        arrays['epsilon'] = np.array(float(vec_normalize.epsilon))
+
+    tmp = path + ".tmp"
+    with open(tmp, 'wb') as f:
+        np.savez(f, **arrays)
+    os.replace(tmp, path)
+
+class PolicyRuntime:
+    """
+    NumPy forward pass of an exported PPO actor.
+    predict() mirrors PPO.predict(obs, deterministic=True): one observation gives one
+    action, a (batch, features) array gives one action per row.
+    """
+    def __init__(self, weights: List[np.ndarray], biases: List[np.ndarray], activations: List[str],
+                 obs_mean: Optional[np.ndarray] = None, obs_var: Optional[np.ndarray] = None,
+                 clip_obs: float = 10.0, epsilon: float = 1e-8):
+        unknown = [a for a in activations if a not in ACTIVATIONS]
+        if unknown:
+            raise ValueError(f"Unsupported activations: {unknown}")
+        self.weights = [np.ascontiguousarray(w.T, dtype=np.float32) for w in weights]  # (in, out): x @ W
+        self.biases = [np.asarray(b, dtype=np.float32) for b in biases]
+        self.activations = list(activations)
+        self._act = [ACTIVATIONS[a] for a in activations]
+        self.obs_size = self.weights[0].shape[0]
+        self.n_actions = self.weights[-1].shape[1]
+        self.normalizes = obs_mean is not None
+        if self.normalizes:
+            self.obs_mean = np.asarray(obs_mean, dtype=np.float64)
+            self.obs_std = np.sqrt(np.asarray(obs_var, dtype=np.float64) + epsilon)
+            self.clip_obs = float(clip_obs)
+            if len(self.obs_mean) != self.obs_size:
+                raise ValueError(f"Normalization stats cover {len(self.obs_mean)} fields, the policy takes {self.obs_size}")
+
+    @classmethod
+    def load(cls, path: str) -> 'PolicyRuntime':
+        with np.load(path, allow_pickle=False) as data:
+            version = int(data['format_version'])
+            if version > POLICY_FORMAT_VERSION:
+                raise ValueError(f"Policy format v{version} is newer than supported v{POLICY_FORMAT_VERSION}")
+            activations = [str(a) for a in data['activations']]
+            weights = [data[f"W{i}"] for i in range(len(activations))]
+            biases = [data[f"b{i}"] for i in range(len(activations))]
+            norm = {}
+            if 'obs_mean' in data:
+                norm = {'obs_mean': data['obs_mean'], 'obs_var': data['obs_var'],
+                        'clip_obs': float(data['clip_obs']), 'epsilon': float(data['epsilon'])}
+        return cls(weights, biases, activations, **norm)
+
+    def normalize(self, obs: np.ndarray) -> np.ndarray:
+        """VecNormalize.normalize_obs: (obs - mean) / sqrt(var + eps), clipped."""
+        if not self.normalizes:
+            return obs
+        return np.clip((obs - self.obs_mean) / self.obs_std, -self.clip_obs, self.clip_obs)
+
+    def logits(self, obs: np.ndarray) -> np.ndarray:
+        """Action logits for a (batch, obs_size) array of raw observations."""
+        x = self.normalize(np.asarray(obs, dtype=np.float32)).astype(np.float32)
+        for w, b, act in zip(self.weights, self.biases, self._act):
+            x = act(x @ w + b)
+        return x
+
+    def predict(self, obs: np.ndarray, deterministic: bool = True) -> Tuple[Any, None]:
+        """
+        Greedy actions (the only mode served live; deterministic=False is not supported).
+        Returns (action, None) like PPO.predict: an int array of shape () or (batch,).
+        """
+        if not deterministic:
+            raise ValueError("PolicyRuntime only serves deterministic actions")
+        obs = np.asarray(obs, dtype=np.float32)
+        single = obs.ndim == 1
+        actions = self.logits(obs.reshape(1, -1) if single else obs).argmax(axis=1)
+        return (actions[0] if single else actions), None
+
+def load_policy(model_path: str) -> Optional[PolicyRuntime]:
+    """The exported policy of the model at model_path, or None if it has none (or fails to load)."""
+    path = policy_path(model_path)
+    if not os.path.exists(path):
+        return None
+    try:
+        return PolicyRuntime.load(path)
+    except Exception as e:
+        setup_logger("PolicyRuntime").error(f"Failed to load exported policy {path}: {e}")
+        return None
@@ -1,6 +1,8 @@
 from stable_baselines3 import PPO, DQN
 from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize, SubprocVecEnv
 from ml.trading_env import TradingEnv
+from ml.feature_pipeline import pipeline_path
+from ml.policy_runtime import export_policy, policy_path
 import pandas as pd
 import os
 
@@ -41,14 +43,19 @@ class SocratesCallback(BaseCallback):
         return True
 
 class RLAgent:
-    def __init__(self, df: pd.DataFrame, algorithm='PPO', fee_rate=0.004, reward_mode='profit', resume=False, model_path="ppo_model", n_envs=1, socratic=False, is_oracle=False, **kwargs):
+    def __init__(self, df: pd.DataFrame, algorithm='PPO', fee_rate=0.004, reward_mode='profit', resume=False, model_path="ppo_model", n_envs=1, socratic=False, is_oracle=False, episode_bounds=None, pipeline=None, **kwargs):
+        # pipeline: FeaturePipeline (ml/feature_pipeline.py) of the training features, saved with the model
+        self.pipeline = pipeline
+        self.is_oracle = is_oracle
+        scaler = pipeline.scaler if pipeline is not None else None
+
         # 1. Create Vetorized Env
         def make_env():
             if is_oracle:
                 from ml.oracle_env import OracleEnv
-                return OracleEnv(df, fee_rate=fee_rate, reward_mode=reward_mode)
+                return OracleEnv(df, fee_rate=fee_rate, reward_mode=reward_mode, episode_bounds=episode_bounds, scaler=scaler)
             else:
-                return TradingEnv(df, fee_rate=fee_rate, reward_mode=reward_mode)
+                return TradingEnv(df, fee_rate=fee_rate, reward_mode=reward_mode, episode_bounds=episode_bounds, scaler=scaler)
             
         self.socratic_callback = SocratesCallback() if socratic else None
         
@@ -120,6 +127,21 @@ class RLAgent:
         self.env.save(stats_path)
         print(f"Model saved to {path}, Stats to {stats_path}")
 
+        # Feature pipeline (columns, indicators, scaler, observation stats), replayed by MLStrategy at inference
+        # (Oracle models observe the future and are never served)
+        if self.pipeline is not None and not self.is_oracle:
+            self.pipeline.set_obs_normalization(self.env)
+            self.pipeline.save(pipeline_path(path))
+            print(f"Feature pipeline saved to {pipeline_path(path)}")
+
+        # NumPy export of the actor for MLStrategy (ml/policy_runtime.py); PPO only
+        if isinstance(self.model, PPO) and not self.is_oracle:
+            try:
+                export_policy(self.model.policy, policy_path(path), self.env)
+                print(f"Policy exported to {policy_path(path)}")
+            except ValueError as e:
+                print(f"Policy export skipped: {e}")
+
     def load(self, filename):
         path = os.path.join(MODELS_DIR, filename)
         if os.path.exists(path + ".zip"):
@@ -2,7 +2,7 @@ import gymnasium as gym
 from gymnasium import spaces
 import numpy as np
 import pandas as pd
-from typing import Optional
+from typing import List, Optional, Tuple
 
 class TradingEnv(gym.Env):
     """
@@ -10,15 +10,22 @@ class TradingEnv(gym.Env):
     """
     metadata = {'render_modes': ['human']}
 
-    def __init__(self, df: pd.DataFrame, initial_balance: float = 10000.0, fee_rate: float = 0.004, reward_mode: str = 'profit'):
+    def __init__(self, df: pd.DataFrame, initial_balance: float = 10000.0, fee_rate: float = 0.004, reward_mode: str = 'profit',
+                 episode_bounds: Optional[List[Tuple[int, int]]] = None, scaler=None):
         super(TradingEnv, self).__init__()
         # Drop non-numeric columns (like timestamp) for observation
         self.df = df.select_dtypes(include=[np.number])
         self.original_df = df # Keep original for rendering or other needs if necessary
+        # Observed features: standardized by the model's FrozenScaler (ml/feature_stream.py); prices stay raw in self.df
+        self.obs_df = scaler.transform_frame(self.df.copy()) if scaler is not None else self.df
         
         self.initial_balance = initial_balance
         self.fee_rate = fee_rate
         self.reward_mode = reward_mode
+
+        # Per-symbol [start, end) row ranges (see ml/dataset_builder.py); each reset samples one
+        self.episode_bounds = episode_bounds or [(0, len(self.df))]
+        self.episode_end = self.episode_bounds[0][1]
         
         # Actions: 0=Hold, 1=Buy, 2=Sell
         self.action_space = spaces.Discrete(3)
@@ -38,7 +45,8 @@ class TradingEnv(gym.Env):
 
     def reset(self, seed: Optional[int] = None, options: Optional[dict] = None):
         super().reset(seed=seed)
-        self.current_step = 0
+        start, self.episode_end = self.episode_bounds[self.np_random.integers(len(self.episode_bounds))]
+        self.current_step = start
         self.balance = self.initial_balance
         self.holdings = 0.0
         self.net_worth = self.initial_balance
@@ -48,7 +56,7 @@ class TradingEnv(gym.Env):
 
     def _next_observation(self):
         # Frame the observation
-        obs = np.array([self.balance, self.holdings] + self.df.iloc[self.current_step].tolist())
+        obs = np.array([self.balance, self.holdings] + self.obs_df.iloc[self.current_step].tolist())
         return obs.astype(np.float32)
 
     def step(self, action):
@@ -82,7 +90,7 @@ class TradingEnv(gym.Env):
              self.holdings = 0
 
         self.current_step += 1
-        done = self.current_step >= len(self.df) - 1
+        done = self.current_step >= self.episode_end - 1
 
         # Calculate Reward (Change in Net Worth)
         new_net_worth = self.balance + (self.holdings * current_price)
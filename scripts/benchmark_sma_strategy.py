@@ -0,0 +1,122 @@
+"""
+SMAStrategy benchmark: bulk-feeds every stored 1m file (data_storage/*_1m.csv)
+through the legacy pandas SMAStrategy and the running-sum version, and reports
+per-candle cost and signal agreement.
+
+Signals may only differ where the two SMAs are level (a decimal tie that the
+legacy rolling means resolved by float noise); any other difference exits with 1.
+
+Usage:
+    python scripts/benchmark_sma_strategy.py
+    python scripts/benchmark_sma_strategy.py --short 10 --long 50 --data-dir data_storage
+"""
+import argparse
+import asyncio
+import glob
+import os
+import sys
+import time
+from typing import List, Optional
+
+import pandas as pd
+
+sys.path.append(os.getcwd())
+
+from strategy.sma_strategy import SMAStrategy, TIE_TOLERANCE
+
+class LegacySMAStrategy:
+    """The original SMAStrategy.on_candle: a list window and two pandas rolling means per candle."""
+    def __init__(self, short_window: int, long_window: int):
+        self.short_window = short_window
+        self.long_window = long_window
+        self.prices: List[float] = []
+        self.tie = False  # The SMAs were level on this or the previous candle
+
+    def on_candle(self, candle) -> Optional[dict]:
+        close_price = candle.get('close')
+        if close_price is None:
+            return None
+        self.prices.append(close_price)
+        if len(self.prices) > self.long_window + 1:
+            self.prices.pop(0)
+        if len(self.prices) < self.long_window:
+            return None
+
+        df = pd.DataFrame({'close': self.prices})
+        df['short_sma'] = df['close'].rolling(window=self.short_window).mean()
+        df['long_sma'] = df['close'].rolling(window=self.long_window).mean()
+        short_sma, long_sma = df['short_sma'].iloc[-1], df['long_sma'].iloc[-1]
+        prev_short_sma, prev_long_sma = df['short_sma'].iloc[-2], df['long_sma'].iloc[-2]
+        self.tie = any(abs(s - l) <= 10 * TIE_TOLERANCE * abs(l)
+                       for s, l in ((short_sma, long_sma), (prev_short_sma, prev_long_sma)))
+
+        if prev_short_sma <= prev_long_sma and short_sma > long_sma:
+            return {'side': 'buy', 'price': close_price}
+        elif prev_short_sma >= prev_long_sma and short_sma < long_sma:
+            return {'side': 'sell', 'price': close_price}
+        return None
+
+def load_candles(path: str) -> List[dict]:
+    return pd.read_csv(path)[['close']].to_dict('records')
+
+def run_legacy(candles, short_window: int, long_window: int):
+    strategy = LegacySMAStrategy(short_window, long_window)
+    start = time.perf_counter()
+    signals, ties = [], []
+    for candle in candles:
+        signals.append(strategy.on_candle(candle))
+        ties.append(strategy.tie)
+    return signals, ties, time.perf_counter() - start
+
+def run_streaming(candles, short_window: int, long_window: int):
+    strategy = SMAStrategy(short_window=short_window, long_window=long_window)
+    strategy.logger.disabled = True  # Don't time log formatting
+
+    async def run():
+        start = time.perf_counter()
+        signals = [await strategy.on_candle(candle) for candle in candles]
+        return signals, time.perf_counter() - start
+    return asyncio.run(run())
+
+def compare(legacy, ties, streaming):
+    """(signals, tie differences, real differences) between the two signal lists."""
+    signals = sum(s is not None for s in legacy)
+    tie_diffs = real_diffs = 0
+    for old, new, tie in zip(legacy, streaming, ties):
+        if (old and old['side']) != (new and new['side']):
+            if tie:
+                tie_diffs += 1
+            else:
+                real_diffs += 1
+    return signals, tie_diffs, real_diffs
+
+def main():
+    parser = argparse.ArgumentParser(description="Legacy vs running-sum SMAStrategy on stored 1m candles")
+    parser.add_argument("--short", type=int, default=5, help="Short SMA window (council default: 5)")
+    parser.add_argument("--long", type=int, default=20, help="Long SMA window (council default: 20)")
+    parser.add_argument("--data-dir", type=str, default="data_storage")
+    args = parser.parse_args()
+
+    paths = sorted(glob.glob(os.path.join(args.data_dir, '*_1m.csv')))
+    if not paths:
+        print(f"No *_1m.csv files in {args.data_dir}")
+        sys.exit(1)
+
+    print(f"SMAStrategy({args.short}, {args.long}) on {len(paths)} stored 1m files")
+    print(f"{'file':<22}{'candles':>9}{'legacy us':>12}{'stream us':>12}{'speedup':>9}{'signals':>9}{'ties':>6}{'diffs':>7}")
+    failed = False
+    for path in paths:
+        candles = load_candles(path)
+        legacy, ties, legacy_time = run_legacy(candles, args.short, args.long)
+        streaming, stream_time = run_streaming(candles, args.short, args.long)
+        signals, tie_diffs, real_diffs = compare(legacy, ties, streaming)
+        failed |= real_diffs > 0
+        n = len(candles)
+        print(f"{os.path.basename(path):<22}{n:>9}{legacy_time / n * 1e6:>12.1f}{stream_time / n * 1e6:>12.2f}"
+              f"{legacy_time / stream_time:>8.0f}x{signals:>9}{tie_diffs:>6}{real_diffs:>7}")
+
+    print("FAIL: signals differ away from SMA ties" if failed else "OK: signals match (up to SMA ties)")
+    sys.exit(1 if failed else 0)
+
+if __name__ == "__main__":
+    main()
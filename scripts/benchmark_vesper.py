@@ -1,65 +1,382 @@
+"""
+Vesper benchmark suite: every Vesper kernel (vectorized, streaming and batched),
+every offline agent's on_candle and MetaStrategy.on_candle at several history lengths.
+
+Results can be saved as a JSON baseline and later runs compared against it;
+timings slower than the baseline by more than --threshold are flagged as
+regressions (exit code 1), so optimization work can be measured.
+
+Network/model-bound agents (Analyst, OnChain, Chronos, TimeGPT) are not benchmarked;
+agents whose dependencies are missing are reported as skipped.
+
+Usage:
+    python scripts/benchmark_vesper.py
+    python scripts/benchmark_vesper.py --sizes 1000 10000 --groups kernels agents
+    python scripts/benchmark_vesper.py --save                      # benchmarks/vesper_baseline.json
+    python scripts/benchmark_vesper.py --compare benchmarks/vesper_baseline.json --threshold 0.2
+    python scripts/benchmark_vesper.py --reference                 # accuracy vs pandas_ta / backends
+"""
+import argparse
+import asyncio
+import json
+import os
+import platform
+import sys
 import time
+from datetime import datetime
+
 import numpy as np
 import pandas as pd
-import pandas_ta as ta
-from utils.vesper_math import v_sma, v_rsi, v_bollinger
-
-def benchmark():
-    DATA_SIZE = 100_000
-    print(f"IGNITING VESPER BENCHMARK (N={DATA_SIZE})")
-    
-    # Generate Synthetic Data
-    data = np.random.rand(DATA_SIZE) * 100
-    df = pd.DataFrame({'close': data})
-    
-    # --- SMA BENCHMARK ---
-    print("\n[SMA (Window=20)]")
-    
-    # 1. Pandas-TA (Standard)
-    start = time.perf_counter()
-    pta = df.ta.sma(length=20)
-    t_pta = time.perf_counter() - start
-    print(f"Pandas-TA: {t_pta:.6f}s")
-    
-    # 2. Vesper (Vectorized)
-    start = time.perf_counter()
-    v_out = v_sma(data, 20)
-    t_vesper = time.perf_counter() - start
-    print(f"Vesper:    {t_vesper:.6f}s")
-    
-    speedup = t_pta / t_vesper if t_vesper > 0 else 0
-    print(f"Speedup: {speedup:.2f}x")
-    
-    # Check Correctness (First non-NaN match)
-    valid_idx = 20
-    diff = abs(pta.iloc[valid_idx] - v_out[valid_idx])
-    print(f"Accuracy Diff: {diff:.9f}")
-
-    # --- RSI BENCHMARK ---
-    print("\n[RSI (Window=14)]")
-    
-    # 1. Pandas-TA
-    start = time.perf_counter()
-    pta_rsi = df.ta.rsi(length=14)
-    t_pta_rsi = time.perf_counter() - start
-    print(f"Pandas-TA: {t_pta_rsi:.6f}s")
-    
-    # 2. Vesper
-    start = time.perf_counter()
-    v_rsi_out = v_rsi(data, 14)
-    t_vesper_rsi = time.perf_counter() - start
-    print(f"Vesper:    {t_vesper_rsi:.6f}s")
-    
-    speedup_rsi = t_pta_rsi / t_vesper_rsi if t_vesper_rsi > 0 else 0
-    print(f"Speedup: {speedup_rsi:.2f}x")
-
-    # --- BOLLINGER BENCHMARK ---
-    print("\n[BOLLINGER (Window=20)]")
-    
-    start = time.perf_counter()
-    u, m, l = v_bollinger(data, 20)
-    t_bol = time.perf_counter() - start
-    print(f"Vesper:    {t_bol:.6f}s")
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.getcwd())
+
+from utils import vesper_backend
+from utils.vesper_math import v_sma, v_std_dev, v_rsi, v_bollinger, v_keltner, v_ema, v_macd, v_true_range, v_atr, v_adx
+from utils.vesper_math import v_zscore, v_rolling_max, v_rolling_min, v_percent_rank, v_roc, v_volume_spike
+from utils.vesper_stream import (
+    StreamingSMA, StreamingStdDev, StreamingEMA, StreamingRSI, StreamingATR, StreamingBollinger, StreamingMACD,
+    StreamingADX, StreamingZScore, StreamingMax, StreamingMin, StreamingPercentRank, StreamingROC, StreamingVolumeSpike,
+)
+from utils.vesper_batch import b_sma, b_std_dev, b_rsi, b_ema, b_macd, b_atr, b_adx, b_technical_features
+from utils.indicator_cache import IndicatorCache
+
+DEFAULT_SIZES = (1_000, 10_000, 100_000, 1_000_000)
+GROUPS = ('kernels', 'stream', 'batch', 'agents', 'meta')
+DEFAULT_BASELINE = os.path.join('benchmarks', 'vesper_baseline.json')
+DEFAULT_THRESHOLD = 0.25     # Flag timings more than 25% slower than the baseline
+NOISE_FLOOR = 20e-6          # Ignore differences below 20us (timer noise on tiny inputs)
+BATCH_SYMBOLS = 8            # Rows in the batched kernel benchmarks
+AGENT_WARMUP = 300           # Candles fed through on_candle before timing (covers every min_history)
+
+# --- SYNTHETIC DATA ---
+
+def make_ohlcv(n: int, seed: int = 42):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.002, n)))
+    spread = close * rng.uniform(0, 0.004, n)
+    high, low = close + spread, close - spread
+    volume = rng.lognormal(5, 0.5, n)
+    return high, low, close, volume
+
+def iter_candles(high, low, close, volume, start: int = 0, t0: int = 1_700_000_000_000):
+    for i in range(start, len(close)):
+        yield {'timestamp': t0 + i * 60_000, 'open': float(close[i - 1] if i else close[0]),
+               'high': float(high[i]), 'low': float(low[i]), 'close': float(close[i]), 'volume': float(volume[i])}
+
+def best_of(fn, repeat: int) -> float:
+    """Fastest of `repeat` runs, in seconds (least disturbed by other processes)."""
+    times = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        times.append(time.perf_counter() - start)
+    return min(times)
+
+# --- CASES ---
+
+def kernel_cases(high, low, close, volume):
+    return {
+        'v_sma(20)': lambda: v_sma(close, 20),
+        'v_std_dev(20)': lambda: v_std_dev(close, 20),
+        'v_std_dev(2000)': lambda: v_std_dev(close, 2000),
+        'v_bollinger(20)': lambda: v_bollinger(close, 20),
+        'v_rsi(14,sma)': lambda: v_rsi(close, 14),
+        'v_rsi(14,wilder)': lambda: v_rsi(close, 14, method='wilder'),
+        'v_keltner(20)': lambda: v_keltner(high, low, close, 20),
+        'v_ema(50)': lambda: v_ema(close, 50),
+        'v_macd(12,26,9)': lambda: v_macd(close),
+        'v_true_range': lambda: v_true_range(high, low, close),
+        'v_atr(14)': lambda: v_atr(high, low, close, 14),
+        'v_adx(14)': lambda: v_adx(high, low, close, 14),
+        'v_zscore(20)': lambda: v_zscore(close, 20),
+        'v_rolling_max(20)': lambda: v_rolling_max(close, 20),
+        'v_rolling_min(20)': lambda: v_rolling_min(close, 20),
+        'v_percent_rank(100)': lambda: v_percent_rank(close, 100),
+        'v_roc(5)': lambda: v_roc(close, 5),
+        'v_volume_spike(20)': lambda: v_volume_spike(volume, 20),
+    }
+
+def stream_cases(high, low, close, volume):
+    hlc = np.column_stack((high, low, close))
+    return {
+        'StreamingSMA(20)': lambda: StreamingSMA(20).update_many(close),
+        'StreamingStdDev(20)': lambda: StreamingStdDev(20).update_many(close),
+        'StreamingEMA(50)': lambda: StreamingEMA(50).update_many(close),
+        'StreamingRSI(14,sma)': lambda: StreamingRSI(14).update_many(close),
+        'StreamingRSI(14,wilder)': lambda: StreamingRSI(14, method='wilder').update_many(close),
+        'StreamingATR(14)': lambda: StreamingATR(14).update_many(hlc),
+        'StreamingBollinger(20)': lambda: StreamingBollinger(20).update_many(close),
+        'StreamingMACD(12,26,9)': lambda: StreamingMACD().update_many(close),
+        'StreamingADX(14)': lambda: StreamingADX(14).update_many(hlc),
+        'StreamingZScore(20)': lambda: StreamingZScore(20).update_many(close),
+        'StreamingMax(20)': lambda: StreamingMax(20).update_many(close),
+        'StreamingMin(20)': lambda: StreamingMin(20).update_many(close),
+        'StreamingPercentRank(100)': lambda: StreamingPercentRank(100).update_many(close),
+        'StreamingROC(5)': lambda: StreamingROC(5).update_many(close),
+        'StreamingVolumeSpike(20)': lambda: StreamingVolumeSpike(20).update_many(volume),
+    }
+
+def batch_cases(high, low, close, volume):
+    # BATCH_SYMBOLS shifted copies of the series: (symbols, n) matrices
+    h, l, c = (np.stack([a * (1 + 0.01 * k) for k in range(BATCH_SYMBOLS)]) for a in (high, low, close))
+    return {
+        'b_sma(20)': lambda: b_sma(c, 20),
+        'b_std_dev(20)': lambda: b_std_dev(c, 20),
+        'b_rsi(14,sma)': lambda: b_rsi(c, 14),
+        'b_rsi(14,wilder)': lambda: b_rsi(c, 14, method='wilder'),
+        'b_ema(50)': lambda: b_ema(c, 50),
+        'b_macd(12,26,9)': lambda: b_macd(c),
+        'b_atr(14)': lambda: b_atr(h, l, c, 14),
+        'b_adx(14)': lambda: b_adx(h, l, c, 14),
+        'b_technical_features': lambda: b_technical_features(h, l, c),
+    }
+
+def agent_factories():
+    """name -> factory for every agent that runs offline (agents with missing dependencies are left out)."""
+    factories = {}
+    try:
+        from strategy.technical_sub_agents import TrendAgent, OscillatorAgent, VolumeAgent
+        factories.update({'TrendAgent': TrendAgent, 'OscillatorAgent': OscillatorAgent, 'VolumeAgent': VolumeAgent})
+    except ImportError as e:
+        print(f"Skipping technical sub-agents: {e}")
+    try:
+        from strategy.newton_agent import NewtonAgent
+        factories['NewtonAgent'] = NewtonAgent
+    except ImportError as e:
+        print(f"Skipping NewtonAgent: {e}")
+    try:
+        from strategy.sma_strategy import SMAStrategy
+        factories['SMAStrategy'] = lambda: SMAStrategy(short_window=5, long_window=20)
+    except ImportError as e:
+        print(f"Skipping SMAStrategy: {e}")
+    try:
+        from strategy.ml_strategy import MLStrategy
+        factories['MLStrategy'] = MLStrategy
+    except ImportError as e:
+        print(f"Skipping MLStrategy: {e}")
+    return factories
+
+def time_on_candle(strategy, cache, data, n: int, candles: int) -> float:
+    """
+    Seconds per on_candle with `n` candles of history in the shared indicator cache.
+    The cache is primed directly (as MetaStrategy would have fed it), the last
+    AGENT_WARMUP candles also go through on_candle to warm the strategy's own state.
+    """
+    total = n + candles
+    warm_from = max(0, n - AGENT_WARMUP)
+    feed_cache = cache is not None and not hasattr(strategy, 'agents')  # MetaStrategy feeds its own cache
+
+    async def run():
+        stream = iter_candles(*data)
+        for i, candle in enumerate(stream):
+            if i < warm_from:
+                if cache is not None:
+                    cache.update(candle)
+                continue
+            if i == n:
+                start = time.perf_counter()
+            if feed_cache:
+                cache.update(candle)
+            await strategy.on_candle(candle)
+            if i == total - 1:
+                return (time.perf_counter() - start) / candles
+
+    return asyncio.run(run())
+
+def run_agents(sizes, candles: int):
+    results = {}
+    for name, factory in agent_factories().items():
+        for n in sizes:
+            data = make_ohlcv(n + candles)
+            strategy = factory()
+            cache = IndicatorCache(max_history=n)
+            strategy.attach_indicators(cache)
+            if name == 'MLStrategy' and not getattr(strategy, 'model', None):
+                print("Skipping MLStrategy: no model loaded")
+                break
+            results[f"agents/{name}/{n}"] = time_on_candle(strategy, cache, data, n, candles)
+            print(f"  {name:<16} history={n:<9} {results[f'agents/{name}/{n}'] * 1e6:12.1f} us/candle")
+    return results
+
+def run_meta(sizes, candles: int):
+    try:
+        from strategy.meta_strategy import MetaStrategy
+    except ImportError as e:
+        print(f"Skipping MetaStrategy: {e}")
+        return {}
+    results = {}
+    factories = {k: v for k, v in agent_factories().items() if k != 'MLStrategy'}
+    for n in sizes:
+        data = make_ohlcv(n + candles)
+        meta = MetaStrategy([factory() for factory in factories.values()], voting_method='weighted')
+        meta._save_weights = lambda: None  # Never overwrite the live agent_perf.json
+        meta.indicators = IndicatorCache(max_history=n)
+        for agent in meta.agents:
+            agent.attach_indicators(meta.indicators)
+        results[f"meta/MetaStrategy/{n}"] = time_on_candle(meta, meta.indicators, data, n, candles)
+        print(f"  {'MetaStrategy':<16} history={n:<9} {results[f'meta/MetaStrategy/{n}'] * 1e6:12.1f} us/candle")
+    return results
+
+def run_suite(sizes, groups, repeat: int, candles: int):
+    results = {}
+    kernel_groups = [('kernels', kernel_cases), ('stream', stream_cases), ('batch', batch_cases)]
+    for group, make_cases in kernel_groups:
+        if group not in groups:
+            continue
+        print(f"\n[{group.upper()}]")
+        for n in sizes:
+            data = make_ohlcv(n)
+            for name, fn in make_cases(*data).items():
+                key = f"{group}/{name}/{n}"
+                results[key] = best_of(fn, repeat)
+                print(f"  {name:<26} N={n:<9} {results[key]:.6f}s")
+
+    if 'agents' in groups:
+        print("\n[AGENTS] (shared indicator cache, per on_candle)")
+        results.update(run_agents(sizes, candles))
+    if 'meta' in groups:
+        print("\n[META] (MetaStrategy with the offline agents, per on_candle)")
+        results.update(run_meta(sizes, candles))
+    return results
+
+# --- BASELINES ---
+
+def save_baseline(path: str, results, args):
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    payload = {
+        'meta': {
+            'created': datetime.now().isoformat(),
+            'python': platform.python_version(),
+            'numpy': np.__version__,
+            'pandas': pd.__version__,
+            'machine': platform.machine(),
+            'platform': platform.platform(),
+            'backend': vesper_backend.get_backend(),
+            'sizes': list(args.sizes),
+            'repeat': args.repeat,
+            'agent_candles': args.agent_candles,
+        },
+        'results': results,
+    }
+    temp = path + '.tmp'
+    with open(temp, 'w') as f:
+        json.dump(payload, f, indent=2, sort_keys=True)
+    os.replace(temp, path)
+    print(f"\nSaved {len(results)} timings to {path}")
+
+def compare_results(current, baseline, threshold: float = DEFAULT_THRESHOLD, noise_floor: float = NOISE_FLOOR):
+    """
+    Compares timings against a baseline.
+    Returns (rows, regressions): rows are (key, baseline_s, current_s, ratio, status)
+    with status 'REGRESSION', 'faster', 'ok' or 'new'.
+    """
+    rows, regressions = [], []
+    for key in sorted(current):
+        now = current[key]
+        before = baseline.get(key)
+        if before is None:
+            rows.append((key, None, now, None, 'new'))
+            continue
+        ratio = now / before if before > 0 else float('inf')
+        if ratio > 1 + threshold and now - before > noise_floor:
+            status = 'REGRESSION'
+            regressions.append(key)
+        elif ratio < 1 / (1 + threshold) and before - now > noise_floor:
+            status = 'faster'
+        else:
+            status = 'ok'
+        rows.append((key, before, now, ratio, status))
+    return rows, regressions
+
+def print_comparison(rows, regressions, baseline_meta, threshold: float):
+    print(f"\n[COMPARISON] vs baseline from {baseline_meta.get('created', '?')} "
+          f"(backend {baseline_meta.get('backend', '?')}, threshold {threshold:.0%})")
+    for key, before, now, ratio, status in rows:
+        if before is None:
+            print(f"  {key:<48} {'-':>12} {now:12.6f}s {'':>8} new")
+        else:
+            print(f"  {key:<48} {before:12.6f}s {now:12.6f}s {ratio:7.2f}x {status}")
+    print(f"\n{len(regressions)} regression(s) out of {sum(r[1] is not None for r in rows)} compared timings.")
+
+# --- REFERENCE (accuracy vs pandas_ta, backends) ---
+
+def reference_report(size: int = 100_000):
+    """Accuracy of the Vesper kernels against pandas/pandas_ta and across backends."""
+    high, low, close, _ = make_ohlcv(size)
+    df = pd.DataFrame({'high': high, 'low': low, 'close': close})
+    print(f"\n[REFERENCE] N={size}")
+
+    # --- ROLLING STD PRECISION (high / low magnitude prices) ---
+    print("STD DEV PRECISION (Window=20, max relative error vs two-pass)")
+    rng = np.random.default_rng(0)
+    for label, prices in [("BTC ~87k", 87000 + rng.normal(0, 0.5, size)),
+                          ("LUNC ~9e-5", 0.00009 + rng.normal(0, 1e-7, size))]:
+        ref = sliding_window_view(prices, 20).std(axis=1)
+        err = np.max(np.abs(v_std_dev(prices, 20)[19:] - ref) / ref)
+        print(f"  {label}: {err:.3e}")
+
+    try:
+        import pandas_ta as ta  # noqa: F401 (registers the DataFrame.ta accessor)
+        cases = [
+            ("SMA (Window=20)", lambda: df.ta.sma(length=20), v_sma(close, 20)),
+            ("RSI Wilder (Window=14)", lambda: df.ta.rsi(length=14), v_rsi(close, 14, method='wilder')),
+            ("EMA (Window=50)", lambda: df.ta.ema(length=50), v_ema(close, 50)),
+            ("MACD (12/26/9)", lambda: df.ta.macd(fast=12, slow=26, signal=9)['MACD_12_26_9'], v_macd(close)[0]),
+            ("ATR (Window=14)", lambda: df.ta.atr(length=14), v_atr(high, low, close, 14)),
+            ("ADX (Window=14)", lambda: df.ta.adx(length=14)['ADX_14'], v_adx(high, low, close, 14)[0]),
+        ]
+        print("ACCURACY vs pandas_ta (max abs diff)")
+        for label, pta_fn, v_out in cases:
+            print(f"  {label}: {np.nanmax(np.abs(pta_fn().to_numpy() - v_out)):.9f}")
+    except ImportError:
+        print("pandas_ta not installed: skipping the pandas_ta accuracy comparison.")
+
+    if 'numba' in vesper_backend.available_backends():
+        original = vesper_backend.get_backend()
+        outputs = {}
+        for backend in ('numpy', 'numba'):
+            vesper_backend.set_backend(backend)
+            vesper_backend.warmup()
+            outputs[backend] = [v_ema(close, 50), v_rsi(close, 14, method='wilder'), v_adx(high, low, close, 14)[0]]
+        vesper_backend.set_backend(original)
+        for label, a, b in zip(("EMA", "RSI Wilder", "ADX"), outputs['numpy'], outputs['numba']):
+            print(f"  numpy vs numba {label}: max diff {np.nanmax(np.abs(a - b)):.3e}")
+    else:
+        print("Numba not installed: only the numpy backend is available.")
+
+def main():
+    parser = argparse.ArgumentParser(description="Vesper benchmark suite")
+    parser.add_argument("--sizes", type=int, nargs='+', default=list(DEFAULT_SIZES), help="History lengths / series sizes")
+    parser.add_argument("--groups", nargs='+', choices=GROUPS, default=list(GROUPS))
+    parser.add_argument("--repeat", type=int, default=3, help="Runs per kernel (best is kept)")
+    parser.add_argument("--agent-candles", type=int, default=20, help="Timed on_candle calls per agent and history length")
+    parser.add_argument("--backend", choices=('auto', 'numpy', 'numba'), default=None, help="Vesper backend to benchmark")
+    parser.add_argument("--save", nargs='?', const=DEFAULT_BASELINE, default=None, help="Save results as a JSON baseline")
+    parser.add_argument("--compare", type=str, default=None, help="Baseline JSON to compare against")
+    parser.add_argument("--threshold", type=float, default=DEFAULT_THRESHOLD, help="Relative slowdown flagged as a regression")
+    parser.add_argument("--noise-floor", type=float, default=NOISE_FLOOR, help="Absolute slowdown (s) below which differences are ignored")
+    parser.add_argument("--reference", action="store_true", help="Also print accuracy vs pandas_ta and across backends")
+    args = parser.parse_args()
+
+    if args.backend:
+        vesper_backend.set_backend(args.backend)
+    vesper_backend.warmup()
+    print(f"VESPER BENCHMARK SUITE (sizes={args.sizes}, backend={vesper_backend.get_backend()})")
+
+    results = run_suite(args.sizes, args.groups, args.repeat, args.agent_candles)
+
+    if args.reference:
+        reference_report()
+    if args.save:
+        save_baseline(args.save, results, args)
+    if args.compare:
+        with open(args.compare) as f:
+            baseline = json.load(f)
+        rows, regressions = compare_results(results, baseline.get('results', {}), args.threshold, args.noise_floor)
+        print_comparison(rows, regressions, baseline.get('meta', {}), args.threshold)
+        if regressions:
+            sys.exit(1)
 
 if __name__ == "__main__":
-    benchmark()
+    main()
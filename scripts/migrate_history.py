@@ -0,0 +1,34 @@
+"""
+Migrate the legacy CSV trade and portfolio history into the SQLite stores
+read by the dashboard. Safe to run repeatedly (duplicates are ignored).
+
+Usage:
+    python scripts/migrate_history.py
+"""
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from config import (
+    DATA_DIR,
+    TRADE_HISTORY_LIVE, TRADE_HISTORY_PAPER,
+    PORTFOLIO_HISTORY_LIVE, PORTFOLIO_HISTORY_PAPER,
+    TRADE_DB_LIVE, TRADE_DB_PAPER
+)
+from data.trade_store import TradeStore
+
+# TradeRecorder historically wrote portfolio snapshots under data_storage/
+SOURCES = [
+    (TRADE_DB_LIVE, TRADE_HISTORY_LIVE, [PORTFOLIO_HISTORY_LIVE, os.path.join(DATA_DIR, 'portfolio_history.csv')]),
+    (TRADE_DB_PAPER, TRADE_HISTORY_PAPER, [PORTFOLIO_HISTORY_PAPER, os.path.join(DATA_DIR, 'paper_portfolio_history.csv')]),
+]
+
+if __name__ == "__main__":
+    for db_path, trade_csv, portfolio_csvs in SOURCES:
+        store = TradeStore(db_path)
+        trades = store.migrate_from_csv(trade_csv=trade_csv)['trades']
+        snapshots = sum(store.migrate_from_csv(portfolio_csv=p)['snapshots'] for p in portfolio_csvs)
+        print(f"{db_path}: +{trades} trades, +{snapshots} snapshots "
+              f"(total {store.count_trades()} trades)")
+        store.close()
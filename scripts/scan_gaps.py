@@ -0,0 +1,60 @@
+"""
+Scan every stored candle series in data_storage/ for gaps and duplicates.
+Optionally refetch only the missing ranges from the exchange.
+
+Usage:
+    python scripts/scan_gaps.py
+    python scripts/scan_gaps.py --repair --exchange kraken
+"""
+import argparse
+import asyncio
+import os
+import sys
+
+sys.path.append(os.getcwd())
+
+from data.data_storage import DataStorage
+from data.candle_integrity import format_report
+
+
+def symbol_from_filename(filename):
+    # BTC_USD_1h.csv -> BTC/USD
+    parts = os.path.splitext(filename)[0].split('_')
+    return f"{parts[0]}/{parts[1]}" if len(parts) >= 3 else None
+
+
+async def run(args):
+    storage = DataStorage()
+    reports = storage.scan_all()
+
+    broken = {name: r for name, r in reports.items() if not r['continuous']}
+    for name, report in reports.items():
+        print(format_report(name, report))
+    print(f"\n{len(reports) - len(broken)}/{len(reports)} series continuous, "
+          f"{sum(r['missing'] for r in reports.values())} candles missing in total.")
+
+    if not args.repair or not broken:
+        return
+
+    from data.exchange_client import ExchangeClient
+    client = ExchangeClient(args.exchange)
+    try:
+        for name in broken:
+            symbol = symbol_from_filename(name)
+            if not symbol:
+                continue
+            after = await storage.repair_gaps(client, symbol, name)
+            if after:
+                print(format_report(name, after))
+    finally:
+        await client.close()
+
+
+if __name__ == "__main__":
+    if sys.platform == 'win32':
+        asyncio.set_event_loop_policy(asyncio.WindowsSelectorEventLoopPolicy())
+
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--repair", action="store_true", help="Refetch missing ranges from the exchange")
+    parser.add_argument("--exchange", type=str, default="kraken")
+    asyncio.run(run(parser.parse_args()))
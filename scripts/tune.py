@@ -4,8 +4,8 @@ import os
 import pandas as pd
 from train import fetch_training_data
 from ml.rl_agent import RLAgent
-from data.data_storage import load_historical_data
-from ml.feature_engineer import FeatureEngineer
+from data.data_storage import DATA_DIR
+from ml.dataset_builder import load_training_dataset
 from utils.logger import setup_logger
 
 logger = setup_logger("AutoTuner")
@@ -18,18 +18,23 @@ def objective(trial, symbols, timeframe):
     n_steps = trial.suggest_categorical("n_steps", [1024, 2048, 4096])
 
     # 2. Setup Data (Use a single walk-forward split for tuning speed)
-    data_path = "data_storage/combined_training_data.csv"
+    data_path = os.path.join(DATA_DIR, f"training_dataset_{timeframe}.parquet")
     if not os.path.exists(data_path):
-        # Fetch if missing
+        # Fetch if missing (features are computed per symbol by the dataset builder)
         asyncio.run(fetch_training_data(symbols, timeframe, limit=5000))
     
-    df = load_historical_data(os.path.basename(data_path))
-    fe = FeatureEngineer()
-    df = fe.add_technical_indicators(df)
+    df, episodes = load_training_dataset(data_path)
     
-    split = int(len(df) * 0.8)
-    train_df = df.iloc[:split]
-    val_df = df.iloc[split:]
+    # 80/20 split inside every symbol episode
+    train_parts, val_parts, train_bounds, offset = [], [], [], 0
+    for start, end in episodes:
+        split = start + int((end - start) * 0.8)
+        train_bounds.append((offset, offset + split - start))
+        offset += split - start
+        train_parts.append(df.iloc[start:split])
+        val_parts.append(df.iloc[split:end])
+    train_df = pd.concat(train_parts, ignore_index=True)
+    val_df = pd.concat(val_parts, ignore_index=True)
 
     # 3. Train
     model_path = f"tuning_trial_{trial.number}"
@@ -40,6 +45,7 @@ def objective(trial, symbols, timeframe):
         batch_size=batch_size, 
         n_steps=n_steps,
         model_path=model_path,
+        episode_bounds=train_bounds,
         verbose=0 # Quiet during tuning
     )
     
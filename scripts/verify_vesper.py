@@ -0,0 +1,415 @@
+"""
+Parity harness: every Vesper kernel (vectorized, streaming and batched) against
+reference implementations, over the stored data_storage series and synthetic
+edge cases (constant prices, NaN gaps, short series, tiny windows, extreme price levels).
+
+References:
+    pandas      - the textbook formulas in plain pandas (always available)
+    pandas_ta   - the library the PPO features were originally built with (if installed)
+    backtrader  - backtrader's indicators (if installed). Its Wilder smoothing is seeded
+                  with an SMA, so RSI(wilder)/ATR/ADX are compared after BT_SETTLE bars.
+
+For each (implementation, reference, indicator) the worst dataset is reported with
+its maximum absolute and relative error and its number of bars where exactly one
+side is NaN. Relative error is taken against the indicator's natural scale: the price
+level for price-unit indicators (SMA, STD, bands, EMA, MACD, TR, ATR, rolling max/min),
+100 for the bounded oscillators (RSI, ADX, DI) and 1 for the unitless statistics
+(percent rank, ROC, volume spike), so near-zero values (a flat window's STD) do not
+turn harmless rounding into huge ratios. Z-scores are compared in price units (the
+error times the window's STD): on a near-flat window the ratio amplifies the STD's
+rounding arbitrarily.
+
+NaN placement must match too: a bar where exactly one side is NaN is a failure. The
+only exemptions are the documented warm-up differences in SETTLE (bars not compared
+at all) and LEADING_NAN_WARMUP. Exits with code 1 on any failure, so speed-ups never
+silently change the features the PPO model sees.
+
+Usage:
+    python scripts/verify_vesper.py
+    python scripts/verify_vesper.py --verbose              # one row per dataset
+    python scripts/verify_vesper.py --rtol 1e-9 --lenient-nan
+"""
+import argparse
+import glob
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+from numpy.lib.stride_tricks import sliding_window_view
+
+sys.path.append(os.getcwd())
+
+from utils.vesper_math import v_sma, v_std_dev, v_rsi, v_bollinger, v_ema, v_macd, v_true_range, v_atr, v_adx
+from utils.vesper_math import v_zscore, v_rolling_max, v_rolling_min, v_percent_rank, v_roc, v_volume_spike
+from utils.vesper_stream import (
+    StreamingSMA, StreamingStdDev, StreamingEMA, StreamingRSI, StreamingATR, StreamingBollinger, StreamingMACD,
+    StreamingADX, StreamingZScore, StreamingMax, StreamingMin, StreamingPercentRank, StreamingROC, StreamingVolumeSpike,
+)
+from utils.vesper_batch import stack_series, b_sma, b_std_dev, b_bollinger, b_rsi, b_ema, b_macd, b_true_range, b_atr, b_adx
+
+DATA_DIR = 'data_storage'
+RTOL = 1e-6
+ATOL = 1e-9
+BT_SETTLE = 250  # Bars skipped before comparing backtrader's SMA-seeded Wilder smoothing
+OSCILLATORS = ('RSI_sma', 'RSI_wilder', 'ADX', 'DMP', 'DMN')  # Bounded 0..100
+UNITLESS = ('PRANK', 'ROC', 'VOLSPIKE')
+
+STANDARD = {'sma': 20, 'std': 20, 'rsi': 14, 'ema': 50, 'atr': 14, 'adx': 14, 'macd': (12, 26, 9),
+            'zscore': 20, 'extreme': 20, 'rank': 100, 'roc': 5, 'spike': 20}
+TINY = {'sma': 2, 'std': 2, 'rsi': 2, 'ema': 2, 'atr': 2, 'adx': 2, 'macd': (2, 3, 2),
+        'zscore': 2, 'extreme': 2, 'rank': 2, 'roc': 2, 'spike': 2}
+UNIT = {'sma': 1, 'std': 1, 'rsi': 1, 'ema': 1, 'atr': 1, 'adx': 1, 'macd': (1, 2, 1),
+        'zscore': 1, 'extreme': 1, 'rank': 1, 'roc': 1, 'spike': 1}
+
+# --- DATASETS ---
+
+def load_stored(data_dir: str = DATA_DIR):
+    """(name, ohlc DataFrame) for every stored candle series (multi-symbol files split per symbol)."""
+    paths = sorted(glob.glob(os.path.join(data_dir, '*.csv')) + glob.glob(os.path.join(data_dir, '*', '*.csv')))
+    for path in paths:
+        try:
+            df = pd.read_csv(path)
+        except Exception as e:
+            print(f"Skipping {path}: {e}")
+            continue
+        if not {'high', 'low', 'close'}.issubset(df.columns):
+            continue
+        name = os.path.relpath(path, data_dir)
+        if 'symbol' in df.columns:
+            for symbol, group in df.groupby('symbol'):
+                yield f"{name}[{symbol}]", group.reset_index(drop=True)
+        else:
+            yield name, df
+
+def _ohlc(close, spread, volume=1.0):
+    close = np.asarray(close, dtype=float)
+    return pd.DataFrame({'open': close, 'high': close + spread, 'low': close - spread, 'close': close, 'volume': volume})
+
+def synthetic():
+    """(name, ohlc DataFrame, windows) edge cases."""
+    rng = np.random.default_rng(11)
+    walk = 100 + np.cumsum(rng.normal(0, 1, 5000))
+    spread = rng.uniform(0, 2, 5000)
+    volume = rng.lognormal(3, 1, 5000)
+    volume[rng.random(5000) < 0.02] = 0.0  # Empty bars (a zero volume average)
+    yield 'synthetic/random_walk', _ohlc(walk, spread, volume), STANDARD
+    yield 'synthetic/btc_scale', _ohlc(87000 + rng.normal(0, 0.5, 5000), spread * 0.1), STANDARD
+    yield 'synthetic/lunc_scale', _ohlc(0.00009 + rng.normal(0, 1e-7, 5000), spread * 1e-8), STANDARD
+    yield 'synthetic/constant', _ohlc(np.full(500, 100.0), 0.0), STANDARD
+    yield 'synthetic/ties', _ohlc(np.round(walk[:2000]), spread[:2000]), STANDARD
+    yield 'synthetic/monotonic_up', _ohlc(np.linspace(100, 200, 500), 0.5), STANDARD
+    yield 'synthetic/monotonic_down', _ohlc(np.linspace(200, 100, 500), 0.5), STANDARD
+    yield 'synthetic/short', _ohlc(walk[:10], spread[:10]), STANDARD
+    gappy = walk[:2000].copy()
+    gappy[500] = np.nan
+    gappy[1200:1230] = np.nan
+    yield 'synthetic/nan_gaps', _ohlc(gappy, spread[:2000], np.where(np.isnan(gappy), np.nan, volume[:2000])), STANDARD
+    leading = walk[:2000].copy()
+    leading[:40] = np.nan
+    yield 'synthetic/leading_nans', _ohlc(leading, spread[:2000]), STANDARD
+    yield 'synthetic/tiny_windows', _ohlc(walk[:2000], spread[:2000]), TINY
+    yield 'synthetic/unit_windows', _ohlc(walk[:2000], spread[:2000]), UNIT
+
+# --- IMPLEMENTATIONS ---
+
+def vesper_outputs(h, l, c, v, w):
+    upper, mid, lower = v_bollinger(c, w['sma'], 2.0)
+    macd, hist, signal = v_macd(c, *w['macd'])
+    adx, dmp, dmn = v_adx(h, l, c, w['adx'])
+    return {
+        'SMA': v_sma(c, w['sma']), 'STD': v_std_dev(c, w['std']),
+        'BBU': upper, 'BBM': mid, 'BBL': lower,
+        'RSI_sma': v_rsi(c, w['rsi']), 'RSI_wilder': v_rsi(c, w['rsi'], method='wilder'),
+        'EMA': v_ema(c, w['ema']), 'MACD': macd, 'MACDh': hist, 'MACDs': signal,
+        'TR': v_true_range(h, l, c), 'ATR': v_atr(h, l, c, w['atr']),
+        'ADX': adx, 'DMP': dmp, 'DMN': dmn,
+        'ZSCORE': v_zscore(c, w['zscore']), 'MAX': v_rolling_max(c, w['extreme']), 'MIN': v_rolling_min(c, w['extreme']),
+        'PRANK': v_percent_rank(c, w['rank']), 'ROC': v_roc(c, w['roc']), 'VOLSPIKE': v_volume_spike(v, w['spike']),
+    }
+
+def stream_outputs(h, l, c, v, w):
+    bands = StreamingBollinger(w['sma'], 2.0).update_many(c)
+    macd = StreamingMACD(*w['macd']).update_many(c)
+    adx = StreamingADX(w['adx']).update_many(zip(h, l, c))
+    return {
+        'SMA': StreamingSMA(w['sma']).update_many(c), 'STD': StreamingStdDev(w['std']).update_many(c),
+        'BBU': bands[:, 0], 'BBM': bands[:, 1], 'BBL': bands[:, 2],
+        'RSI_sma': StreamingRSI(w['rsi']).update_many(c),
+        'RSI_wilder': StreamingRSI(w['rsi'], method='wilder').update_many(c),
+        'EMA': StreamingEMA(w['ema']).update_many(c),
+        'MACD': macd[:, 0], 'MACDh': macd[:, 1], 'MACDs': macd[:, 2],
+        'ATR': StreamingATR(w['atr']).update_many(zip(h, l, c)),
+        'ADX': adx[:, 0], 'DMP': adx[:, 1], 'DMN': adx[:, 2],
+        'ZSCORE': StreamingZScore(w['zscore']).update_many(c),
+        'MAX': StreamingMax(w['extreme']).update_many(c), 'MIN': StreamingMin(w['extreme']).update_many(c),
+        'PRANK': StreamingPercentRank(w['rank']).update_many(c), 'ROC': StreamingROC(w['roc']).update_many(c),
+        'VOLSPIKE': StreamingVolumeSpike(w['spike']).update_many(v),
+    }
+
+def batch_outputs(h, l, c, v, w):
+    """
+    Batched kernels on a two-row matrix: the series and a shorter copy (so the
+    right-aligned padding path is exercised). Row 0 is returned.
+    """
+    half = len(c) // 2
+    H, L, C = (stack_series([a, a[half:]]) for a in (h, l, c))
+    upper, mid, lower = b_bollinger(C, w['sma'], 2.0)
+    macd, hist, signal = b_macd(C, *w['macd'])
+    adx, dmp, dmn = b_adx(H, L, C, w['adx'])
+    out = {
+        'SMA': b_sma(C, w['sma']), 'STD': b_std_dev(C, w['std']),
+        'BBU': upper, 'BBM': mid, 'BBL': lower,
+        'RSI_sma': b_rsi(C, w['rsi']), 'RSI_wilder': b_rsi(C, w['rsi'], method='wilder'),
+        'EMA': b_ema(C, w['ema']), 'MACD': macd, 'MACDh': hist, 'MACDs': signal,
+        'TR': b_true_range(H, L, C), 'ATR': b_atr(H, L, C, w['atr']),
+        'ADX': adx, 'DMP': dmp, 'DMN': dmn,
+    }
+    return {k: v[0] for k, v in out.items()}
+
+# --- REFERENCES ---
+
+def _rma(s, n):
+    return s.ewm(alpha=1 / n, min_periods=n).mean()
+
+def _ema(s, n):
+    """SMA-seeded EMA (pandas_ta convention) in plain pandas."""
+    first = s.first_valid_index()
+    out = pd.Series(np.nan, index=s.index)
+    if first is None:
+        return out
+    s = s.loc[first:].copy()
+    if len(s) < n:
+        return out
+    seed = s.iloc[:n].mean()
+    s.iloc[:n - 1] = np.nan
+    s.iloc[n - 1] = seed
+    return s.ewm(span=n, adjust=False).mean().reindex(out.index)
+
+def _two_pass_std(x, window):
+    """Exact rolling std: explicit windows, mean subtracted before squaring (NaN windows stay NaN)."""
+    out = np.full(len(x), np.nan)
+    if len(x) >= window:
+        out[window - 1:] = sliding_window_view(x, window).std(axis=1)
+    return pd.Series(out)
+
+def pandas_reference(h, l, c, v, w):
+    std = _two_pass_std(c, w['std'])
+    band = _two_pass_std(c, w['sma']) * 2.0
+    zscore_std = _two_pass_std(c, w['zscore'])
+    h, l, c, v = pd.Series(h), pd.Series(l), pd.Series(c), pd.Series(v)
+    mid = c.rolling(w['sma']).mean()
+
+    delta = c.diff()
+    padded = delta.copy()
+    padded.iloc[:1] = 0.0  # v_rsi(method='sma') pads the first diff with 0; later NaN diffs stay NaN
+    gain_sma = padded.clip(lower=0).rolling(w['rsi']).mean()
+    loss_sma = (-padded.clip(upper=0)).rolling(w['rsi']).mean()
+    rsi_sma = 100 - 100 / (1 + gain_sma / loss_sma)
+    rsi_sma[loss_sma == 0] = 100
+    rsi_sma[gain_sma == 0] = 0
+    gain_w, loss_w = _rma(delta.clip(lower=0), w['rsi']), _rma(-delta.clip(upper=0), w['rsi'])
+    rsi_wilder = 100 * gain_w / (gain_w + loss_w)
+    rsi_wilder[(gain_w + loss_w) == 0] = 0  # Vesper convention: no movement at all reads 0, like rsi_sma
+
+    zmean = c.rolling(w['zscore']).mean()
+    zscore = ((c - zmean) / zscore_std).where(zscore_std > 0, 0.0).where(zscore_std.notna())
+    prev_roc = c.shift(w['roc'])
+    roc = (c / prev_roc - 1).where(prev_roc != 0)
+    vol_avg = v.rolling(w['spike']).mean()
+    vol_spike = (v / vol_avg).where(vol_avg > 0, 0.0).where(vol_avg.notna())
+
+    fast, slow, sig = w['macd']
+    macd = _ema(c, fast) - _ema(c, slow)
+    signal = _ema(macd, sig)
+
+    prev = c.shift(1)
+    tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1, skipna=False)
+    atr = _rma(tr, w['atr'])
+    atr_adx = _rma(tr, w['adx'])
+    up, dn = h.diff(), -l.diff()
+    pos = (((up > dn) & (up > 0)) * up).where(up.notna())
+    neg = (((dn > up) & (dn > 0)) * dn).where(dn.notna())
+    dmp = 100 * _rma(pos, w['adx']) / atr_adx
+    dmn = 100 * _rma(neg, w['adx']) / atr_adx
+    adx = _rma(100 * (dmp - dmn).abs() / (dmp + dmn), w['adx'])
+    return {
+        'SMA': mid, 'STD': std, 'BBU': mid + band, 'BBM': mid, 'BBL': mid - band,
+        'RSI_sma': rsi_sma, 'RSI_wilder': rsi_wilder, 'EMA': _ema(c, w['ema']),
+        'MACD': macd, 'MACDh': macd - signal, 'MACDs': signal,
+        'TR': tr, 'ATR': atr, 'ADX': adx, 'DMP': dmp, 'DMN': dmn,
+        'ZSCORE': zscore, 'MAX': c.rolling(w['extreme']).max(), 'MIN': c.rolling(w['extreme']).min(),
+        'PRANK': c.rolling(w['rank']).rank(pct=True), 'ROC': roc, 'VOLSPIKE': vol_spike,
+    }
+
+def _column(df, prefix):
+    return next(df[col] for col in df.columns if col.startswith(prefix))
+
+def pandas_ta_reference(h, l, c, v, w):
+    import pandas_ta as ta
+    h, l, c = pd.Series(h), pd.Series(l), pd.Series(c)
+    bands = ta.bbands(c, length=w['sma'], std=2.0, ddof=0)
+    macd = ta.macd(c, *w['macd'])
+    adx = ta.adx(h, l, c, length=w['adx'])
+    return {
+        'SMA': ta.sma(c, length=w['sma']),
+        'BBU': _column(bands, 'BBU_'), 'BBM': _column(bands, 'BBM_'), 'BBL': _column(bands, 'BBL_'),
+        'RSI_wilder': ta.rsi(c, length=w['rsi']), 'EMA': ta.ema(c, length=w['ema']),
+        'MACD': _column(macd, 'MACD_'), 'MACDh': _column(macd, 'MACDh_'), 'MACDs': _column(macd, 'MACDs_'),
+        'TR': ta.true_range(h, l, c), 'ATR': ta.atr(h, l, c, length=w['atr']),
+        'ADX': _column(adx, 'ADX_'), 'DMP': _column(adx, 'DMP_'), 'DMN': _column(adx, 'DMN_'),
+    }
+
+def backtrader_reference(h, l, c, v, w):
+    import backtrader as bt
+    n = len(c)
+    index = pd.date_range('2020-01-01', periods=n, freq='min')
+    feed = bt.feeds.PandasData(dataname=pd.DataFrame({'open': c, 'high': h, 'low': l, 'close': c, 'volume': v}, index=index))
+    keys = ('SMA', 'STD', 'BBU', 'BBM', 'BBL', 'RSI_wilder', 'EMA', 'MACD', 'MACDs', 'ATR', 'ADX', 'DMP', 'DMN')
+    values = {k: [] for k in keys}
+
+    class Recorder(bt.Strategy):
+        def __init__(self):
+            d = self.datas[0]
+            fast, slow, sig = w['macd']
+            self.ind = {
+                'SMA': bt.ind.SMA(d.close, period=w['sma']),
+                'STD': bt.ind.StdDev(d.close, period=w['std']),
+                'BB': bt.ind.BollingerBands(d.close, period=w['sma'], devfactor=2.0),
+                'RSI_wilder': bt.ind.RSI(d.close, period=w['rsi'], safediv=True),
+                'EMA': bt.ind.EMA(d.close, period=w['ema']),
+                'MACD': bt.ind.MACD(d.close, period_me1=fast, period_me2=slow, period_signal=sig),
+                'ATR': bt.ind.ATR(d, period=w['atr']),
+                'DMI': bt.ind.DirectionalMovementIndex(d, period=w['adx']),
+            }
+
+        def _record(self):
+            ind = self.ind
+            row = {
+                'SMA': ind['SMA'][0], 'STD': ind['STD'][0],
+                'BBU': ind['BB'].top[0], 'BBM': ind['BB'].mid[0], 'BBL': ind['BB'].bot[0],
+                'RSI_wilder': ind['RSI_wilder'][0], 'EMA': ind['EMA'][0],
+                'MACD': ind['MACD'].macd[0], 'MACDs': ind['MACD'].signal[0],
+                'ATR': ind['ATR'][0], 'ADX': ind['DMI'].adx[0],
+                'DMP': ind['DMI'].plusDI[0], 'DMN': ind['DMI'].minusDI[0],
+            }
+            for k, v in row.items():
+                values[k].append(v)
+
+        prenext = _record
+        next = _record
+
+    cerebro = bt.Cerebro(stdstats=False)
+    cerebro.adddata(feed)
+    cerebro.addstrategy(Recorder)
+    cerebro.run(runonce=False)
+    return {k: np.asarray(v, dtype=float) for k, v in values.items()}
+
+REFERENCES = {'pandas': pandas_reference, 'pandas_ta': pandas_ta_reference, 'backtrader': backtrader_reference}
+IMPLEMENTATIONS = {'vesper': vesper_outputs, 'stream': stream_outputs, 'batch': batch_outputs}
+# Documented warm-up differences: bars not compared (values or NaN placement) per reference
+SETTLE = {'backtrader': {'RSI_wilder': BT_SETTLE, 'ATR': BT_SETTLE, 'ADX': BT_SETTLE, 'DMP': BT_SETTLE, 'DMN': BT_SETTLE}}
+# The batch kernels read a series' leading NaNs as left padding, so RSI(sma) pads its
+# first real diff with 0 (a series start) where v_rsi sees a NaN diff: NaN placement
+# may differ until first valid bar + the window (named by its key in the windows).
+LEADING_NAN_WARMUP = {('batch', 'RSI_sma'): 'rsi'}
+
+def available_references():
+    refs = ['pandas']
+    for name, module in (('pandas_ta', 'pandas_ta'), ('backtrader', 'backtrader')):
+        try:
+            __import__(module)
+            refs.append(name)
+        except ImportError:
+            print(f"{module} not installed: skipping the {name} reference.")
+    return refs
+
+# --- COMPARISON ---
+
+def compare(actual, expected, scale: float, skip: int = 0, nan_skip: int = 0, weight=None):
+    """
+    Returns (max_abs, max_rel, nan_mismatch) over the bars from `skip` on,
+    with max_rel = max_abs / scale. Errors are taken where both sides are finite,
+    multiplied by `weight` (per bar) if given; nan_mismatch counts bars from
+    `nan_skip` on where exactly one side is NaN.
+    """
+    a = np.asarray(actual, dtype=float)[skip:]
+    b = np.asarray(expected, dtype=float)[skip:]
+    a_nan, b_nan = ~np.isfinite(a), ~np.isfinite(b)
+    both = ~a_nan & ~b_nan
+    nan_mismatch = int((a_nan != b_nan)[max(nan_skip - skip, 0):].sum())
+    if weight is not None:
+        both &= np.isfinite(np.asarray(weight, dtype=float)[skip:])
+    if not both.any():
+        return 0.0, 0.0, nan_mismatch
+    diff = np.abs(a[both] - b[both])
+    if weight is not None:
+        diff = diff * np.asarray(weight, dtype=float)[skip:][both]
+    max_abs = float(diff.max())
+    return max_abs, max_abs / scale if scale > 0 else 0.0, nan_mismatch
+
+def within_tolerance(max_abs, max_rel, rtol, atol):
+    return max_abs <= atol or max_rel <= rtol
+
+def passes(max_abs, max_rel, nan_mismatch, args):
+    return within_tolerance(max_abs, max_rel, args.rtol, args.atol) and (nan_mismatch == 0 or args.lenient_nan)
+
+def run(args):
+    references = available_references()
+    datasets = [(name, df, STANDARD) for name, df in load_stored(args.data_dir)] + list(synthetic())
+    print(f"Verifying Vesper over {len(datasets)} datasets against {references}")
+
+    # (impl, ref, key) -> worst dataset (max_abs, max_rel, nan_mismatch, dataset): failing first, then by error
+    summary = {}
+    failures = []
+    for name, df, windows in datasets:
+        h, l, c = (df[k].to_numpy(dtype=float) for k in ('high', 'low', 'close'))
+        v = df['volume'].to_numpy(dtype=float) if 'volume' in df.columns else np.ones(len(c))
+        price_scale = float(np.nanmax(np.abs(c))) if np.isfinite(c).any() else 1.0
+        first_valid = int(np.argmax(np.isfinite(c))) if np.isfinite(c).any() else len(c)
+        zscore_std = _two_pass_std(c, windows['zscore']).to_numpy()
+        outputs = {impl: fn(h, l, c, v, windows) for impl, fn in IMPLEMENTATIONS.items()}
+        for ref in references:
+            try:
+                expected = REFERENCES[ref](h, l, c, v, windows)
+            except Exception as e:
+                print(f"  {ref} failed on {name}: {e}")
+                continue
+            for impl, actual in outputs.items():
+                for key in sorted(set(actual) & set(expected)):
+                    skip = SETTLE.get(ref, {}).get(key, 0)
+                    window = LEADING_NAN_WARMUP.get((impl, key))
+                    nan_skip = first_valid + windows[window] if window and first_valid else 0
+                    scale = 100.0 if key in OSCILLATORS else 1.0 if key in UNITLESS else price_scale
+                    weight = zscore_std if key == 'ZSCORE' else None
+                    max_abs, max_rel, nan_mismatch = compare(actual[key], expected[key], scale, skip, nan_skip, weight)
+                    ok = passes(max_abs, max_rel, nan_mismatch, args)
+                    if not ok:
+                        failures.append((impl, ref, key, name))
+                    if args.verbose:
+                        status = 'ok' if ok else 'FAIL'
+                        print(f"  {impl:<7} {ref:<10} {key:<11} {name:<40} abs={max_abs:.3e} rel={max_rel:.3e} nan≠{nan_mismatch} {status}")
+                    row = (max_abs, max_rel, nan_mismatch, name)
+                    worst = summary.get((impl, ref, key))
+                    if worst is None or (not ok, max_rel, max_abs) > (not passes(*worst[:3], args), worst[1], worst[0]):
+                        summary[(impl, ref, key)] = row
+
+    print(f"\n{'impl':<7} {'reference':<10} {'indicator':<11} {'max abs':>10} {'max rel':>10} {'nan≠':>6}  worst dataset")
+    for (impl, ref, key), (max_abs, max_rel, nan_mismatch, name) in sorted(summary.items()):
+        flag = '' if passes(max_abs, max_rel, nan_mismatch, args) else '  <-- FAIL'
+        print(f"{impl:<7} {ref:<10} {key:<11} {max_abs:10.3e} {max_rel:10.3e} {nan_mismatch:6d}  {name}{flag}")
+
+    print(f"\n{len(failures)} comparison(s) outside rtol={args.rtol:g} / atol={args.atol:g}"
+          f"{'' if args.lenient_nan else ' or with NaN mismatches'}.")
+    for impl, ref, key, name in failures[:20]:
+        print(f"  {impl} vs {ref}: {key} on {name}")
+    return 1 if failures else 0
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Vesper parity harness")
+    parser.add_argument("--data-dir", type=str, default=DATA_DIR)
+    parser.add_argument("--rtol", type=float, default=RTOL)
+    parser.add_argument("--atol", type=float, default=ATOL)
+    parser.add_argument("--lenient-nan", action="store_true", help="Report NaN placement differences without failing")
+    parser.add_argument("--verbose", action="store_true", help="Print every dataset comparison")
+    sys.exit(run(parser.parse_args()))
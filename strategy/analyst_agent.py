@@ -18,6 +18,8 @@ class AnalystAgent(BaseStrategy):
     - Cointelegraph
     - CryptoSlate
     """
+    # The last sentiment survives a restart; it is refreshed once analysis_interval has passed
+    state_attrs = ('sentiment_score', 'confidence', 'latest_headlines', 'last_analysis_time')
     
     def __init__(self):
         super().__init__("AnalystAgent")
@@ -1,9 +1,98 @@
 from abc import ABC, abstractmethod
-from typing import Dict, Any, Optional
+from typing import Dict, Any, Optional, Tuple
+import numpy as np
+import pandas as pd
+from utils.indicator_cache import IndicatorCache
+from utils.ring_buffer import OHLCVBuffer
+
+def state_id(strategy: 'BaseStrategy') -> str:
+    """Class and state version a snapshot of this strategy belongs to (data/council_state.py)."""
+    cls = type(strategy)
+    return f"{cls.__module__}.{cls.__qualname__}/v{cls.STATE_VERSION}"
 
 class BaseStrategy(ABC):
+    # Streaming state saved in council state snapshots; bump STATE_VERSION when its meaning changes
+    STATE_VERSION = 1
+    state_attrs: Tuple[str, ...] = ()
+
     def __init__(self, name: str):
         self.name = name
+        self.indicators: Optional[IndicatorCache] = None
+        self._owns_indicators = True
+        self.last_candle_ts: Optional[float] = None  # Epoch ms of the newest candle processed
+
+    def is_new_candle(self, candle: Dict[str, Any]) -> bool:
+        """
+        True (and remembered) for a candle newer than the last one processed. The live loop
+        feeds the still-forming candle every cycle; a repeated timestamp is skipped here so
+        the indicator cache and every streaming indicator see each candle exactly once.
+        Candles without a timestamp are always new.
+        """
+        ts = OHLCVBuffer._value(candle.get('timestamp'))
+        if np.isnan(ts):
+            return True
+        if self.last_candle_ts is not None and ts <= self.last_candle_ts:
+            return False
+        self.last_candle_ts = ts
+        return True
+
+    def _primed_through(self, history: pd.DataFrame):
+        """Remembers the newest primed candle, so it is not processed again live."""
+        if len(history) and 'timestamp' in history.columns:
+            ts = OHLCVBuffer._column(history, 'timestamp')[-1]
+            if not np.isnan(ts):
+                self.last_candle_ts = ts
+
+    def attach_indicators(self, cache: IndicatorCache):
+        """
+        Shares an indicator cache owned (and fed) by a parent strategy such as MetaStrategy.
+        """
+        self.indicators = cache
+        self._owns_indicators = False
+
+    def use_indicators(self, candle: Dict[str, Any]) -> IndicatorCache:
+        """
+        Returns this strategy's indicator cache for the current candle.
+        A standalone strategy owns its cache and feeds it here; a shared cache is already fed.
+        """
+        if self.indicators is None:
+            self.indicators = IndicatorCache()
+        if self._owns_indicators:
+            self.indicators.update(candle)
+        return self.indicators
+
+    def prime(self, history: pd.DataFrame):
+        """
+        Warms the strategy up on past candles (columns timestamp, open, high, low, close,
+        volume; oldest first) in bulk, leaving the state on_candle() over them would, but
+        without producing signals. The next on_candle() must be a newer candle.
+        Default: bulk-load the indicator cache if this strategy owns it (a shared cache is
+        primed by its owner). Strategies with their own streaming state extend this.
+        """
+        if self._owns_indicators:
+            if self.indicators is None:
+                self.indicators = IndicatorCache()
+            self.indicators.extend(history)
+        self._primed_through(history)
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Streaming state to snapshot: the state_attrs, plus the indicator cache if this
+        strategy owns it. Pickled as is, so it must not hold clients, models or loggers.
+        """
+        state = {attr: getattr(self, attr) for attr in self.state_attrs}
+        state['last_candle_ts'] = self.last_candle_ts
+        if self._owns_indicators and self.indicators is not None:
+            state['indicators'] = self.indicators
+        return state
+
+    def set_state(self, state: Dict[str, Any], history: Optional[pd.DataFrame] = None):
+        """
+        Restores get_state() output. history: the candles the snapshot covers, for state
+        that cannot be restored and has to be primed instead.
+        """
+        for attr, value in state.items():
+            setattr(self, attr, value)
 
     @abstractmethod
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
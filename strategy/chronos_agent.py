@@ -18,8 +18,9 @@ class ChronosAgent(BaseStrategy):
     def __init__(self, model_size: str = "tiny"):
         super().__init__("ChronosAgent")
         self.logger = setup_logger(self.name)
-        self.history = []
         self.min_history = 30  # Need some context
+        self.context_length = 100 # Candles of history considered
+        self.history = np.empty(0) # Latest closes (view of the indicator ring buffer)
         
         # Placeholder for model
         self.pipeline = None
@@ -35,15 +36,12 @@ class ChronosAgent(BaseStrategy):
     
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         close_price = candle.get('close', 0)
-        self.history.append(close_price)
-        
-        # Keep history manageable
-        if len(self.history) > 100:
-            self.history = self.history[-100:]
-            
-        if len(self.history) < self.min_history:
+        ind = self.use_indicators(candle)
+        if len(ind) < self.min_history:
             return None
-            
+        
+        # Bounded history: a view over the shared ring buffer
+        self.history = ind.array('close')[-self.context_length:]
         forecast = self._predict()
         
         if not forecast:
@@ -121,7 +119,7 @@ class ChronosAgent(BaseStrategy):
         # PATH A: REAL MODEL
         if self.model_loaded and self.pipeline:
             try:
-                context = torch.tensor(self.history[-self.min_history:])
+                context = torch.tensor(self.history[-self.min_history:], dtype=torch.float32)
                 forecast = self.pipeline.predict(context, 5) # Forecast 5 steps
                 # Chronos returns quantiles. We want median (0.5) usually.
                 # structure is (batch, num_samples, prediction_length)
@@ -143,7 +141,7 @@ class ChronosAgent(BaseStrategy):
         Oracle Simulation: Uses a local windowed-trend analysis to simulate 
         a Foundation Model's zero-shot forecasting behavior.
         """
-        data = np.array(self.history[-30:])
+        data = self.history[-30:]
         
         # Simulate "Zero-Shot" logic: 
         # 1. Detect dominant trend via linear regression
@@ -1,4 +1,4 @@
-from .base_strategy import BaseStrategy
+from .base_strategy import BaseStrategy, state_id
 from .bollinger_strategy import BollingerStrategy
 from .technical_sub_agents import TrendAgent, OscillatorAgent, VolumeAgent
 from .analyst_agent import AnalystAgent
@@ -7,6 +7,8 @@ from .chronos_agent import ChronosAgent
 from .timegpt_agent import TimeGPTAgent
 from typing import Dict, Any, Optional, List
 from utils.logger import setup_logger
+from utils.indicator_cache import IndicatorCache
+from utils.vesper_stream import StreamingZScore
 import json
 import os
 from datetime import datetime
@@ -33,6 +35,11 @@ class MetaStrategy(BaseStrategy):
         self.agents = agents
         self.voting_method = voting_method
         
+        # One indicator cache per symbol, fed once per candle and shared by every agent
+        self.indicators = IndicatorCache()
+        for agent in agents:
+            agent.attach_indicators(self.indicators)
+        
         # Track agent performance for weighted voting
         self.agent_weights = {agent.name: 1.0 for agent in agents}
         self.min_confidence = 0.6  # Minimum consensus confidence to execute
@@ -43,8 +50,8 @@ class MetaStrategy(BaseStrategy):
         self.shadow_depth = 5   # Number of candles to wait before evaluation
         
         # Regime Detection Implementation (Martial Law)
-        self.price_history = []
         self.regime_window = 14
+        self.regime_stats = StreamingZScore(self.regime_window) # Rolling mean/std of price, O(1) per candle
         self.volatility_threshold = 0.015 # 1.5% volatility = Wartime
         self.current_regime = "PEACE"
         
@@ -82,15 +89,19 @@ class MetaStrategy(BaseStrategy):
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Collects votes from all agents and makes final decision.
+        A candle whose timestamp is not newer than the last one is skipped before any
+        agent sees it, so the shared cache and the agents' own streams stay in step.
         """
+        if not self.is_new_candle(candle):
+            return None
+        self.indicators.update(candle)
+        
         # --- SHADOW TRACKING: Evaluation ---
         current_price = candle['close']
         self._evaluate_shadow_votes(current_price)
         
         # --- REGIME DETECTION ---
-        self.price_history.append(current_price)
-        if len(self.price_history) > self.regime_window:
-            self.price_history.pop(0)
+        self.regime_stats.update(current_price)
         self._detect_regime()
 
         # Collect votes from all agents
@@ -133,6 +144,69 @@ class MetaStrategy(BaseStrategy):
         
         return decision
 
+    def prime(self, history):
+        """
+        Bulk warm-up of the whole council: the shared indicator cache is loaded once,
+        the regime statistics primed, then every agent primes its own state.
+        No votes are cast, so shadow tracking starts with the first live candle.
+        """
+        if not len(history):
+            return
+        self.indicators.extend(history)
+        self.regime_stats.prime(history['close'].to_numpy(dtype=float))
+        self._detect_regime()
+        self._primed_through(history)
+        for agent in self.agents:
+            try:
+                agent.prime(history)
+            except Exception as e:
+                self.logger.error(f"Agent {agent.name} failed to prime: {e}")
+        self.logger.info(f"Primed council on {len(history)} candles")
+
+    def get_state(self) -> Dict[str, Any]:
+        """
+        Council state for a snapshot: shared indicator cache, shadow votes, merit weights,
+        regime, and each agent's own state tagged with its class and state version.
+        """
+        return {
+            'indicators': self.indicators,
+            'vote_history': self.vote_history,
+            'agent_weights': self.agent_weights,
+            'regime_stats': self.regime_stats,
+            'current_regime': self.current_regime,
+            'last_candle_ts': self.last_candle_ts,
+            'agents': {agent.name: (state_id(agent), agent.get_state()) for agent in self.agents},
+        }
+
+    def set_state(self, state: Dict[str, Any], history=None):
+        """
+        Restores get_state() output. Agents whose class or state version changed since the
+        snapshot are primed on `history` (the candles it covers) instead.
+        """
+        self.indicators = state['indicators']
+        for agent in self.agents:
+            agent.attach_indicators(self.indicators)
+        self.vote_history = state['vote_history']
+        for agent_name, weight in state['agent_weights'].items():
+            if agent_name in self.agent_weights:
+                self.agent_weights[agent_name] = weight
+        self.regime_stats = state['regime_stats']
+        self.current_regime = state['current_regime']
+        self.last_candle_ts = state.get('last_candle_ts')
+
+        for agent in self.agents:
+            saved = state['agents'].get(agent.name)
+            if saved is not None and saved[0] == state_id(agent):
+                agent.set_state(saved[1], history)
+            else:
+                self.logger.warning(f"No compatible snapshot state for {agent.name}; priming it from candles")
+                if history is not None and len(history):
+                    agent.prime(history)
+
+    def indicator_stats(self) -> Dict[str, Any]:
+        """Hit/miss counters of the shared indicator cache (for the dashboard)."""
+        return self.indicators.stats()
+
     def _evaluate_shadow_votes(self, current_price: float):
         """Processes shadow history to update agent merits."""
         remaining_history = []
@@ -192,13 +266,11 @@ class MetaStrategy(BaseStrategy):
 
     def _detect_regime(self):
         """Calculates volatility and sets PEACETIME or MARTIAL LAW status."""
-        if len(self.price_history) < self.regime_window:
+        if not self.regime_stats.ready:
             return
 
-        # Calculate standard deviation as a proxy for volatility
-        import numpy as np
-        prices = np.array(self.price_history)
-        volatility = np.std(prices) / np.mean(prices)
+        # Standard deviation relative to the mean as a proxy for volatility
+        volatility = self.regime_stats.std / self.regime_stats.mean
         
         if volatility > self.volatility_threshold:
             if self.current_regime != "WAR":
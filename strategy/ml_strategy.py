@@ -1,104 +1,120 @@
 from .base_strategy import BaseStrategy
 from typing import Dict, Any, Optional, List
-import pandas as pd
 import numpy as np
-from stable_baselines3 import PPO
-from stable_baselines3.common.vec_env import VecNormalize, DummyVecEnv
-from ml.feature_engineer import FeatureEngineer
-from ml.trading_env import TradingEnv
+from ml.feature_pipeline import FeaturePipeline
+from ml.inference_service import ServedModel, load_model, VALIDATION_CANDLES
+from utils.ring_buffer import OHLCVBuffer
 from utils.logger import setup_logger
 import os
 
 class MLStrategy(BaseStrategy):
-    def __init__(self, model_path='models/ppo_model', analyst_agent=None, onchain_agent=None):
+    state_attrs = ('features', 'history')
+
+    def __init__(self, model_path='models/ppo_model', analyst_agent=None, onchain_agent=None, inference_service=None,
+                 allow_unnormalized=False, legacy_stats_path=None):
         super().__init__("MLStrategy")
         self.logger = setup_logger(self.name)
-        self.fe = FeatureEngineer()
-        self.data_buffer: List[Dict] = []
         self.min_history = 50
         self.analyst_agent = analyst_agent
         self.onchain_agent = onchain_agent
         
-        path = os.path.join(os.getcwd(), model_path)
-        stats_path = os.path.join(os.getcwd(), 'models', 'vec_normalize.pkl')
-        
-        # Load Normalization Stats
-        self.norm_env = None
-        if os.path.exists(stats_path):
+        # Shared batched inference (ml/inference_service.py): the service owns the model, loaded
+        # once for every pair and hot-swappable; without one the strategy loads its own.
+        self.inference_service = inference_service
+        self.served: Optional[ServedModel] = None
+        self.pipeline = FeaturePipeline()
+        self.model = None
+        self.normalize_obs = True
+        self.features = self.pipeline.stream()
+        # Recent candles: a reloaded model is validated on them before it is swapped in
+        self.history = OHLCVBuffer(VALIDATION_CANDLES)
+
+        if inference_service is not None:
+            inference_service.register(self)
+            if inference_service.active is not None:
+                self._serve(inference_service.active)
+        else:
+            # Feature pipeline saved with the model (older models fall back to the shared
+            # vec_normalize.pkl, or legacy_stats_path) and the exported NumPy policy, or the SB3
+            # checkpoint without one
+            path = os.path.join(os.getcwd(), model_path)
+            stats_path = legacy_stats_path or os.path.join(os.getcwd(), 'models', 'vec_normalize.pkl')
             try:
-                # We need a dummy env to load stats into. 
-                # Create a minimal valid TradingEnv to satisfy checks
-                features = ['open', 'high', 'low', 'close', 'volume', 
-                           'RSI', 'MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9',
-                           'BBL_20_2.0', 'BBM_20_2.0', 'BBU_20_2.0', 'BBB_20_2.0', 'BBP_20_2.0',
-                           'ATR', 'EMA_50', 'ADX_14', 'DMP_14', 'DMN_14', 'padding']
-                
-                dummy_data = {col: [100.0]*5 for col in features} 
-                dummy_df = pd.DataFrame(dummy_data)
-                env_maker = lambda: TradingEnv(dummy_df)
-                
-                self.norm_env = VecNormalize.load(stats_path, DummyVecEnv([env_maker]))
-                self.norm_env.training = False 
-                self.norm_env.norm_reward = False
-                self.logger.info("Loaded Normalization Statistics.")
+                served = load_model(path, legacy_stats_path=stats_path, allow_unnormalized=allow_unnormalized)
             except Exception as e:
-                self.logger.error(f"Failed to load normalization stats: {e}")
+                self.logger.error(f"Not serving {model_path}: {e}")
+                served = None
+            if served is not None:
+                self._serve(served)
 
-        if os.path.exists(path + ".zip"):
-            self.model = PPO.load(path)
-            self.logger.info(f"Loaded ML model from {path}")
-        else:
-            self.logger.error(f"Model not found at {path}")
-            self.model = None
+    def _serve(self, served: ServedModel):
+        """
+        Switches to a loaded model. The feature stream is kept unless the new pipeline
+        computes its indicators differently, in which case it restarts (and warms up again).
+        """
+        if served.pipeline.indicators != self.features.params:
+            if self.features.candles_seen:
+                self.logger.warning(f"Model {served.name} uses different indicator parameters; restarting features")
+            self.features = served.pipeline.stream()
+        self.served = served
+        self.pipeline = served.pipeline
+        self.model = served.policy
+        self.normalize_obs = served.normalize_obs
 
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
+    def prime(self, history):
+        """Bulk warm-up: candle history for reload validation and the feature stream."""
+        if self.inference_service is not None and self.inference_service.active is not None \
+                and self.inference_service.active is not self.served:
+            self._serve(self.inference_service.active)
+        self.history.extend(history)
+        self.features.prime(history)
+        self._primed_through(history)
+
+    def set_state(self, state, history=None):
+        """Restores the feature stream only if it was built with the served pipeline's indicator parameters."""
+        features = state.get('features')
+        if features is not None and features.params != self.pipeline.indicators:
+            self.logger.warning("Snapshot features use different indicator parameters; priming them from candles")
+            state = {k: v for k, v in state.items() if k != 'features'}
+            if history is not None:
+                self.features.prime(history)
+        super().set_state(state, history)
+
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.data_buffer.append(candle)
-        if len(self.data_buffer) > 100: 
-            self.data_buffer.pop(0)
-            
-        if len(self.data_buffer) < self.min_history:
-            return None
+        # Follow the model selected on the service (hot swap)
+        if self.inference_service is not None and self.inference_service.active is not self.served \
+                and self.inference_service.active is not None:
+            self._serve(self.inference_service.active)
 
-        if not self.model:
-            return None
+        if not self.is_new_candle(candle):
+            return None  # Same candle again: history and features already hold it
 
-        # Prepare Data
-        df = pd.DataFrame(self.data_buffer)
-        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
-        
-        df = self.fe.add_technical_indicators(df)
-        df = self.fe.scale_data(df, ['open', 'high', 'low', 'close', 'volume', 'RSI', 'ATR'])
-        
-        if df.empty:
+        # Update streaming feature state every candle (None while indicators warm up)
+        self.history.append(candle)
+        vector = self.features.update(candle)
+        if vector is None or self.features.candles_seen < self.min_history:
             return None
 
-        # Filter strictly numeric columns
-        df_numeric = df.select_dtypes(include=[np.number])
+        if not self.model:
+            return None
 
-        # Get latest state
-        if df_numeric.empty:
-             return None
-             
-        current_features = df_numeric.iloc[-1].tolist()
-        
-        # Construct observation (Mocking balance)
-        obs = np.array([10000.0, 0.0] + current_features).astype(np.float32)
-        
-        # Normalize Observation
-        if self.norm_env:
-            obs = self.norm_env.normalize_obs(obs)
-        
         try:
-            action, _states = self.model.predict(obs, deterministic=True)
+            if self.inference_service is not None:
+                # Joins this cycle's batch (one forward pass for every pair)
+                action = await self.inference_service.predict(vector, model=self.served)
+            else:
+                # Construct observation (Mocking balance): ordered, scaled and normalized by the pipeline
+                obs = self.pipeline.observation(vector, normalize=self.normalize_obs)
+                action, _states = self.model.predict(obs, deterministic=True)
             
             # Action Map: 0=Hold, 1=Buy, 2=Sell
             close_price = candle['close']
             
-            # Extract key indicators for Reasoning
-            last_row = df.iloc[-1]
+            # Extract key indicators for Reasoning (unscaled)
+            last_row = self.features.as_dict()
             reasoning = {
                 'RSI': float(last_row.get('RSI', 0)),
                 'MACD': float(last_row.get('MACD_12_26_9', 0)),
@@ -1,62 +1,87 @@
-import pandas as pd
 import numpy as np
 from .base_strategy import BaseStrategy
+from utils.ring_buffer import OHLCVBuffer
 from typing import Dict, Any, Optional
 from utils.logger import setup_logger
-from utils.vesper_math import v_sma, v_std_dev, v_rsi # Vesper Core
+from utils.vesper_stream import StreamingZScore, StreamingSMA, StreamingRSI, StreamingROC, StreamingVolumeSpike
 
 class NewtonAgent(BaseStrategy):
     """
     Newton Agent: 'Action = Reaction'.
     Focussed on catching 'Falling Knives' using the Elasticity principle.
     Wakes up only during extreme 4-5 sigma crashes.
+    Keeps streaming indicator state (Vesper Stream), so each candle costs O(1)
+    regardless of uptime.
     """
+    state_attrs = ('candles_seen', 'zscore', 'sma200', 'rsi', 'velocity', 'vol_spike')
+
     def __init__(self, sigma_threshold: float = 4.0, velocity_threshold: float = 0.03):
         super().__init__("NewtonAgent")
         self.logger = setup_logger(self.name)
-        self.history = []
         self.sigma_threshold = sigma_threshold
         self.velocity_threshold = velocity_threshold # 3% crash in 5 mins
         self.min_history = 200 # Need 200 EMA context
+        self.candles_seen = 0
+
+        # Vesper Stream state, fed once per candle
+        self.zscore = StreamingZScore(20)
+        self.sma200 = StreamingSMA(200)
+        self.rsi = StreamingRSI(14, method='wilder')
+        self.velocity = StreamingROC(5)
+        self.vol_spike = StreamingVolumeSpike(20)
         
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
+    def prime(self, history):
+        """Bulk warm-up of the streaming state from past candles (no per-candle signal logic)."""
+        if not len(history):
+            return
+        close = history['close'].to_numpy(dtype=float)
+        self.zscore.prime(close)
+        self.sma200.prime(close)
+        self.rsi.prime(close)
+        self.velocity.prime(close)
+        self.vol_spike.prime(history['volume'].to_numpy(dtype=float))
+        self.candles_seen += len(history)
+        self._primed_through(history)
+
+    def _update_state(self, candle: Dict[str, Any]) -> float:
+        close = OHLCVBuffer._value(candle.get('close'))  # Missing -> NaN: the streams skip the gap
+        self.zscore.update(close)
+        self.sma200.update(close)
+        self.rsi.update(close)
+        self.velocity.update(close)
+        self.vol_spike.update(OHLCVBuffer._value(candle.get('volume')))
+        self.candles_seen += 1
+        return close
+
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.history.append(candle)
-        if len(self.history) < self.min_history:
+        if not self.is_new_candle(candle):
+            return None  # Same candle again: the streams already hold it
+        close = self._update_state(candle)
+        if self.candles_seen < self.min_history or np.isnan(close):
             return None
             
-        df = pd.DataFrame(self.history)
-        close_prices = df['close']
-        volumes = df['volume']
-        
         # 1. PHYSICS OF A CRASH: Standard Deviation (σ)
-        data = df['close'].values
-        volumes = df['volume'].values
-        
-        # Vesper: Vectorized Mean and Std Dev
-        mean = v_sma(data, 20)[-1]
-        std = v_std_dev(data, 20)[-1]
-        z_score = abs(candle['close'] - mean) / std if std > 0 else 0
+        # Running z-score over 20 candles (0 on a flat window)
+        mean = self.zscore.mean
+        z_score = abs(self.zscore.value)
         
         # 2. VELOCITY: Price drops > 3% in last 5 candles (assuming 1m/5m timeframe)
-        price_5m_ago = data[-6] if len(data) > 5 else data[0]
-        velocity = (candle['close'] - price_5m_ago) / price_5m_ago
+        velocity = self.velocity.value
         
         # 3. EXTENSION: % below 200 EMA
         # Using SMA for Vesper Speedup (Approximation)
-        ema200 = v_sma(data, 200)[-1]
+        ema200 = self.sma200.value
         if np.isnan(ema200): ema200 = mean # Fallback if history < 200
-        extension = (candle['close'] - ema200) / ema200
+        extension = (close - ema200) / ema200
         
-        # 4. EXHAUSTION: RSI < 15
-        rsi_series = v_rsi(data, 14)
-        rsi = rsi_series[-1]
+        # 4. EXHAUSTION: RSI < 15 (threshold assumes Wilder RSI)
+        rsi = self.rsi.value
         
         # 5. CLIMAX: Volume spike > 5x 20-candle average
-        vol_avg = v_sma(volumes, 20)[-1]
-        vol_spike = candle['volume'] / vol_avg if vol_avg > 0 else 0
+        vol_spike = self.vol_spike.value
         
         # --- KNIFE CATCH TRIGGER ---
         # "Wakes up only during crashes"
@@ -70,7 +95,7 @@ class NewtonAgent(BaseStrategy):
                 'vote': 'buy',
                 'confidence': 0.9, # High conviction for anomalous bounce
                 'agent': self.name,
-                'price': candle['close'],
+                'price': close,
                 'strategy': 'Knife Catch',
                 'reasoning': {
                     'z_score': z_score,
@@ -1,56 +1,74 @@
 from .base_strategy import BaseStrategy
-from typing import Dict, Any, Optional, List
-import pandas as pd
+from typing import Dict, Any, Optional
 import numpy as np
 from utils.logger import setup_logger
+from utils.vesper_stream import StreamingSMA
+
+TIE_TOLERANCE = 1e-10  # Relative gap below which the two SMAs count as equal (float noise, not a cross)
+
+def compare_sma(short_sma: float, long_sma: float) -> Optional[int]:
+    """-1, 0 or 1 as the short SMA is below, level with or above the long SMA (NaN -> None)."""
+    if np.isnan(short_sma) or np.isnan(long_sma):
+        return None
+    gap = short_sma - long_sma
+    if abs(gap) <= TIE_TOLERANCE * max(abs(short_sma), abs(long_sma)):
+        return 0
+    return 1 if gap > 0 else -1
 
 class SMAStrategy(BaseStrategy):
+    """
+    SMA crossover. Both SMAs are running sums (Vesper Stream) and the previous
+    comparison is kept, so each candle costs a few float operations.
+    """
+    state_attrs = ('short_sma', 'long_sma', 'prev_position')
+
     def __init__(self, short_window: int = 10, long_window: int = 50):
         super().__init__("SMAStrategy")
         self.short_window = short_window
         self.long_window = long_window
-        self.prices: List[float] = []
+        self.short_sma = StreamingSMA(short_window)
+        self.long_sma = StreamingSMA(long_window)
+        self.prev_position: Optional[int] = None  # compare_sma() on the previous candle
         self.logger = setup_logger(self.name)
 
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         # SMA strategy primarily works on candles/history, but can track real-time price
         return None
 
+    def prime(self, history):
+        """Bulk warm-up: both SMAs primed from past closes, and the last comparison kept."""
+        if not len(history):
+            return
+        close = history['close'].to_numpy(dtype=float)
+        self.short_sma.prime(close)
+        self.long_sma.prime(close)
+        self.prev_position = compare_sma(self.short_sma.value, self.long_sma.value)
+        self._primed_through(history)
+
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         """
         Expects candle data: {'close': float, ...}
         """
         close_price = candle.get('close')
-        if close_price is None:
+        if close_price is None or not self.is_new_candle(candle):
             return None
 
-        self.prices.append(close_price)
-        
-        # Keep only necessary history
-        if len(self.prices) > self.long_window + 1:
-            self.prices.pop(0)
+        short_sma = self.short_sma.update(close_price)
+        long_sma = self.long_sma.update(close_price)
+        prev_position, position = self.prev_position, compare_sma(short_sma, long_sma)
+        self.prev_position = position
 
-        if len(self.prices) < self.long_window:
+        if prev_position is None or position is None:
             return None
 
-        # Calculate SMAs
-        df = pd.DataFrame({'close': self.prices})
-        df['short_sma'] = df['close'].rolling(window=self.short_window).mean()
-        df['long_sma'] = df['close'].rolling(window=self.long_window).mean()
-
-        short_sma = df['short_sma'].iloc[-1]
-        long_sma = df['long_sma'].iloc[-1]
-        prev_short_sma = df['short_sma'].iloc[-2]
-        prev_long_sma = df['long_sma'].iloc[-2]
-
         # Check for crossover
         # Bullish Crossover: Short crosses above Long
-        if prev_short_sma <= prev_long_sma and short_sma > long_sma:
+        if prev_position <= 0 and position > 0:
             self.logger.info(f"BUY Signal: Short SMA ({short_sma:.2f}) crossed above Long SMA ({long_sma:.2f})")
             return {'side': 'buy', 'price': close_price}
         
         # Bearish Crossover: Short crosses below Long
-        elif prev_short_sma >= prev_long_sma and short_sma < long_sma:
+        elif prev_position >= 0 and position < 0:
             self.logger.info(f"SELL Signal: Short SMA ({short_sma:.2f}) crossed below Long SMA ({long_sma:.2f})")
             return {'side': 'sell', 'price': close_price}
 
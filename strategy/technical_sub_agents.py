@@ -4,29 +4,23 @@ from typing import Dict, Any, Optional
 from utils.logger import setup_logger
 import pandas as pd
 import numpy as np
-from utils.vesper_math import v_sma, v_rsi # Vesper Core
 
 class TrendAgent(BaseStrategy):
     """Focussed exclusively on trend following indicators (EMA, MACD)."""
     def __init__(self):
         super().__init__("TrendAgent")
         self.logger = setup_logger(self.name)
-        self.history = []
 
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.history.append(candle['close'])
-        if len(self.history) < 26: return None # Need 26 for MACD
+        ind = self.use_indicators(candle)
+        if len(ind) < 26: return None # Need 26 for MACD
         
-        # Vesper Acceleration
-        data = np.array(self.history)
-        
-        # Using SMA as proxy for EMA in Vesper v1 for speed (or implement v_ema later)
-        # For now, sticking to SMA speedup as per benchmark
-        sma8 = v_sma(data, 8)[-1]
-        sma21 = v_sma(data, 21)[-1]
+        # Using SMA as proxy for EMA in Vesper v1 (shared indicator cache, newest value only)
+        sma8 = ind.latest('sma', 8)
+        sma21 = ind.latest('sma', 21)
         
         side = 'hold'
         confidence = 0.5
@@ -44,19 +38,15 @@ class OscillatorAgent(BaseStrategy):
     def __init__(self):
         super().__init__("OscillatorAgent")
         self.logger = setup_logger(self.name)
-        self.history = []
 
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.history.append(candle['close'])
-        if len(self.history) < 15: return None
+        ind = self.use_indicators(candle)
+        if len(ind) < 15: return None
         
-        # Vesper Acceleration
-        data = np.array(self.history)
-        rsi_series = v_rsi(data, 14)
-        rsi = rsi_series[-1]
+        rsi = ind.latest('rsi', 14, 'wilder') # 30/70 thresholds assume Wilder RSI
         
         side = 'hold'
         confidence = 0.5
@@ -74,21 +64,19 @@ class VolumeAgent(BaseStrategy):
     def __init__(self):
         super().__init__("VolumeAgent")
         self.logger = setup_logger(self.name)
-        self.history = []
 
     async def on_tick(self, data: Dict[str, Any]) -> Optional[Dict[str, Any]]:
         return None
 
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        v = candle['volume']
-        c = candle['close']
-        self.history.append({'close': c, 'volume': v})
-        if len(self.history) < 5: return None
+        ind = self.use_indicators(candle)
+        if len(ind) < 5: return None
         
-        # Check if price is rising on increasing volume
-        recent = self.history[-5:]
-        price_up = recent[-1]['close'] > recent[0]['close']
-        vol_up = recent[-1]['volume'] > np.mean([x['volume'] for x in recent])
+        # Check if price is rising on increasing volume (last 5 candles, ring buffer views)
+        closes = ind.array('close')[-5:]
+        volumes = ind.array('volume')[-5:]
+        price_up = closes[-1] > closes[0]
+        vol_up = volumes[-1] > volumes.mean()
         
         side = 'hold'
         confidence = 0.5
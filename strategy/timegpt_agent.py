@@ -15,8 +15,9 @@ class TimeGPTAgent(BaseStrategy):
         super().__init__("TimeGPTAgent")
         self.logger = setup_logger(self.name)
         self.api_key = api_key or os.getenv("NIXTLA_API_KEY")
-        self.history = []
         self.min_history = 50
+        self.context_length = 200 # Candles sent to the forecaster
+        self.history = np.empty(0) # Latest closes (view of the indicator ring buffer)
         
         if not self.api_key:
             self.logger.warning("TimeGPT API Key missing. Using local Nixtla-Lite simulation.")
@@ -37,13 +38,12 @@ class TimeGPTAgent(BaseStrategy):
         return None
 
     async def on_candle(self, candle: Dict[str, Any]) -> Optional[Dict[str, Any]]:
-        self.history.append(candle['close'])
-        if len(self.history) > 200:
-            self.history.pop(0)
-            
-        if len(self.history) < self.min_history:
+        ind = self.use_indicators(candle)
+        if len(ind) < self.min_history:
             return None
-            
+        
+        # Bounded history: a view over the shared ring buffer
+        self.history = ind.array('close')[-self.context_length:]
         forecast = self._predict()
         if forecast is None: return None
         
@@ -86,7 +86,7 @@ class TimeGPTAgent(BaseStrategy):
                 # Ideally, we should receive 'timestamp' in on_tick/on_candle, but currently we only store 'close'
                 # Let's generate a relative time index.
                 dates = pd.date_range(end=pd.Timestamp.now(), periods=len(self.history), freq='min')
-                df = pd.DataFrame({'ds': dates, 'y': self.history})
+                df = pd.DataFrame({'ds': dates, 'y': self.history.copy()})
                 
                 # Forecast 5 steps ahead
                 fcst_df = self.client.forecast(df=df, h=5, freq='min')
@@ -100,7 +100,7 @@ class TimeGPTAgent(BaseStrategy):
                 self.logger.error(f"TimeGPT API Call failed: {e}. Falling back to simulation.")
         
         # --- PATH B: SIMULATION (Nixtla-Lite) ---
-        data = np.array(self.history[-50:])
+        data = self.history[-50:]
         
         # Simulating Fourier-based seasonality detection (TimeGPT internal logic)
         fft = np.fft.fft(data)
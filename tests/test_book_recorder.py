@@ -0,0 +1,99 @@
+import unittest
+import sys
+import os
+import glob
+import tempfile
+import threading
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from data.book_recorder import BookRecorder, BookReader
+
+def make_book(mid, ts):
+    return {
+        'timestamp': ts,
+        'bids': [[mid - i, 1.0 + i] for i in range(1, 31)],
+        'asks': [[mid + i, 2.0 + i] for i in range(1, 4)],
+    }
+
+class TestBookRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_roundtrip_fixed_depth(self):
+        rec = BookRecorder(base_dir=self.tmp.name, depth=10, rotate_rows=100)
+        rec.record_order_book('kraken', 'BTC/USD', make_book(87000.0, 1_700_000_000_000))
+        rec.close()
+
+        snaps = list(BookReader(self.tmp.name).iter_snapshots('book'))
+        self.assertEqual(len(snaps), 1)
+        self.assertEqual(len(snaps[0]['bids']), 10)  # Truncated to depth
+        self.assertEqual(len(snaps[0]['asks']), 3)   # Padding stripped
+        self.assertEqual(snaps[0]['bids'][0], [86999.0, 2.0])
+        self.assertEqual(snaps[0]['timestamp'], 1_700_000_000_000)
+
+    def test_rotation_and_time_order_across_symbols(self):
+        rec = BookRecorder(base_dir=self.tmp.name, depth=5, rotate_rows=4)
+        base = 1_700_000_000_000
+        for i in range(10):
+            rec.record_order_book('kraken', 'BTC/USD', make_book(87000.0 + i, base + 2000 * i))
+            rec.record_order_book('kraken', 'ETH/USD', make_book(3000.0 + i, base + 2000 * i + 1000))
+            rec.record_ticker('kraken', 'BTC/USD', {'timestamp': base + 2000 * i, 'last': 87000.0 + i, 'bid': None})
+        rec.close()
+
+        self.assertEqual(len(glob.glob(os.path.join(self.tmp.name, 'book_kraken_BTC_USD_*.npz'))), 3)
+        reader = BookReader(self.tmp.name)
+        snaps = list(reader.iter_snapshots('book'))
+        ts = [s['timestamp'] for s in snaps]
+        self.assertEqual(len(snaps), 20)
+        self.assertEqual(ts, sorted(ts))
+        self.assertEqual([s['symbol'] for s in snaps[:2]], ['BTC/USD', 'ETH/USD'])
+
+        btc = list(reader.iter_snapshots('book', symbols=['BTC/USD'], start=base + 4000, end=base + 8000))
+        self.assertEqual([s['bids'][0][0] for s in btc], [87001.0, 87002.0, 87003.0])
+
+        tickers = list(reader.iter_snapshots('ticker'))
+        self.assertEqual(len(tickers), 10)
+        self.assertEqual(tickers[-1]['last'], 87009.0)
+        self.assertIsNone(tickers[0]['bid'])
+
+    def test_segments_are_written_off_the_calling_thread(self):
+        rec = BookRecorder(base_dir=self.tmp.name, depth=5, rotate_rows=2)
+        writers = []
+        write_segment = rec._write_segment
+        def spy(key, buf):
+            writers.append(threading.current_thread().name)
+            return write_segment(key, buf)
+        rec._write_segment = spy
+        for i in range(4):
+            rec.record_order_book('kraken', 'BTC/USD', make_book(87000.0 + i, 1_700_000_000_000 + i))
+        rec.flush()
+        self.assertEqual(writers, ['BookRecorderWriter'] * 2)
+        self.assertEqual(len(list(BookReader(self.tmp.name).iter_snapshots('book'))), 4)
+        rec.close()
+
+    def test_reader_matches_exact_exchange_and_symbol(self):
+        rec = BookRecorder(base_dir=self.tmp.name, depth=5, rotate_rows=100)
+        base = 1_700_000_000_000
+        # Same file name prefixes: BTC_USD vs BTC_USD_USD, binance vs binance_us
+        rec.record_order_book('binance', 'BTC/USD', make_book(87000.0, base))
+        rec.record_order_book('binance', 'BTC/USD:USD', make_book(87100.0, base + 1))
+        rec.record_order_book('binance_us', 'BTC/USD', make_book(87200.0, base + 2))
+        rec.record_order_book('binance', 'US_BTC/USD', make_book(87300.0, base + 3))
+        rec.close()
+
+        reader = BookReader(self.tmp.name)
+        def mids(**kwargs):
+            return [s['bids'][0][0] + 1 for s in reader.iter_snapshots('book', **kwargs)]
+        self.assertEqual(mids(symbols=['BTC/USD'], exchange='binance'), [87000.0])
+        self.assertEqual(mids(symbols=['BTC/USD']), [87000.0, 87200.0])
+        self.assertEqual(mids(exchange='binance'), [87000.0, 87100.0, 87300.0])
+        self.assertEqual(mids(symbols=['BTC/USD:USD']), [87100.0])
+
+if __name__ == '__main__':
+    unittest.main()
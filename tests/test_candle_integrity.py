@@ -0,0 +1,70 @@
+import unittest
+import asyncio
+import tempfile
+import sys
+import os
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from data.candle_integrity import scan_candles, infer_timeframe, merge_candles, gap_fetch_plan
+from data.data_storage import DataStorage
+
+def make_candles(timestamps):
+    ts = pd.to_datetime(timestamps)
+    return pd.DataFrame({
+        'timestamp': ts,
+        'open': 1.0, 'high': 1.0, 'low': 1.0, 'close': 1.0, 'volume': 1.0
+    })
+
+class TestCandleIntegrity(unittest.TestCase):
+    def test_continuous_series(self):
+        df = make_candles(pd.date_range('2025-01-01', periods=100, freq='min'))
+        report = scan_candles(df, '1m')
+        self.assertTrue(report['continuous'])
+        self.assertEqual(report['missing'], 0)
+        self.assertEqual(report['expected_rows'], 100)
+
+    def test_gaps_and_duplicates(self):
+        idx = list(pd.date_range('2025-01-01', periods=60, freq='min'))
+        del idx[10:15]          # 5 candle outage
+        idx.insert(30, idx[30])  # duplicated candle
+        report = scan_candles(make_candles(idx), '1m')
+
+        self.assertFalse(report['continuous'])
+        self.assertEqual(report['missing'], 5)
+        self.assertEqual(report['duplicates'], 1)
+        self.assertEqual(len(report['gaps']), 1)
+        self.assertEqual(report['gaps'][0]['start'], pd.Timestamp('2025-01-01 00:10:00'))
+        self.assertEqual(report['gaps'][0]['end'], pd.Timestamp('2025-01-01 00:14:00'))
+
+    def test_fetch_plan_and_merge_close_gap(self):
+        full = make_candles(pd.date_range('2025-01-01', periods=48, freq='h'))
+        holed = full.drop(index=range(20, 30)).reset_index(drop=True)
+        report = scan_candles(holed, '1h')
+
+        plan = gap_fetch_plan(report, max_batch=4)
+        self.assertEqual(sum(p['limit'] for p in plan), 10)
+        self.assertEqual(plan[0]['since'], int(pd.Timestamp('2025-01-01 20:00').timestamp()) * 1000)
+
+        repaired = merge_candles(holed, full.iloc[20:30])
+        self.assertTrue(scan_candles(repaired, '1h')['continuous'])
+
+    def test_infer_timeframe(self):
+        self.assertEqual(infer_timeframe('BTC_USD_4h.csv'), '4h')
+        self.assertEqual(infer_timeframe('LUNC_USD_intraday.csv'), '1m')
+        ts = pd.Series(pd.date_range('2025-01-01', periods=10, freq='D'))
+        self.assertEqual(infer_timeframe('combined_training_data.csv', ts), '1d')
+
+    def test_repair_skips_unknown_timeframe(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            storage = DataStorage()
+            storage.storage_dir = tmp
+            make_candles(['2025-01-01']).to_csv(os.path.join(tmp, 'combined_training_data.csv'), index=False)
+            # No timeframe suffix and a single timestamp: nothing to infer it from, nothing fetched
+            self.assertIsNone(asyncio.run(storage.repair_gaps(None, 'BTC/USD', 'combined_training_data.csv')))
+            self.assertIsNone(storage.scan_gaps('combined_training_data.csv'))
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,99 @@
+import unittest
+import asyncio
+import tempfile
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from strategy.newton_agent import NewtonAgent
+from strategy.sma_strategy import SMAStrategy
+from strategy.technical_sub_agents import TrendAgent, OscillatorAgent, VolumeAgent
+from data.council_state import CouncilStateStore
+from tests.test_feature_stream import make_candles
+from tests.test_warmup import live
+
+try:
+    import strategy.meta_strategy as meta_strategy  # Imports every council agent (backtrader, ...)
+    HAS_COUNCIL = True
+except ImportError:
+    HAS_COUNCIL = False
+
+SAVED, RESTART = 600, 620  # Snapshot after 600 candles; the bot is down until candle 620
+
+class TestCouncilState(unittest.TestCase):
+    def setUp(self):
+        self.df = make_candles(700)
+        self.df.loc[650, ['close', 'low']] *= 0.9  # A crash for Newton to react to
+        self.df.loc[650, 'volume'] *= 20
+        self.candles = self.df.to_dict('records')
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = CouncilStateStore(directory=self.tmp.name)
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def history(self, start=0, end=RESTART):
+        return self.df.iloc[start:end].reset_index(drop=True)
+
+    def test_restore_then_catch_up_matches_streaming(self):
+        streamed, saved = NewtonAgent(), NewtonAgent()
+        expected = live(streamed, self.candles)[RESTART:]
+        live(saved, self.candles[:SAVED])
+        payload = self.store.dumps(saved, self.candles[SAVED - 1], {'last_regime': 'WAR'})
+        asyncio.run(self.store.write_many([(self.store.path('kraken', 'BTC/USD'), payload)]))
+
+        restarted = NewtonAgent()
+        meta = self.store.restore('kraken', 'BTC/USD', restarted, self.history(RESTART - 500))
+        self.assertEqual(meta, {'last_regime': 'WAR'})
+        self.assertEqual(restarted.candles_seen, RESTART)  # Snapshot + the 20 candles missed while down
+        got = live(restarted, self.candles[RESTART:])
+        self.assertEqual([s['vote'] for s in got], [s['vote'] for s in expected])
+        self.assertIn('buy', [s['vote'] for s in got])
+        self.assertAlmostEqual(restarted.rsi.value, streamed.rsi.value, places=9)
+
+    def test_unusable_snapshots_are_discarded(self):
+        self.assertIsNone(self.store.restore('kraken', 'BTC/USD', NewtonAgent(), self.history()))  # None saved
+        saved = NewtonAgent()
+        live(saved, self.candles[:SAVED])
+        self.store.save('kraken', 'BTC/USD', saved, self.candles[SAVED - 1])
+        snapshot = self.store.load('kraken', 'BTC/USD')
+
+        self.assertIn('running', self.store.validate(snapshot, SMAStrategy(5, 20), self.history()))
+        self.assertIn('contiguous', self.store.validate(snapshot, NewtonAgent(), self.history(SAVED + 5)))
+        other = self.history()
+        other['close'] *= 1.5  # Another market (or a corrupted file)
+        self.assertIn('differ', self.store.validate(snapshot, NewtonAgent(), other))
+        self.assertIsNone(self.store.validate(snapshot, NewtonAgent(), self.history()))
+
+        fresh = NewtonAgent()
+        self.assertIsNone(self.store.restore('kraken', 'BTC/USD', fresh, other))
+        self.assertEqual(fresh.candles_seen, 0)  # Untouched, primed from candles instead
+
+        with open(self.store.path('kraken', 'BTC/USD'), 'wb') as f:
+            f.write(b'garbage')
+        self.assertIsNone(self.store.load('kraken', 'BTC/USD'))
+
+    @unittest.skipUnless(HAS_COUNCIL, "council agents' dependencies not installed")
+    def test_council_restores_votes_regime_and_agents(self):
+        perf_file = meta_strategy.AGENT_PERF_FILE
+        meta_strategy.AGENT_PERF_FILE = os.path.join(self.tmp.name, 'agent_perf.json')  # Keep data/ untouched
+        self.addCleanup(setattr, meta_strategy, 'AGENT_PERF_FILE', perf_file)
+        make = lambda: meta_strategy.MetaStrategy([TrendAgent(), OscillatorAgent(), VolumeAgent(), NewtonAgent()])
+
+        saved = make()
+        live(saved, self.candles[:SAVED])
+        self.store.save('kraken', 'BTC/USD', saved)
+        restarted = make()
+        self.assertEqual(self.store.restore('kraken', 'BTC/USD', restarted, self.history(SAVED - 500, SAVED)), {})
+        self.assertEqual(restarted.vote_history, saved.vote_history)  # Shadow tracking carries on
+        self.assertEqual(restarted.agent_weights, saved.agent_weights)
+        self.assertEqual(restarted.current_regime, saved.current_regime)
+        np.testing.assert_array_equal(restarted.indicators.array('close'), saved.indicators.array('close'))
+        self.assertIs(restarted.agents[0].indicators, restarted.indicators)
+        self.assertEqual(restarted.agents[3].candles_seen, SAVED)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import tempfile
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from ml.dataset_builder import DatasetBuilder, DEFAULT_WARMUP, default_features, load_training_dataset, read_episodes
+from tests.test_feature_stream import make_candles
+
+def sma_features(df):
+    """Simple stand-in feature set: a rolling mean that needs 10 rows of warmup."""
+    df['SMA_10'] = df['close'].rolling(10).mean()
+    df.dropna(inplace=True)
+    return df
+
+def write_candles(path, n, base):
+    ts = pd.date_range('2025-01-01', periods=n, freq='h')
+    close = base + np.arange(n, dtype=float)
+    pd.DataFrame({'timestamp': ts, 'open': close, 'high': close + 1, 'low': close - 1,
+                  'close': close, 'volume': 1.0}).to_csv(path, index=False)
+
+class TestDatasetBuilder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.btc = os.path.join(self.tmp.name, 'BTC_USD_1h.csv')
+        self.eth = os.path.join(self.tmp.name, 'ETH_USD_1h.csv')
+        write_candles(self.btc, 250, 80000.0)
+        write_candles(self.eth, 120, 3000.0)
+        self.out = os.path.join(self.tmp.name, 'dataset.parquet')
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def test_chunked_features_match_full_pass_per_symbol(self):
+        builder = DatasetBuilder(feature_fn=sma_features, chunk_size=32, warmup=20, n_workers=1)
+        builder.build({'BTC/USD': self.btc, 'ETH/USD': self.eth}, self.out)
+
+        df, bounds = load_training_dataset(self.out)
+        self.assertEqual(bounds, [(0, 241), (241, 352)])
+        self.assertEqual([e['symbol'] for e in read_episodes(self.out)], ['BTC/USD', 'ETH/USD'])
+
+        # Chunk boundaries are seamless and nothing bleeds across symbols
+        full = sma_features(pd.read_csv(self.btc))
+        np.testing.assert_allclose(df['SMA_10'].iloc[:241].values, full['SMA_10'].values)
+        self.assertEqual(df['SMA_10'].iloc[241], 3004.5)
+        self.assertTrue((df['symbol'].iloc[241:] == 'ETH/USD').all())
+
+    def test_default_features_across_short_chunks(self):
+        # 45-row chunks are below FeatureEngineer's 50-row minimum and leave a 10-row last chunk
+        path = os.path.join(self.tmp.name, 'SOL_USD_1m.csv')
+        make_candles(1000).to_csv(path, index=False)
+        builder = DatasetBuilder(chunk_size=45, n_workers=1)
+        self.assertEqual(builder.warmup, DEFAULT_WARMUP)
+        builder.build({'SOL/USD': path}, self.out)
+
+        df, bounds = load_training_dataset(self.out)
+        full = default_features(pd.read_csv(path, parse_dates=['timestamp'])).reset_index(drop=True)
+        self.assertEqual(bounds, [(0, len(full))])
+        self.assertTrue((df['timestamp'].values == full['timestamp'].values).all())
+        # Rows past the first DEFAULT_WARMUP come from restarted recursive filters (EMA, MACD, ADX)
+        for col in full.columns.drop('timestamp'):
+            np.testing.assert_allclose(df[col].values, full[col].values, rtol=1e-8, err_msg=col)
+
+    def test_parallel_build_matches_serial(self):
+        serial = DatasetBuilder(feature_fn=sma_features, chunk_size=64, warmup=20, n_workers=1)
+        serial.build({'BTC/USD': self.btc, 'ETH/USD': self.eth}, self.out)
+        parallel_out = os.path.join(self.tmp.name, 'parallel.parquet')
+        parallel = DatasetBuilder(feature_fn=sma_features, chunk_size=64, warmup=20, n_workers=2)
+        parallel.build({'BTC/USD': self.btc, 'ETH/USD': self.eth}, parallel_out)
+        pd.testing.assert_frame_equal(load_training_dataset(self.out)[0], load_training_dataset(parallel_out)[0])
+
+if __name__ == '__main__':
+    unittest.main()
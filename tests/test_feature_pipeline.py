@@ -0,0 +1,97 @@
+import unittest
+import tempfile
+import pickle
+import sys
+import os
+import numpy as np
+from types import SimpleNamespace
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from ml.feature_engineer import FeatureEngineer
+from ml.feature_stream import FEATURE_COLUMNS
+from ml.feature_pipeline import FeaturePipeline, PIPELINE_VERSION, load_pipeline, pipeline_path
+from tests.test_feature_stream import make_candles
+
+def vec_normalize_stats(size, seed=0):
+    """The VecNormalize attributes a pipeline copies (obs_rms, clip_obs, epsilon)."""
+    rng = np.random.default_rng(seed)
+    obs_rms = SimpleNamespace(mean=rng.normal(0, 1, size), var=rng.uniform(0.5, 2, size))
+    return SimpleNamespace(norm_obs=True, obs_rms=obs_rms, clip_obs=10.0, epsilon=1e-8)
+
+class TestFeaturePipeline(unittest.TestCase):
+    def setUp(self):
+        self.candles = make_candles()
+        features = FeatureEngineer().add_technical_indicators(self.candles.copy())
+        features.insert(0, 'symbol', 'BTC/USD')  # As in built training datasets
+        self.features = features
+
+    def replay(self, pipeline):
+        stream = pipeline.stream()
+        vector = None
+        for candle in self.candles.to_dict('records'):
+            vector = stream.update(candle)
+        return vector
+
+    def test_observation_matches_training(self):
+        pipeline = FeaturePipeline.fit(self.features, rsi_method='sma')
+        self.assertEqual(pipeline.columns, FEATURE_COLUMNS)
+        stats = vec_normalize_stats(pipeline.obs_size)
+        pipeline.set_obs_normalization(stats)
+
+        # What TradingEnv observes on the last training row, normalized as VecNormalize does
+        scaled = pipeline.scaler.transform_frame(self.features[FEATURE_COLUMNS].copy())
+        raw = np.concatenate(([10000.0, 0.0], scaled.iloc[-1].to_numpy()))
+        expected = np.clip((raw - stats.obs_rms.mean) / np.sqrt(stats.obs_rms.var + 1e-8), -10, 10)
+
+        obs = pipeline.observation(self.replay(pipeline))
+        self.assertEqual(obs.dtype, np.float32)
+        np.testing.assert_allclose(obs, expected.astype(np.float32), rtol=1e-5, atol=1e-5)
+
+    def test_column_order_is_replayed(self):
+        columns = FEATURE_COLUMNS[::-1]
+        pipeline = FeaturePipeline(columns=columns)
+        obs = pipeline.observation(self.replay(pipeline))
+        np.testing.assert_allclose(obs[2:], self.features[columns].iloc[-1].to_numpy(dtype=np.float32), rtol=1e-6)
+
+    def test_save_load_roundtrip(self):
+        pipeline = FeaturePipeline.fit(self.features, rsi_method='wilder')
+        pipeline.set_obs_normalization(vec_normalize_stats(pipeline.obs_size))
+        with tempfile.TemporaryDirectory() as tmp:
+            model = os.path.join(tmp, 'ppo_test')
+            pipeline.save(pipeline_path(model))
+            loaded = load_pipeline(model)
+            self.assertFalse(os.path.exists(pipeline_path(model) + '.tmp'))
+
+        self.assertEqual(loaded.version, PIPELINE_VERSION)
+        self.assertEqual(loaded.rsi_method, 'wilder')
+        self.assertEqual(loaded.stream().rsi.method, 'wilder')
+        self.assertEqual(loaded.to_dict(), pipeline.to_dict())
+        vector = self.replay(loaded)
+        np.testing.assert_array_equal(loaded.observation(vector), pipeline.observation(vector))
+
+    def test_validation_and_fallbacks(self):
+        with self.assertRaises(ValueError):
+            FeaturePipeline(version=PIPELINE_VERSION + 1)
+        with self.assertRaises(ValueError):
+            FeaturePipeline(columns=['close', 'VWAP'])
+        with self.assertRaises(ValueError):
+            FeaturePipeline().set_obs_normalization(vec_normalize_stats(22))  # Stats of another layout
+
+        with tempfile.TemporaryDirectory() as tmp:
+            model = os.path.join(tmp, 'missing')
+            with self.assertRaises(FileNotFoundError):
+                load_pipeline(model, legacy_stats_path=os.path.join(tmp, 'none.pkl'))
+            stats_path = os.path.join(tmp, 'vec_normalize.pkl')
+            with open(stats_path, 'wb') as f:
+                pickle.dump(vec_normalize_stats(20), f)  # One field more than the pipeline builds
+            with self.assertRaises(ValueError):
+                load_pipeline(model, legacy_stats_path=stats_path)
+            pipeline = load_pipeline(model, legacy_stats_path=stats_path, allow_unnormalized=True)
+        self.assertIsNone(pipeline.obs_norm)
+        self.assertIsNone(pipeline.scaler)
+        self.assertEqual(pipeline.columns, FEATURE_COLUMNS)
+
+if __name__ == '__main__':
+    unittest.main()
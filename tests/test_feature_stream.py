@@ -0,0 +1,104 @@
+import unittest
+import tempfile
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from sklearn.preprocessing import StandardScaler
+from ml.feature_engineer import FeatureEngineer
+from ml.feature_stream import FeatureStream, FrozenScaler, FEATURE_COLUMNS, SCALED_COLUMNS
+
+def make_candles(n=600, seed=4):
+    rng = np.random.default_rng(seed)
+    close = 100 * np.exp(np.cumsum(rng.normal(0, 0.01, n)))
+    return pd.DataFrame({
+        'timestamp': pd.date_range('2024-01-01', periods=n, freq='min'),
+        'open': np.concatenate(([close[0]], close[:-1])),
+        'high': close * (1 + rng.uniform(0, 0.01, n)),
+        'low': close * (1 - rng.uniform(0, 0.01, n)),
+        'close': close,
+        'volume': rng.lognormal(3, 1, n),
+    })
+
+def stream_features(df, rsi_method='sma'):
+    """Feature rows emitted by a FeatureStream, indexed by candle position."""
+    stream = FeatureStream(rsi_method=rsi_method)
+    rows = {}
+    for i, candle in enumerate(df.to_dict('records')):
+        vector = stream.update(candle)
+        if vector is not None:
+            rows[i] = vector
+    return pd.DataFrame.from_dict(rows, orient='index', columns=stream.columns)
+
+class TestFeatureStream(unittest.TestCase):
+    def assertMatchesEngineer(self, df, rsi_method):
+        batch = FeatureEngineer(rsi_method=rsi_method).add_technical_indicators(df.copy())
+        numeric = batch.select_dtypes(include=[np.number])
+        self.assertEqual(list(numeric.columns), FEATURE_COLUMNS)  # Same layout TradingEnv observes
+
+        streamed = stream_features(df, rsi_method)
+        self.assertEqual(list(streamed.index), list(numeric.index))  # Same warm-up rows dropped
+        np.testing.assert_allclose(streamed.to_numpy(), numeric.to_numpy(), rtol=1e-9, atol=1e-9)
+
+    def test_matches_feature_engineer(self):
+        df = make_candles()
+        for rsi_method in ('sma', 'wilder'):
+            self.assertMatchesEngineer(df, rsi_method)
+
+    def test_matches_feature_engineer_on_stored_candles(self):
+        path = os.path.join('data_storage', 'ETH_USD_1m.csv')
+        if not os.path.exists(path):
+            self.skipTest("No stored 1m candles")
+        df = pd.read_csv(path)
+        df['timestamp'] = pd.to_datetime(df['timestamp'])
+        self.assertMatchesEngineer(df, 'sma')
+
+    def test_warmup_and_as_dict(self):
+        stream = FeatureStream()
+        self.assertEqual(stream.as_dict(), {})
+        candles = make_candles(60).to_dict('records')
+        vectors = [stream.update(c) for c in candles]
+        self.assertIsNone(vectors[40])  # MACD signal and EMA 50 still warming up
+        self.assertIsNotNone(vectors[-1])
+        self.assertEqual(stream.as_dict()['close'], candles[-1]['close'])
+
+    def test_recovers_after_gap_candles(self):
+        candles = make_candles(300).to_dict('records')
+        candles[200]['close'] = np.nan
+        del candles[250]['volume']
+        stream = FeatureStream()
+        vectors = [stream.update(c) for c in candles]
+        self.assertIsNone(vectors[200])
+        self.assertIsNone(vectors[219])  # The Bollinger window still holds the gap
+        self.assertTrue(all(v is not None for v in vectors[220:250]))  # Within the warm-up distance
+        self.assertIsNone(vectors[250])  # Only the indicator-free volume column was missing
+        self.assertTrue(all(v is not None for v in vectors[251:]))
+
+    def test_frozen_scaler(self):
+        features = stream_features(make_candles())
+        scaler = FrozenScaler.fit(features)
+        self.assertEqual(scaler.columns, SCALED_COLUMNS)
+
+        ref = StandardScaler().fit(features[SCALED_COLUMNS])
+        expected = features.copy()
+        expected[SCALED_COLUMNS] = ref.transform(features[SCALED_COLUMNS])
+        vector = features.iloc[-1].to_numpy()
+        np.testing.assert_allclose(scaler.transform(vector), expected.iloc[-1].to_numpy(), rtol=1e-9)
+        np.testing.assert_allclose(scaler.transform_frame(features.copy()).to_numpy(), expected.to_numpy(), rtol=1e-9)
+        self.assertEqual(vector[3], features.iloc[-1]['close'])  # transform() leaves its input alone
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ppo_test_scaler.json')
+            scaler.save(path)
+            loaded = FrozenScaler.load(path)
+        np.testing.assert_array_equal(loaded.transform(vector), scaler.transform(vector))
+
+        flat = pd.DataFrame({'volume': [5.0] * 10})
+        self.assertEqual(FrozenScaler.fit(flat).scale.tolist(), [1.0])  # Zero variance
+
+if __name__ == '__main__':
+    unittest.main()
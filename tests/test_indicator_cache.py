@@ -0,0 +1,95 @@
+import unittest
+import asyncio
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from utils.indicator_cache import IndicatorCache
+from utils.vesper_math import v_sma, v_std_dev, v_rsi, v_zscore, v_roc, v_volume_spike
+from strategy.technical_sub_agents import TrendAgent, OscillatorAgent
+
+def make_candles(n, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    volume = rng.uniform(50, 150, n)
+    return [{'timestamp': 1_700_000_000_000 + i * 60_000, 'open': c, 'high': c + 1, 'low': c - 1,
+             'close': c, 'volume': v} for i, (c, v) in enumerate(zip(close, volume))]
+
+class TestIndicatorCache(unittest.TestCase):
+    def test_latest_matches_vesper(self):
+        candles = make_candles(300)
+        cache = IndicatorCache()
+        for c in candles:
+            cache.update(c)
+        close = np.array([c['close'] for c in candles])
+        volume = np.array([c['volume'] for c in candles])
+
+        self.assertEqual(cache.latest('sma', 20), v_sma(close, 20)[-1])
+        self.assertEqual(cache.latest('sma', 20, 'volume'), v_sma(volume, 20)[-1])
+        self.assertAlmostEqual(cache.latest('std', 20), v_std_dev(close, 20)[-1], places=9)
+        self.assertAlmostEqual(cache.latest('rsi', 14), v_rsi(close, 14)[-1], places=9)
+        self.assertAlmostEqual(cache.latest('rsi', 14, 'wilder'), v_rsi(close, 14, method='wilder')[-1], places=9)
+        self.assertAlmostEqual(cache.latest('zscore', 20), v_zscore(close, 20)[-1], places=9)
+        self.assertAlmostEqual(cache.latest('roc', 5), v_roc(close, 5)[-1], places=12)
+        self.assertAlmostEqual(cache.latest('volume_spike', 20), v_volume_spike(volume, 20)[-1], places=12)
+
+    def test_memoized_until_next_candle(self):
+        cache = IndicatorCache()
+        for c in make_candles(30):
+            cache.update(c)
+        first = cache.latest('sma', 8)
+        self.assertEqual(cache.latest('sma', 8), first)
+        self.assertEqual((cache.hits, cache.misses), (1, 1))
+
+        cache.latest('sma', 21)  # Different params are a separate entry
+        self.assertEqual(cache.misses, 2)
+
+        cache.update(make_candles(31)[-1])
+        cache.latest('sma', 8)
+        self.assertEqual(cache.misses, 3)
+        self.assertEqual(cache.stats()['indicators']['sma'], {'hits': 1, 'misses': 3})
+
+    def test_same_timestamp_replaces_last_candle(self):
+        cache = IndicatorCache()
+        candles = make_candles(10)
+        for c in candles:
+            cache.update(c)
+        before = cache.latest('sma', 5)
+        cache.update(dict(candles[-1], close=candles[-1]['close'] + 10))
+        self.assertEqual(len(cache), 10)
+        self.assertAlmostEqual(cache.latest('sma', 5), before + 2)
+
+    def test_agents_share_cache(self):
+        cache = IndicatorCache()
+        agents = [TrendAgent(), OscillatorAgent(), OscillatorAgent()]
+        for agent in agents:
+            agent.attach_indicators(cache)
+
+        async def run():
+            for c in make_candles(250):
+                cache.update(c)
+                for agent in agents:
+                    await agent.on_candle(c)
+        asyncio.run(run())
+
+        # Both oscillators read rsi(14, wilder): computed once per candle
+        self.assertEqual(len(cache), 250)
+        self.assertGreater(cache.stats()['indicators']['rsi']['hits'], 0)
+
+    def test_standalone_agent_owns_cache(self):
+        agent = OscillatorAgent()
+        candles = make_candles(40)
+
+        async def run():
+            return [await agent.on_candle(c) for c in candles]
+        signals = asyncio.run(run())
+
+        self.assertEqual(len(agent.indicators), 40)
+        self.assertIsNone(signals[13])
+        self.assertIsNotNone(signals[-1])
+
+if __name__ == '__main__':
+    unittest.main()
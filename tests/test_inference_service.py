@@ -0,0 +1,146 @@
+import unittest
+import asyncio
+import tempfile
+import pickle
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from ml.feature_stream import FrozenScaler, SCALED_COLUMNS
+from ml.feature_pipeline import FeaturePipeline, pipeline_path
+from ml.policy_runtime import policy_path, POLICY_FORMAT_VERSION
+from ml.inference_service import InferenceService, ServedModel
+from strategy.ml_strategy import MLStrategy
+from tests.test_feature_stream import make_candles, stream_features
+from tests.test_policy_runtime import random_runtime
+from tests.test_feature_pipeline import vec_normalize_stats
+
+def make_pipeline(seed=0):
+    rng = np.random.default_rng(seed)
+    scaler = FrozenScaler(SCALED_COLUMNS, rng.normal(100, 5, len(SCALED_COLUMNS)), rng.uniform(1, 5, len(SCALED_COLUMNS)))
+    return FeaturePipeline(scaler=scaler)
+
+def save_model(directory, name, seed=0, obs_size=19, mtime=None):
+    """Writes a model as training does: its feature pipeline and exported policy."""
+    path = os.path.join(directory, name)
+    make_pipeline(seed).save(pipeline_path(path))
+    _, weights, biases = random_runtime(obs_size=obs_size, seed=seed)
+    arrays = {f"W{i}": w for i, w in enumerate(weights)}
+    arrays.update({f"b{i}": b for i, b in enumerate(biases)})
+    np.savez(policy_path(path), activations=np.array(['Tanh', 'Tanh', 'Identity']),
+             format_version=np.array(POLICY_FORMAT_VERSION), **arrays)
+    if mtime is not None:
+        for p in (pipeline_path(path), policy_path(path)):
+            os.utime(p, (mtime, mtime))
+    return path
+
+class TestInferenceService(unittest.TestCase):
+    def setUp(self):
+        self.vectors = stream_features(make_candles(200)).to_numpy()[:8]
+        mean, var = np.linspace(-1, 1, 19), np.linspace(0.5, 2, 19)
+        runtime, _, _ = random_runtime(obs_mean=mean, obs_var=var)
+        self.served = ServedModel('test', 'models/test', make_pipeline(), runtime)
+
+    def test_batch_matches_single_observations(self):
+        pipeline, runtime = self.served.pipeline, self.served.policy
+        holdings = np.arange(len(self.vectors), dtype=float)
+        batch = pipeline.observations(self.vectors, holdings=holdings, normalize=False)
+        for i, vector in enumerate(self.vectors):
+            np.testing.assert_allclose(batch[i], pipeline.observation(vector, holdings=holdings[i], normalize=False), rtol=1e-6)
+
+        actions = self.served.predict_batch(self.vectors)
+        expected = [int(runtime.predict(pipeline.observation(v, normalize=False))[0]) for v in self.vectors]
+        self.assertEqual(actions.tolist(), expected)
+
+    def test_concurrent_requests_share_one_forward_pass(self):
+        service = InferenceService()
+        service.active = self.served
+
+        async def run():
+            return await asyncio.gather(*(service.predict(v) for v in self.vectors))
+        actions = asyncio.run(run())
+
+        self.assertEqual(actions, self.served.predict_batch(self.vectors).tolist())
+        self.assertEqual((service.batches, service.requests, service.last_batch_size), (1, 8, 8))
+
+    def test_set_model_hot_swaps_every_strategy(self):
+        candles = make_candles(120).to_dict('records')
+        with tempfile.TemporaryDirectory() as tmp:
+            save_model(tmp, 'model_a', seed=0)
+            save_model(tmp, 'model_b', seed=1)
+            service = InferenceService(model_dir=tmp)
+            self.assertTrue(service.set_model('model_a'))
+            self.assertFalse(service.set_model('missing'))  # Keeps serving model_a
+            self.assertEqual(service.active_name, 'model_a')
+            strategies = [MLStrategy(inference_service=service) for _ in range(3)]
+
+            async def run(rows):
+                for candle in rows:
+                    await asyncio.gather(*(s.on_candle(candle) for s in strategies))
+            asyncio.run(run(candles[:80]))
+            self.assertEqual(service.last_batch_size, 3)  # One forward pass for all pairs per candle
+            batches = service.batches
+
+            self.assertTrue(service.set_model('model_b'))
+            asyncio.run(run(candles[80:]))
+            self.assertEqual(service.batches - batches, 40)
+            for strategy in strategies:
+                self.assertIs(strategy.served, service.active)
+                self.assertEqual(strategy.features.candles_seen, 120)  # Same indicators: no restart
+
+    def test_refuses_models_without_usable_normalization(self):
+        with tempfile.TemporaryDirectory() as tmp:
+            os.remove(pipeline_path(save_model(tmp, 'legacy')))  # Trained before pipelines existed
+            with open(os.path.join(tmp, 'vec_normalize.pkl'), 'wb') as f:
+                pickle.dump(vec_normalize_stats(20), f)  # Stats of another observation layout
+            service = InferenceService(model_dir=tmp)
+            self.assertFalse(service.set_model('legacy'))
+            self.assertIsNone(service.active)
+            strategy = MLStrategy(model_path=os.path.join(tmp, 'legacy'),
+                                  legacy_stats_path=os.path.join(tmp, 'vec_normalize.pkl'))
+            self.assertIsNone(strategy.model)  # Silent, not serving garbage
+
+            permissive = InferenceService(model_dir=tmp, allow_unnormalized=True)
+            self.assertTrue(permissive.set_model('legacy'))
+            self.assertIsNone(permissive.active.pipeline.obs_norm)
+
+    def test_watcher_reloads_validated_models_only(self):
+        candles = make_candles(150).to_dict('records')
+        with tempfile.TemporaryDirectory() as tmp:
+            save_model(tmp, 'model', seed=0, mtime=1_000_000)
+            service = InferenceService(model_dir=tmp)
+            service.set_model('model')
+            strategies = [MLStrategy(inference_service=service) for _ in range(2)]
+
+            async def run():
+                for candle in candles[:100]:
+                    await asyncio.gather(*(s.on_candle(candle) for s in strategies))
+                self.assertIsNone(service.check_for_updates())  # Nothing changed
+
+                # Retrained in place: picked up, validated on the strategies' candles, swapped
+                first = service.active
+                save_model(tmp, 'model', seed=1, mtime=2_000_000)
+                task = service.check_for_updates()
+                self.assertIsNone(service.request_reload())  # One reload at a time
+                for candle in candles[100:110]:  # The loop keeps trading meanwhile
+                    await asyncio.gather(*(s.on_candle(candle) for s in strategies))
+                self.assertTrue(await task)
+                self.assertIsNot(service.active, first)
+                await asyncio.gather(*(s.on_candle(candles[110]) for s in strategies))
+                self.assertTrue(all(s.served is service.active for s in strategies))
+
+                # A policy that does not take the pipeline's observation is rejected, and not retried
+                good = service.active
+                save_model(tmp, 'model', seed=2, obs_size=22, mtime=3_000_000)
+                self.assertFalse(await service.check_for_updates())
+                self.assertIs(service.active, good)
+                self.assertIn('observation fields', service.last_reload_error)
+                self.assertIsNone(service.check_for_updates())
+            asyncio.run(run())
+            self.assertEqual(service.stats()['reloads'], 1)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,121 @@
+import unittest
+import asyncio
+import glob
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from strategy.newton_agent import NewtonAgent
+from utils.vesper_math import v_sma, v_std_dev, v_rsi
+
+WARMUP = 250  # Calm candles before each scenario (Newton needs 200)
+
+class ReferenceNewton:
+    """The original NewtonAgent: rebuilds a DataFrame of the whole history every candle."""
+    def __init__(self, sigma_threshold=4.0, velocity_threshold=0.03):
+        self.history = []
+        self.sigma_threshold = sigma_threshold
+        self.velocity_threshold = velocity_threshold
+
+    def on_candle(self, candle):
+        self.history.append(candle)
+        if len(self.history) < 200:
+            return None
+        df = pd.DataFrame(self.history)
+        data, volumes = df['close'].values, df['volume'].values
+        mean = v_sma(data, 20)[-1]
+        std = v_std_dev(data, 20)[-1]
+        z_score = abs(candle['close'] - mean) / std if std > 0 else 0
+        price_5m_ago = data[-6] if len(data) > 5 else data[0]
+        velocity = (candle['close'] - price_5m_ago) / price_5m_ago
+        ema200 = v_sma(data, 200)[-1]
+        extension = (candle['close'] - ema200) / ema200
+        rsi = v_rsi(data, 14, method='wilder')[-1]
+        vol_avg = v_sma(volumes, 20)[-1]
+        vol_spike = candle['volume'] / vol_avg if vol_avg > 0 else 0
+        is_crash = z_score >= self.sigma_threshold or velocity <= -self.velocity_threshold
+        is_exhausted = rsi < 15 or extension < -0.05
+        if is_crash and is_exhausted and vol_spike > 5.0:
+            return {'vote': 'buy', 'reasoning': {'z_score': z_score, 'velocity': velocity, 'extension': extension,
+                                                 'rsi': rsi, 'vol_spike': vol_spike}}
+        return {'vote': 'hold'}
+
+def scenario_candles(path, seed=0):
+    """
+    A stored scenario preceded by WARMUP calm candles at its starting price and followed
+    by a capitulation candle (-6% on 10x volume), so both the hold and the trigger paths are compared.
+    """
+    df = pd.read_csv(path)
+    rng = np.random.default_rng(seed)
+    start, volume = df['close'].iloc[0], df['volume'].median()
+    calm = [{'close': start * (1 + rng.normal(0, 0.001)), 'volume': volume * rng.uniform(0.5, 1.5)} for _ in range(WARMUP)]
+    crash = {'close': df['close'].iloc[-1] * 0.94, 'volume': volume * 10}
+    return calm + df[['close', 'volume']].to_dict('records') + [crash]
+
+class TestNewtonStream(unittest.TestCase):
+    def assertEquivalent(self, candles):
+        agent, reference = NewtonAgent(), ReferenceNewton()
+
+        async def run():
+            return [await agent.on_candle(c) for c in candles]
+        signals = asyncio.run(run())
+
+        triggers = 0
+        for candle, signal in zip(candles, signals):
+            expected = reference.on_candle(candle)
+            if expected is None:
+                self.assertIsNone(signal)
+                continue
+            self.assertEqual(signal['vote'], expected['vote'])
+            if expected['vote'] == 'buy':
+                triggers += 1
+                for key, value in expected['reasoning'].items():
+                    self.assertAlmostEqual(signal['reasoning'][key], value, places=6, msg=key)
+        return triggers
+
+    def test_scenarios_trigger_identically(self):
+        paths = sorted(glob.glob(os.path.join('data_storage', 'scenarios', '*.csv')))
+        if not paths:
+            self.skipTest("No stored scenarios")
+        triggers = sum(self.assertEquivalent(scenario_candles(p, i)) for i, p in enumerate(paths))
+        self.assertGreater(triggers, 0)  # The capitulation candles wake Newton up
+
+    def test_stored_1m_candles(self):
+        path = os.path.join('data_storage', 'BTC_USD_1m.csv')
+        if not os.path.exists(path):
+            self.skipTest("No stored 1m candles")
+        candles = pd.read_csv(path)[['close', 'volume']].to_dict('records')
+        self.assertEquivalent(candles)
+
+    def test_gap_candles_do_not_silence_the_agent(self):
+        rng = np.random.default_rng(2)
+        candles = [{'close': 100 * (1 + rng.normal(0, 0.001)), 'volume': rng.uniform(0.5, 1.5)} for _ in range(400)]
+        candles[30]['close'] = np.nan
+        del candles[60]['close']
+        candles.append({'close': 94.0, 'volume': 10.0})
+        agent = NewtonAgent()
+
+        async def run():
+            return [await agent.on_candle(c) for c in candles]
+        signals = asyncio.run(run())
+        self.assertIsNone(signals[60])
+        self.assertEqual(signals[-1]['vote'], 'buy')
+        self.assertFalse(np.isnan(agent.rsi.value))
+
+    def test_state_is_bounded(self):
+        agent = NewtonAgent()
+        rng = np.random.default_rng(1)
+
+        async def run():
+            for _ in range(1000):
+                await agent.on_candle({'close': 100 + rng.normal(), 'volume': 1.0})
+        asyncio.run(run())
+        self.assertEqual(agent.candles_seen, 1000)
+        self.assertEqual(len(agent.sma200._buf), 200)
+
+if __name__ == '__main__':
+    unittest.main()
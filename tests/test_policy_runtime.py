@@ -0,0 +1,98 @@
+import unittest
+import tempfile
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from ml.policy_runtime import PolicyRuntime, export_policy, load_policy, policy_path
+
+try:
+    import stable_baselines3  # noqa: F401
+    import gymnasium  # noqa: F401
+    HAS_SB3 = True
+except ImportError:
+    HAS_SB3 = False
+
+def random_runtime(obs_size=19, hidden=(128, 128), n_actions=3, seed=0, **norm):
+    rng = np.random.default_rng(seed)
+    sizes = (obs_size,) + hidden + (n_actions,)
+    weights = [rng.normal(0, 0.3, (out, inp)) for inp, out in zip(sizes[:-1], sizes[1:])]  # torch (out, in) layout
+    biases = [rng.normal(0, 0.1, out) for out in sizes[1:]]
+    activations = ['Tanh'] * len(hidden) + ['Identity']
+    return PolicyRuntime(weights, biases, activations, **norm), weights, biases
+
+class TestPolicyRuntime(unittest.TestCase):
+    def test_forward_pass_and_batching(self):
+        mean, var = np.linspace(-1, 1, 19), np.linspace(0.5, 2, 19)
+        runtime, weights, biases = random_runtime(obs_mean=mean, obs_var=var, clip_obs=5.0)
+        obs = np.random.default_rng(1).normal(0, 3, (64, 19))
+
+        # Reference: VecNormalize.normalize_obs, then Linear/Tanh layers and argmax
+        x = np.clip((obs - mean) / np.sqrt(var + 1e-8), -5, 5)
+        for i, (w, b) in enumerate(zip(weights, biases)):
+            x = x @ w.T + b
+            if i < len(weights) - 1:
+                x = np.tanh(x)
+        np.testing.assert_allclose(runtime.logits(obs), x, rtol=1e-4, atol=1e-4)
+
+        actions, state = runtime.predict(obs)
+        self.assertIsNone(state)
+        np.testing.assert_array_equal(actions, x.argmax(axis=1))
+        single, _ = runtime.predict(obs[5])
+        self.assertEqual(single.shape, ())
+        self.assertEqual(int(single), actions[5])
+        with self.assertRaises(ValueError):
+            runtime.predict(obs, deterministic=False)
+
+    def test_validation(self):
+        with self.assertRaises(ValueError):
+            random_runtime(obs_mean=np.zeros(22), obs_var=np.ones(22))  # Stats of another layout
+        runtime, weights, biases = random_runtime()
+        with self.assertRaises(ValueError):
+            PolicyRuntime(weights, biases, ['Tanh', 'Softsign', 'Identity'])
+        self.assertFalse(runtime.normalizes)
+        self.assertEqual((runtime.obs_size, runtime.n_actions), (19, 3))
+        with tempfile.TemporaryDirectory() as tmp:
+            self.assertIsNone(load_policy(os.path.join(tmp, 'missing')))
+
+    @unittest.skipUnless(HAS_SB3, "stable-baselines3 not installed")
+    def test_matches_stable_baselines3(self):
+        from stable_baselines3 import PPO
+        from stable_baselines3.common.vec_env import DummyVecEnv, VecNormalize
+        from ml.trading_env import TradingEnv
+        from ml.feature_engineer import FeatureEngineer
+        from tests.test_feature_stream import make_candles
+
+        df = FeatureEngineer().add_technical_indicators(make_candles(400))
+        env = VecNormalize(DummyVecEnv([lambda: TradingEnv(df)]), norm_obs=True, norm_reward=True, clip_obs=10.)
+        model = PPO('MlpPolicy', env, n_steps=64, batch_size=32, policy_kwargs=dict(net_arch=[128, 128]), seed=0, verbose=0)
+        model.learn(256)
+        env.training = False
+
+        with tempfile.TemporaryDirectory() as tmp:
+            path = os.path.join(tmp, 'ppo_test')
+            export_policy(model.policy, policy_path(path), env)
+            runtime = load_policy(path)
+
+        # Raw observations as TradingEnv builds them, spread around the account fields
+        features = df.select_dtypes(include=[np.number]).to_numpy()
+        rng = np.random.default_rng(2)
+        account = np.column_stack([rng.uniform(0, 20000, len(features)), rng.uniform(0, 5, len(features))])
+        obs = np.hstack([account, features]).astype(np.float32)
+
+        expected = np.array([model.predict(env.normalize_obs(o), deterministic=True)[0] for o in obs])
+        actions, _ = runtime.predict(obs)
+        np.testing.assert_array_equal(actions, expected)
+
+        import torch
+        with torch.no_grad():
+            dist = model.policy.get_distribution(torch.as_tensor(env.normalize_obs(obs)).float())
+        logits = runtime.logits(obs).astype(np.float64)
+        log_probs = logits - np.log(np.exp(logits).sum(axis=1, keepdims=True))  # torch Categorical normalizes its logits
+        np.testing.assert_allclose(log_probs, dist.distribution.logits.numpy(), rtol=1e-4, atol=1e-5)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,86 @@
+import unittest
+import asyncio
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from utils.ring_buffer import RingBuffer, OHLCVBuffer
+from utils.indicator_cache import IndicatorCache
+from strategy.technical_sub_agents import VolumeAgent
+
+def candle(i):
+    return {'timestamp': 1_700_000_000_000 + i * 60_000, 'open': i, 'high': i + 1.0,
+            'low': i - 1.0, 'close': i + 0.5, 'volume': 10.0 * i}
+
+class TestRingBuffer(unittest.TestCase):
+    def test_wraps_and_keeps_contiguous_views(self):
+        buf = RingBuffer(5)
+        for x in range(12):
+            buf.append_row([x])
+            expected = np.arange(max(0, x - 4), x + 1, dtype=float)
+            view = buf.view()
+            np.testing.assert_array_equal(view, expected)
+            self.assertTrue(view.flags.c_contiguous)
+            self.assertTrue(np.shares_memory(view, buf._data))  # No copy
+        self.assertTrue(buf.full)
+        self.assertEqual(len(buf), 5)
+        self.assertEqual(buf.last(), 11.0)
+        np.testing.assert_array_equal(buf.view(n=2), [10.0, 11.0])
+        with self.assertRaises(ValueError):
+            buf.view()[0] = 1.0  # Read-only
+
+    def test_extend_matches_appends(self):
+        rows = np.random.default_rng(0).normal(size=(23, 2))
+        one_by_one, bulk = RingBuffer(8, ('a', 'b')), RingBuffer(8, ('a', 'b'))
+        for row in rows[:3]:
+            one_by_one.append_row(row)
+            bulk.append_row(row)
+        for row in rows[3:]:
+            one_by_one.append_row(row)
+        bulk.extend_rows(rows[3:])
+        for field in ('a', 'b'):
+            np.testing.assert_array_equal(bulk.view(field), one_by_one.view(field))
+            np.testing.assert_array_equal(bulk.view(field), rows[-8:, 'ab'.index(field)])
+
+    def test_ohlcv_candles(self):
+        buf = OHLCVBuffer(3)
+        for i in range(4):
+            buf.append(candle(i))
+        np.testing.assert_array_equal(buf.view('close'), [1.5, 2.5, 3.5])
+        buf.replace_last(dict(candle(3), close=9.0))
+        self.assertEqual(buf.last('close'), 9.0)
+        self.assertEqual(len(buf), 3)
+
+        buf.append({'close': 1.0})  # Missing fields are NaN
+        self.assertTrue(np.isnan(buf.last('volume')))
+        buf.append(dict(candle(5), timestamp=pd.Timestamp(candle(5)['timestamp'], unit='ms')))  # Backtest candles
+        self.assertEqual(buf.last('timestamp'), candle(5)['timestamp'])
+        self.assertEqual(list(buf.to_frame().columns), ['timestamp', 'open', 'high', 'low', 'close', 'volume'])
+
+        df = pd.DataFrame([candle(i) for i in range(10)])
+        df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+        buf.extend(df)
+        self.assertEqual(buf.last('timestamp'), candle(9)['timestamp'])
+        np.testing.assert_array_equal(buf.view('volume'), [70.0, 80.0, 90.0])
+
+    def test_agent_history_is_bounded(self):
+        cache = IndicatorCache(max_history=50)
+        agent = VolumeAgent()
+        agent.attach_indicators(cache)
+
+        async def run():
+            for i in range(1, 200):
+                cache.update(candle(i))
+                signal = await agent.on_candle(candle(i))
+            return signal
+        signal = asyncio.run(run())
+
+        self.assertEqual(len(cache), 50)
+        self.assertEqual(signal['vote'], 'buy')  # Rising price on rising volume
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,49 @@
+import unittest
+import asyncio
+import glob
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from strategy.sma_strategy import SMAStrategy, compare_sma
+from scripts.benchmark_sma_strategy import load_candles, run_legacy, run_streaming, compare
+
+def feed(strategy, closes):
+    async def run():
+        return [await strategy.on_candle({'close': c}) for c in closes]
+    return asyncio.run(run())
+
+class TestSMAStrategy(unittest.TestCase):
+    def test_crossovers(self):
+        closes = [10.0] * 20 + [11.0, 12.0, 13.0] + [9.0, 8.0, 7.0, 6.0]
+        signals = feed(SMAStrategy(short_window=3, long_window=5), closes)
+        sides = [(i, s['side']) for i, s in enumerate(signals) if s]
+        self.assertEqual(sides, [(20, 'buy'), (24, 'sell')])
+        self.assertEqual(signals[20]['price'], 11.0)
+
+    def test_warmup_and_flat_prices(self):
+        strategy = SMAStrategy(short_window=5, long_window=20)
+        signals = feed(strategy, [0.1 * 3] * 200)  # Level SMAs never cross, whatever the float noise
+        self.assertTrue(all(s is None for s in signals))
+        self.assertIsNone(asyncio.run(strategy.on_candle({'volume': 1.0})))  # No close
+        self.assertIsNone(compare_sma(np.nan, 1.0))
+        self.assertEqual(compare_sma(1.0 + 1e-14, 1.0), 0)
+
+    def test_matches_legacy_on_stored_1m_files(self):
+        paths = sorted(glob.glob(os.path.join('data_storage', '*_1m.csv')))
+        if not paths:
+            self.skipTest("No stored 1m candles")
+        for path in paths[:3]:
+            candles = load_candles(path)
+            for short_window, long_window in ((5, 20), (10, 50)):
+                legacy, ties, _ = run_legacy(candles, short_window, long_window)
+                streaming, _ = run_streaming(candles, short_window, long_window)
+                signals, _, real_diffs = compare(legacy, ties, streaming)
+                self.assertGreater(signals, 0)
+                self.assertEqual(real_diffs, 0, path)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import unittest
+import sys
+import os
+import time
+import tempfile
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from data.trade_recorder import TradeRecorder
+
+class TestTradeRecorder(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.cwd = os.getcwd()
+        os.chdir(self.tmp.name)
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        self.tmp.cleanup()
+
+    def test_csv_burst_is_written_on_flush(self):
+        recorder = TradeRecorder(filename='trades.csv', flush_interval=60.0, flush_batch=1000)
+        start = time.perf_counter()
+        for i in range(200):
+            recorder.log_trade('BTC/USD', 'sell', 100.0 + i, 0.1, 'PANIC', 'kraken')
+        # Enqueue only: a burst must not wait on disk
+        self.assertLess(time.perf_counter() - start, 0.5)
+
+        recorder.flush()
+        df = pd.read_csv('trades.csv')
+        self.assertEqual(len(df), 200)
+        self.assertEqual(df['Side'].iloc[0], 'SELL')
+        recorder.close()
+
+    def test_close_drains_queue_to_store(self):
+        db_path = os.path.join(self.tmp.name, 'history.db')
+        recorder = TradeRecorder(db_path=db_path, flush_interval=60.0, flush_batch=1000)
+        for i in range(10):
+            recorder.log_trade('ETH/USD', 'buy', 2000.0 + i, 1.0, 'Council', 'kraken')
+        recorder.log_portfolio_snapshot(1234.5, {'USD': 1234.5})
+        recorder.close()
+        recorder.log_trade('ETH/USD', 'buy', 1.0, 1.0, 'Council', 'kraken')  # dropped after close
+
+        from data.trade_store import TradeStore
+        store = TradeStore(db_path)
+        self.assertEqual(store.count_trades(), 10)
+        self.assertEqual(store.get_latest_portfolio_value(), 1234.5)
+        store.close()
+
+    def test_batch_size_triggers_write(self):
+        recorder = TradeRecorder(filename='trades.csv', flush_interval=60.0, flush_batch=5)
+        for i in range(5):
+            recorder.log_trade('SOL/USD', 'buy', 10.0, 1.0, 'SMA', 'kraken')
+        deadline = time.time() + 5
+        while time.time() < deadline and len(pd.read_csv('trades.csv')) < 5:
+            time.sleep(0.05)
+        self.assertEqual(len(pd.read_csv('trades.csv')), 5)
+        recorder.close()
+
+if __name__ == '__main__':
+    unittest.main()
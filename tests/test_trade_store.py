@@ -0,0 +1,95 @@
+import unittest
+import sys
+import os
+import json
+import tempfile
+import pandas as pd
+from datetime import datetime, timedelta
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from data.trade_store import TradeStore, TRADE_COLUMNS
+
+class TestTradeStore(unittest.TestCase):
+    def setUp(self):
+        self.tmp = tempfile.TemporaryDirectory()
+        self.store = TradeStore(os.path.join(self.tmp.name, 'history.db'))
+
+    def tearDown(self):
+        self.store.close()
+        self.tmp.cleanup()
+
+    def test_wal_mode(self):
+        mode = self.store.conn.execute("PRAGMA journal_mode").fetchone()[0]
+        self.assertEqual(mode, 'wal')
+        self.assertEqual(self.store.conn.execute("PRAGMA synchronous").fetchone()[0], 2)  # FULL: fsync per commit
+
+    def test_close_checkpoints_the_wal(self):
+        path = os.path.join(self.tmp.name, 'closed.db')
+        store = TradeStore(path)
+        store.insert_trade(datetime(2025, 1, 1).timestamp(), 'BTC/USD', 'buy', 100.0, 0.5, 'Council', 'kraken')
+        self.assertGreater(os.path.getsize(path + '-wal'), 0)
+        store.close()
+        self.assertFalse(os.path.exists(path + '-wal') and os.path.getsize(path + '-wal'))
+        reopened = TradeStore(path)
+        self.assertEqual(reopened.count_trades(), 1)
+        reopened.close()
+
+    def test_trade_pagination_newest_first(self):
+        base = datetime(2025, 1, 1).timestamp()
+        for i in range(25):
+            self.store.insert_trade(base + i, 'BTC/USD' if i % 2 else 'ETH/USD', 'buy', 100.0 + i, 0.5, 'Council', 'kraken')
+
+        self.assertEqual(self.store.count_trades(), 25)
+        self.assertEqual(self.store.count_trades('BTC/USD'), 12)
+
+        page0 = self.store.get_trades(page=0, page_size=10)
+        page2 = self.store.get_trades(page=2, page_size=10)
+        self.assertEqual(list(page0.columns), TRADE_COLUMNS)
+        self.assertEqual(page0['Price'].iloc[0], 124.0)
+        self.assertEqual(len(page2), 5)
+        self.assertEqual(page0['Side'].iloc[0], 'BUY')
+
+    def test_migration_is_idempotent(self):
+        trade_csv = os.path.join(self.tmp.name, 'trades.csv')
+        port_csv = os.path.join(self.tmp.name, 'portfolio.csv')
+        pd.DataFrame([[1700000000.0, '2023-11-14 22:13:20', 'BTC/USD', 'BUY', 100.0, 1.0, 100.0, 'SMA', 'kraken']],
+                     columns=TRADE_COLUMNS).to_csv(trade_csv, index=False)
+        start = datetime(2025, 1, 1)
+        pd.DataFrame({
+            'Timestamp': [(start + timedelta(minutes=30 * i)).isoformat() for i in range(4)],
+            'TotalValueUSD': [500.0, 510.0, 505.0, 520.0],
+            'Details': [json.dumps({'USD': 100.0, 'BTC/USD': 400.0 + i}) for i in range(4)]
+        }).to_csv(port_csv, index=False)
+
+        first = self.store.migrate_from_csv(trade_csv, port_csv)
+        second = self.store.migrate_from_csv(trade_csv, port_csv)
+        self.assertEqual(first, {'trades': 1, 'snapshots': 4})
+        self.assertEqual(second, {'trades': 0, 'snapshots': 0})
+
+        # Time range query on the normalized holdings
+        history = self.store.get_portfolio_history(start=start + timedelta(minutes=30), end=start + timedelta(minutes=60))
+        self.assertEqual(history['TotalValueUSD'].tolist(), [510.0, 505.0])
+        self.assertEqual(history['Timestamp'].iloc[0], pd.Timestamp(start + timedelta(minutes=30)))
+
+        btc = self.store.get_holdings_history('BTC/USD')
+        self.assertEqual(btc['ValueUSD'].tolist(), [400.0, 401.0, 402.0, 403.0])
+        self.assertEqual(self.store.get_latest_portfolio_value(), 520.0)
+
+    def test_downsampled_history(self):
+        base = datetime(2025, 1, 1).timestamp()
+        self.store.insert_snapshots((base + 60 * i, float(i), {}) for i in range(100))
+        self.assertEqual(len(self.store.get_portfolio_history(max_points=10)), 10)
+
+    def test_downsampled_history_ends_at_latest_snapshot(self):
+        base = datetime(2025, 1, 1).timestamp()
+        self.store.insert_snapshots((base + 60 * i, 1000.0 + i, {}) for i in range(2002))
+        history = self.store.get_portfolio_history(max_points=2000)
+        self.assertLessEqual(len(history), 2000)
+        self.assertEqual(history['TotalValueUSD'].iloc[0], 1000.0)
+        self.assertEqual(history['TotalValueUSD'].iloc[-1], self.store.get_latest_portfolio_value())
+        self.assertEqual(history['TotalValueUSD'].iloc[-1], 3001.0)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,51 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from utils import vesper_backend
+from utils.vesper_math import v_ema, v_rsi, v_atr, v_adx
+
+class TestVesperBackend(unittest.TestCase):
+    def setUp(self):
+        self.original = vesper_backend.get_backend()
+        rng = np.random.default_rng(9)
+        self.c = 100 + np.cumsum(rng.normal(0, 1, 3000))
+        self.h = self.c + rng.uniform(0, 1, 3000)
+        self.l = self.c - rng.uniform(0, 1, 3000)
+
+    def tearDown(self):
+        vesper_backend.set_backend(self.original)
+
+    def outputs(self):
+        return [v_ema(self.c, 50), v_rsi(self.c, 14, method='wilder'),
+                v_atr(self.h, self.l, self.c, 14), v_adx(self.h, self.l, self.c, 14)[0]]
+
+    def test_selection(self):
+        self.assertEqual(vesper_backend.set_backend('numpy'), 'numpy')
+        expected = 'numba' if vesper_backend.HAS_NUMBA else 'numpy'
+        self.assertEqual(vesper_backend.set_backend('auto'), expected)
+        self.assertEqual(vesper_backend.set_backend('numba'), expected)  # Falls back without Numba
+        with self.assertRaises(ValueError):
+            vesper_backend.set_backend('cuda')
+
+    def test_ewm_sum_recurrence(self):
+        vesper_backend.set_backend('numpy')
+        y = vesper_backend.ewm_sum(np.array([1.0, 2.0, 3.0]), 0.5)
+        np.testing.assert_allclose(y, [1.0, 2.5, 4.25])
+        np.testing.assert_allclose(vesper_backend.ema_filter(np.array([2.0]), 0.5, 1.0), [1.5])
+
+    @unittest.skipUnless(vesper_backend.HAS_NUMBA, "numba not installed")
+    def test_numba_matches_numpy(self):
+        vesper_backend.set_backend('numpy')
+        ref = self.outputs()
+        vesper_backend.set_backend('numba')
+        vesper_backend.warmup()
+        for mine, expected in zip(self.outputs(), ref):
+            np.testing.assert_allclose(mine, expected, rtol=1e-12, equal_nan=True)
+
+if __name__ == '__main__':
+    unittest.main()
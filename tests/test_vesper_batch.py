@@ -0,0 +1,77 @@
+import unittest
+import sys
+import os
+import numpy as np
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from utils.vesper_math import v_sma, v_std_dev, v_bollinger, v_rsi, v_ema, v_macd, v_atr, v_adx
+from utils.vesper_batch import (
+    stack_series, b_sma, b_std_dev, b_bollinger, b_rsi, b_ema, b_macd, b_atr, b_adx, b_technical_features
+)
+
+class TestVesperBatch(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(5)
+        # Different lengths and price scales, including one shorter than every window
+        self.closes = [87000 + np.cumsum(rng.normal(0, 50, 600)),
+                       3000 + np.cumsum(rng.normal(0, 5, 350)),
+                       0.00009 + np.cumsum(rng.normal(0, 1e-7, 120)),
+                       100 + np.cumsum(rng.normal(0, 1, 10))]
+        self.highs = [c + rng.uniform(0, 1, len(c)) * np.abs(c).mean() * 1e-3 for c in self.closes]
+        self.lows = [c - rng.uniform(0, 1, len(c)) * np.abs(c).mean() * 1e-3 for c in self.closes]
+        self.C, self.H, self.L = (stack_series(s) for s in (self.closes, self.highs, self.lows))
+
+    def assertRowsMatch(self, matrix, kernel):
+        """Each row (trimmed of its padding) equals the 1D kernel on that series."""
+        for i in range(len(self.closes)):
+            n = len(self.closes[i])
+            expected = kernel(i)
+            np.testing.assert_array_equal(np.isnan(matrix[i, :-n]), True)
+            np.testing.assert_allclose(matrix[i, -n:], expected, rtol=1e-8, atol=1e-12, equal_nan=True)
+
+    def test_stack_series(self):
+        m = stack_series([np.arange(3.0), np.arange(5.0)])
+        self.assertEqual(m.shape, (2, 5))
+        np.testing.assert_array_equal(m[0], [np.nan, np.nan, 0, 1, 2])
+        self.assertEqual(stack_series([np.arange(5.0)], length=2).tolist(), [[3.0, 4.0]])
+
+    def test_window_kernels(self):
+        self.assertRowsMatch(b_sma(self.C, 20), lambda i: v_sma(self.closes[i], 20))
+        self.assertRowsMatch(b_std_dev(self.C, 20), lambda i: v_std_dev(self.closes[i], 20))
+        upper = b_bollinger(self.C, 20)[0]
+        self.assertRowsMatch(upper, lambda i: v_bollinger(self.closes[i], 20)[0])
+
+    def test_rsi(self):
+        for method in ('sma', 'wilder'):
+            self.assertRowsMatch(b_rsi(self.C, 14, method), lambda i: v_rsi(self.closes[i], 14, method))
+
+    def test_recursive_kernels(self):
+        self.assertRowsMatch(b_ema(self.C, 50), lambda i: v_ema(self.closes[i], 50))
+        for k in range(3):
+            self.assertRowsMatch(b_macd(self.C)[k], lambda i: v_macd(self.closes[i])[k])
+        self.assertRowsMatch(b_atr(self.H, self.L, self.C, 14), lambda i: v_atr(self.highs[i], self.lows[i], self.closes[i], 14))
+        for k in range(3):
+            self.assertRowsMatch(b_adx(self.H, self.L, self.C, 14)[k],
+                                 lambda i: v_adx(self.highs[i], self.lows[i], self.closes[i], 14)[k])
+
+    def test_interior_nans_match_the_1d_kernels(self):
+        # Missing candles: inside the EMA seed window, a single gap and a run of three
+        for series in (self.closes, self.highs, self.lows):
+            series[0][[5, 300]] = np.nan
+            series[1][100:103] = np.nan
+        self.C, self.H, self.L = (stack_series(s) for s in (self.closes, self.highs, self.lows))
+        self.test_window_kernels()
+        self.test_rsi()
+        self.test_recursive_kernels()
+        ema = b_ema(self.C, 50)
+        self.assertFalse(np.isnan(ema[1, -1]))  # Held over the gap, not poisoned by it
+
+    def test_technical_features_shapes(self):
+        feats = b_technical_features(self.H, self.L, self.C)
+        self.assertEqual(len(feats), 12)
+        self.assertTrue(all(m.shape == self.C.shape for m in feats.values()))
+
+if __name__ == '__main__':
+    unittest.main()
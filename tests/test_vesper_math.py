@@ -0,0 +1,181 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from numpy.lib.stride_tricks import sliding_window_view
+from utils.vesper_math import v_ema, v_macd, v_true_range, v_atr, v_adx, v_std_dev, v_rsi
+from utils.vesper_math import v_zscore, v_rolling_max, v_rolling_min, v_percent_rank, v_roc, v_volume_spike
+from utils.vesper_stream import StreamingEMA, StreamingATR, StreamingRSI
+
+try:
+    import pandas_ta  # noqa: F401
+    HAS_PANDAS_TA = True
+except ImportError:
+    HAS_PANDAS_TA = False
+
+def rma(s, n):
+    return s.ewm(alpha=1 / n, min_periods=n).mean()
+
+def ema(s, n):
+    """pandas_ta ema (sma seed, adjust=False) written out in pandas."""
+    s = s.loc[s.first_valid_index():].copy()
+    seed = s.iloc[:n].mean()
+    s.iloc[:n - 1] = np.nan
+    s.iloc[n - 1] = seed
+    return s.ewm(span=n, adjust=False).mean()
+
+def two_pass_std(x, window):
+    """Exact reference: explicit windows, mean subtracted before squaring."""
+    out = np.full(len(x), np.nan)
+    out[window - 1:] = sliding_window_view(x, window).std(axis=1)
+    return out
+
+def make_candles(n=2000, seed=3):
+    rng = np.random.default_rng(seed)
+    close = 100 + np.cumsum(rng.normal(0, 1, n))
+    return pd.DataFrame({'open': close, 'high': close + rng.uniform(0, 2, n),
+                         'low': close - rng.uniform(0, 2, n), 'close': close, 'volume': 1.0})
+
+class TestVesperMath(unittest.TestCase):
+    def setUp(self):
+        self.df = make_candles()
+        self.h, self.l, self.c = (self.df[k].to_numpy() for k in ('high', 'low', 'close'))
+
+    def assertSeriesEqual(self, a, b):
+        np.testing.assert_array_equal(np.isnan(a), np.isnan(np.asarray(b, dtype=float)))
+        np.testing.assert_allclose(a, b, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_ema_and_macd(self):
+        s = self.df['close']
+        self.assertSeriesEqual(v_ema(self.c, 50), ema(s, 50).reindex(s.index))
+        self.assertSeriesEqual(v_ema(self.c, 50), StreamingEMA(50).update_many(self.c))
+
+        macd, hist, signal = v_macd(self.c, 12, 26, 9)
+        ref_macd = ema(s, 12) - ema(s, 26)
+        ref_signal = ema(ref_macd, 9).reindex(s.index)
+        self.assertSeriesEqual(macd, ref_macd)
+        self.assertSeriesEqual(signal, ref_signal)
+        self.assertSeriesEqual(hist, ref_macd - ref_signal)
+        self.assertTrue(np.isnan(v_ema(self.c[:10], 50)).all())
+
+    def test_interior_nans_are_skipped_like_pandas(self):
+        # One bad close must not turn the rest of the series into NaN (FeatureEngineer dropna()s)
+        x = self.c[:300].copy()
+        x[[150, 200, 201]] = np.nan
+        s = pd.Series(x)
+        self.assertSeriesEqual(v_ema(x, 50), ema(s, 50).reindex(s.index))
+        self.assertEqual(int(np.isnan(v_ema(x, 50)).sum()), 49)  # Only the warm-up
+        delta = s.diff()
+        gain, loss = rma(delta.clip(lower=0), 14), rma(-delta.clip(upper=0), 14)
+        self.assertSeriesEqual(v_rsi(x, 14, method='wilder'), 100 * gain / (gain + loss))
+        h, l = self.h[:300].copy(), self.l[:300].copy()
+        h[150] = np.nan
+        self.assertFalse(np.isnan(v_atr(h, l, x, 14)[250:]).any())
+        with np.errstate(all='raise'):  # window=1 (no decay) holds over NaNs too, without 0 / 0
+            self.assertSeriesEqual(v_atr(h, l, x, 1), rma(pd.Series(v_true_range(h, l, x)), 1))
+
+    def test_atr_and_adx(self):
+        h, l, c = self.df['high'], self.df['low'], self.df['close']
+        prev = c.shift(1)
+        tr = pd.concat([h - l, (h - prev).abs(), (l - prev).abs()], axis=1).max(axis=1)
+        tr.iloc[0] = np.nan
+        atr_ref = rma(tr, 14)
+        self.assertSeriesEqual(v_atr(self.h, self.l, self.c, 14), atr_ref)
+        self.assertSeriesEqual(v_atr(self.h, self.l, self.c, 14), StreamingATR(14).update_many(zip(self.h, self.l, self.c)))
+
+        up, dn = h.diff(), -l.diff()
+        pos = ((up > dn) & (up > 0)) * up
+        neg = ((dn > up) & (dn > 0)) * dn
+        dmp = 100 * rma(pos, 14) / atr_ref
+        dmn = 100 * rma(neg, 14) / atr_ref
+        adx_ref = rma(100 * (dmp - dmn).abs() / (dmp + dmn), 14)
+        adx, plus_di, minus_di = v_adx(self.h, self.l, self.c, 14)
+        self.assertSeriesEqual(plus_di, dmp)
+        self.assertSeriesEqual(minus_di, dmn)
+        self.assertSeriesEqual(adx, adx_ref)
+
+    def test_adx_skips_leading_nans(self):
+        pad = np.full(30, np.nan)
+        h, l, c = (np.concatenate((pad, a)) for a in (self.h, self.l, self.c))
+        for padded, clean in zip(v_adx(h, l, c, 14), v_adx(self.h, self.l, self.c, 14)):
+            self.assertTrue(np.isnan(padded[:30]).all())
+            self.assertSeriesEqual(padded[30:], clean)
+
+    def test_std_dev_precision_btc_scale(self):
+        rng = np.random.default_rng(11)
+        # Trending series at ~87k with cent-level noise: E[X^2] - E[X]^2 collapses to 0 here
+        prices = np.linspace(60000, 87000, 20000) + rng.normal(0, 0.05, 20000)
+        ref = two_pass_std(prices, 20)
+        np.testing.assert_allclose(v_std_dev(prices, 20), ref, rtol=1e-8, equal_nan=True)
+        self.assertTrue((v_std_dev(prices, 20)[19:] > 0).all())
+
+    def test_std_dev_precision_lunc_scale(self):
+        rng = np.random.default_rng(12)
+        prices = 0.00009 + rng.normal(0, 1e-7, 20000)
+        for window in (14, 200):
+            np.testing.assert_allclose(v_std_dev(prices, window), two_pass_std(prices, window), rtol=1e-8, equal_nan=True)
+
+    def test_std_dev_nan_windows_and_short_input(self):
+        x = np.arange(60, dtype=float)
+        x[30] = np.nan
+        out = v_std_dev(x, 5)
+        self.assertTrue(np.isnan(out[30:35]).all())
+        self.assertFalse(np.isnan(out[35:]).any())
+        self.assertAlmostEqual(out[10], np.std(x[6:11]))
+        self.assertTrue(np.isnan(v_std_dev(np.arange(3, dtype=float), 5)).all())
+
+    def test_wilder_rsi(self):
+        s = self.df['close']
+        delta = s.diff()
+        gain = rma(delta.clip(lower=0), 14)
+        loss = rma(-delta.clip(upper=0), 14)
+        self.assertSeriesEqual(v_rsi(self.c, 14, method='wilder'), 100 * gain / (gain + loss))
+        self.assertSeriesEqual(v_rsi(self.c, 14, method='wilder'), StreamingRSI(14, method='wilder').update_many(self.c))
+        # Default stays the SMA variant existing models were trained on
+        self.assertSeriesEqual(v_rsi(self.c, 14), StreamingRSI(14, method='sma').update_many(self.c))
+        with self.assertRaises(ValueError):
+            v_rsi(self.c, 14, method='ema')
+
+    def test_rolling_statistics(self):
+        s = self.df['close'].copy()
+        s.iloc[500] = np.nan  # NaN windows stay NaN
+        x = s.to_numpy()
+        for window in (1, 5, 20, 333):
+            np.testing.assert_array_equal(v_rolling_max(x, window), s.rolling(window).max())
+            np.testing.assert_array_equal(v_rolling_min(x, window), s.rolling(window).min())
+            np.testing.assert_allclose(v_percent_rank(x, window), s.rolling(window).rank(pct=True), equal_nan=True)
+        ties = np.round(self.c / 5)
+        np.testing.assert_allclose(v_percent_rank(ties, 20), pd.Series(ties).rolling(20).rank(pct=True), equal_nan=True)
+        np.testing.assert_allclose(v_roc(x, 5), s.pct_change(5, fill_method=None), equal_nan=True)
+
+        z_ref = (self.df['close'] - self.df['close'].rolling(20).mean()) / self.df['close'].rolling(20).std(ddof=0)
+        self.assertSeriesEqual(v_zscore(self.c, 20), z_ref)
+        self.assertEqual(v_zscore(np.full(30, 7.0), 20)[-1], 0.0)  # Flat window
+
+        volume = np.random.default_rng(5).uniform(0, 10, 200)
+        volume[50:80] = 0
+        spike = v_volume_spike(volume, 20)
+        self.assertTrue(np.isnan(spike[:19]).all())
+        self.assertEqual(spike[75], 0.0)
+        self.assertAlmostEqual(spike[150], volume[150] / volume[131:151].mean())
+
+    @unittest.skipUnless(HAS_PANDAS_TA, "pandas_ta not installed")
+    def test_parity_with_pandas_ta(self):
+        df = self.df
+        np.testing.assert_allclose(v_ema(self.c, 50), df.ta.ema(length=50), rtol=1e-7, equal_nan=True)
+        np.testing.assert_allclose(v_rsi(self.c, 14, method='wilder'), df.ta.rsi(length=14), rtol=1e-7, equal_nan=True)
+        macd = df.ta.macd(fast=12, slow=26, signal=9)
+        for mine, col in zip(v_macd(self.c), ['MACD_12_26_9', 'MACDh_12_26_9', 'MACDs_12_26_9']):
+            np.testing.assert_allclose(mine, macd[col], rtol=1e-7, equal_nan=True)
+        np.testing.assert_allclose(v_atr(self.h, self.l, self.c, 14), df.ta.atr(length=14), rtol=1e-7, equal_nan=True)
+        adx = df.ta.adx(length=14)
+        for mine, col in zip(v_adx(self.h, self.l, self.c, 14), ['ADX_14', 'DMP_14', 'DMN_14']):
+            np.testing.assert_allclose(mine, adx[col], rtol=1e-7, equal_nan=True)
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,168 @@
+import unittest
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from utils.vesper_math import v_sma, v_std_dev, v_ema, v_rsi, v_atr, v_bollinger, v_macd, v_adx
+from utils.vesper_math import v_zscore, v_rolling_max, v_rolling_min, v_percent_rank, v_roc, v_volume_spike
+from utils.vesper_stream import (
+    StreamingSMA, StreamingStdDev, StreamingEMA, StreamingRSI, StreamingATR, StreamingBollinger, RESYNC_INTERVAL,
+    StreamingZScore, StreamingMax, StreamingMin, StreamingPercentRank, StreamingROC, StreamingVolumeSpike,
+    StreamingMACD, StreamingADX,
+)
+
+class TestVesperStream(unittest.TestCase):
+    def setUp(self):
+        rng = np.random.default_rng(7)
+        self.close = 100 + np.cumsum(rng.normal(0, 1, 3000))
+        self.high = self.close + rng.uniform(0, 2, 3000)
+        self.low = self.close - rng.uniform(0, 2, 3000)
+
+    def assertSeriesEqual(self, stream, batch):
+        np.testing.assert_array_equal(np.isnan(stream), np.isnan(batch))
+        np.testing.assert_allclose(stream, batch, rtol=1e-9, atol=1e-9, equal_nan=True)
+
+    def test_sma_matches_batch(self):
+        self.assertSeriesEqual(StreamingSMA(20).update_many(self.close), v_sma(self.close, 20))
+        self.assertGreater(len(self.close), RESYNC_INTERVAL)  # Exercises the periodic resync
+
+    def test_std_and_bollinger_match_batch(self):
+        self.assertSeriesEqual(StreamingStdDev(20).update_many(self.close), v_std_dev(self.close, 20))
+        upper, mid, lower = v_bollinger(self.close, 20, 2.0)
+        bands = StreamingBollinger(20, 2.0).update_many(self.close)
+        self.assertSeriesEqual(bands[:, 0], upper)
+        self.assertSeriesEqual(bands[:, 1], mid)
+        self.assertSeriesEqual(bands[:, 2], lower)
+
+    def test_rsi_sma_matches_batch(self):
+        self.assertSeriesEqual(StreamingRSI(14, method='sma').update_many(self.close), v_rsi(self.close, 14))
+        # Flat and monotonic stretches hit the 0/100 edge cases
+        edge = np.concatenate([np.full(20, 5.0), np.arange(20.0), np.arange(20.0)[::-1]])
+        self.assertSeriesEqual(StreamingRSI(14, method='sma').update_many(edge), v_rsi(edge, 14))
+
+    def test_ema_wilder_rsi_and_atr_match_pandas(self):
+        s = pd.Series(self.close)
+        # EMA: SMA seed then recursive (pandas_ta convention)
+        seeded = s.copy()
+        seeded.iloc[:9] = np.nan
+        seeded.iloc[9] = s.iloc[:10].mean()
+        ema_ref = seeded.ewm(span=10, adjust=False).mean()
+        ema_ref.iloc[:9] = np.nan
+        self.assertSeriesEqual(StreamingEMA(10).update_many(self.close), ema_ref.values)
+
+        delta = s.diff()
+        gain = delta.clip(lower=0).ewm(alpha=1 / 14, min_periods=14).mean()
+        loss = (-delta.clip(upper=0)).ewm(alpha=1 / 14, min_periods=14).mean()
+        rsi_ref = 100 * gain / (gain + loss)
+        self.assertSeriesEqual(StreamingRSI(14, method='wilder').update_many(self.close), rsi_ref.values)
+
+        prev = s.shift(1)
+        tr = pd.concat([pd.Series(self.high - self.low), (pd.Series(self.high) - prev).abs(),
+                        (pd.Series(self.low) - prev).abs()], axis=1).max(axis=1, skipna=False)
+        atr_ref = tr.ewm(alpha=1 / 14, min_periods=14).mean()
+        atr = StreamingATR(14).update_many(zip(self.high, self.low, self.close))
+        self.assertSeriesEqual(atr, atr_ref.values)
+
+    def test_macd_and_adx_match_batch(self):
+        macd = StreamingMACD(12, 26, 9).update_many(self.close)
+        for col, ref in enumerate(v_macd(self.close, 12, 26, 9)):
+            self.assertSeriesEqual(macd[:, col], ref)
+
+        candles = list(zip(self.high, self.low, self.close))
+        adx = StreamingADX(14).update_many(candles)
+        for col, ref in enumerate(v_adx(self.high, self.low, self.close, 14)):
+            self.assertSeriesEqual(adx[:, col], ref)
+        flat = np.full(40, 5.0)  # No range at all: DI and ADX stay undefined
+        adx = StreamingADX(14).update_many(zip(flat, flat, flat))
+        for col, ref in enumerate(v_adx(flat, flat, flat, 14)):
+            self.assertSeriesEqual(adx[:, col], ref)
+
+    def test_rolling_statistics_match_batch(self):
+        gappy = self.close.copy()
+        gappy[1500] = np.nan
+        ties = np.round(self.close)
+        for data in (self.close, gappy, ties):
+            for window in (1, 7, 50):
+                np.testing.assert_array_equal(StreamingMax(window).update_many(data), v_rolling_max(data, window))
+                np.testing.assert_array_equal(StreamingMin(window).update_many(data), v_rolling_min(data, window))
+                self.assertSeriesEqual(StreamingPercentRank(window).update_many(data), v_percent_rank(data, window))
+                self.assertSeriesEqual(StreamingROC(window).update_many(data), v_roc(data, window))
+
+        zs = StreamingZScore(20)
+        self.assertSeriesEqual(zs.update_many(self.close), v_zscore(self.close, 20))
+        self.assertAlmostEqual(zs.mean, self.close[-20:].mean())
+        self.assertAlmostEqual(zs.std, self.close[-20:].std())
+
+        volume = np.abs(self.high - self.low)
+        volume[100:130] = 0
+        self.assertSeriesEqual(StreamingVolumeSpike(20).update_many(volume), v_volume_spike(volume, 20))
+
+    def test_precision_at_large_price_levels(self):
+        prices = 87000.0 + np.random.default_rng(1).normal(0, 0.01, 5000)
+        std = StreamingStdDev(20).update_many(prices)
+        ref = pd.Series(prices).rolling(20).std(ddof=0).values
+        np.testing.assert_allclose(std[19:], ref[19:], rtol=1e-6)
+
+    def test_interior_nans_match_batch(self):
+        # Missing candles: leading, single and consecutive NaNs, one right after a resync
+        gap = np.zeros(len(self.close), dtype=bool)
+        gap[[0, 1, 300, 700, 701, 702, RESYNC_INTERVAL * 2 + 1]] = True
+        close, high, low = (np.where(gap, np.nan, a) for a in (self.close, self.high, self.low))
+        volume = np.where(gap, np.nan, np.abs(self.high - self.low))
+
+        self.assertSeriesEqual(StreamingSMA(20).update_many(close), v_sma(close, 20))
+        self.assertSeriesEqual(StreamingStdDev(20).update_many(close), v_std_dev(close, 20))
+        self.assertSeriesEqual(StreamingZScore(20).update_many(close), v_zscore(close, 20))
+        self.assertSeriesEqual(StreamingVolumeSpike(20).update_many(volume), v_volume_spike(volume, 20))
+        self.assertSeriesEqual(StreamingEMA(10).update_many(close), v_ema(close, 10))
+        for method in ('sma', 'wilder'):
+            self.assertSeriesEqual(StreamingRSI(14, method).update_many(close), v_rsi(close, 14, method=method))
+        bands = StreamingBollinger(20).update_many(close)
+        for col, ref in enumerate(v_bollinger(close, 20)):
+            self.assertSeriesEqual(bands[:, col], ref)
+        macd = StreamingMACD().update_many(close)
+        for col, ref in enumerate(v_macd(close)):
+            self.assertSeriesEqual(macd[:, col], ref)
+
+        candles = list(zip(high, low, close))
+        self.assertSeriesEqual(StreamingATR(14).update_many(candles), v_atr(high, low, close, 14))
+        adx = StreamingADX(14).update_many(candles)
+        for col, ref in enumerate(v_adx(high, low, close, 14)):
+            self.assertSeriesEqual(adx[:, col], ref)
+
+        # The rolling windows recover once the gap has left them; the recursions never stopped
+        sma = StreamingSMA(20)
+        sma.update_many(close[:321])
+        self.assertTrue(sma.ready)
+        self.check_prime(close, np.column_stack((high, low, close)), volume)
+
+    def test_prime_matches_updates(self):
+        self.check_prime(self.close, np.column_stack((self.high, self.low, self.close)),
+                         np.abs(self.high - self.low))
+
+    def check_prime(self, close, hlc, volume):
+        cases = [
+            (lambda: StreamingSMA(20), close), (lambda: StreamingStdDev(20), close),
+            (lambda: StreamingEMA(50), close), (lambda: StreamingRSI(14), close),
+            (lambda: StreamingRSI(14, method='wilder'), close), (lambda: StreamingBollinger(20), close),
+            (lambda: StreamingMACD(), close), (lambda: StreamingZScore(20), close),
+            (lambda: StreamingROC(5), close), (lambda: StreamingVolumeSpike(20), volume),
+            (lambda: StreamingATR(14), hlc), (lambda: StreamingADX(14), hlc),
+        ]
+        for make, values in cases:
+            for split in (1, 10, 500):  # Primed in two chunks (the first may not even warm it up)
+                streamed, primed = make(), make()
+                streamed.update_many(values[:600])
+                primed.prime(values[:split])
+                primed.prime(values[split:600])
+                for x in values[600:650]:  # Then both keep streaming
+                    expected, got = streamed.update(x), primed.update(x)
+                np.testing.assert_allclose(got, expected, rtol=1e-9, err_msg=type(streamed).__name__)
+                self.assertEqual(primed.ready, streamed.ready)
+
+if __name__ == '__main__':
+    unittest.main()
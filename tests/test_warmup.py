@@ -0,0 +1,136 @@
+import unittest
+import asyncio
+import tempfile
+import sys
+import os
+import numpy as np
+import pandas as pd
+
+# Ensure project root is in path
+sys.path.append(os.getcwd())
+
+from strategy.newton_agent import NewtonAgent
+from strategy.sma_strategy import SMAStrategy
+from strategy.ml_strategy import MLStrategy
+from strategy.technical_sub_agents import TrendAgent, OscillatorAgent, VolumeAgent
+from ml.feature_stream import FeatureStream
+from data.data_storage import DataStorage
+from tests.test_feature_stream import make_candles
+
+try:
+    import strategy.meta_strategy as meta_strategy  # Imports every council agent (backtrader, ...)
+    HAS_COUNCIL = True
+except ImportError:
+    HAS_COUNCIL = False
+
+PRIMED = 600  # Candles primed in bulk; the rest are fed live
+
+def live(strategy, candles):
+    async def run():
+        return [await strategy.on_candle(c) for c in candles]
+    return asyncio.run(run())
+
+class TestWarmup(unittest.TestCase):
+    def setUp(self):
+        self.df = make_candles(700)
+        self.df.loc[650, ['close', 'low']] *= 0.9  # A crash for Newton to react to
+        self.df.loc[650, 'volume'] *= 20
+        self.candles = self.df.to_dict('records')
+        self.tmp = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        self.tmp.cleanup()
+
+    def primed_and_streamed(self, make):
+        streamed, primed = make(), make()
+        expected = live(streamed, self.candles)[PRIMED:]
+        primed.prime(self.df.iloc[:PRIMED])
+        return streamed, primed, expected, live(primed, self.candles[PRIMED:])
+
+    def test_newton_and_sma_signals_match_streaming(self):
+        streamed, primed, expected, got = self.primed_and_streamed(NewtonAgent)
+        self.assertEqual([s['vote'] for s in got], [s['vote'] for s in expected])
+        self.assertIn('buy', [s['vote'] for s in got])
+        self.assertEqual(primed.candles_seen, streamed.candles_seen)
+        self.assertAlmostEqual(primed.rsi.value, streamed.rsi.value, places=9)
+
+        _, _, expected, got = self.primed_and_streamed(lambda: SMAStrategy(5, 20))
+        self.assertEqual(got, expected)
+        self.assertTrue(any(got))
+
+    def test_feature_stream_prime_matches_updates(self):
+        streamed, primed = FeatureStream(), FeatureStream()
+        for candle in self.candles[:PRIMED]:
+            streamed.update(candle)
+        primed.prime(self.df.iloc[:PRIMED])
+        np.testing.assert_allclose(primed.vector, streamed.vector, rtol=1e-9)
+        for candle in self.candles[PRIMED:]:
+            np.testing.assert_allclose(primed.update(candle), streamed.update(candle), rtol=1e-9)
+        self.assertEqual(primed.candles_seen, streamed.candles_seen)
+
+    @unittest.skipUnless(HAS_COUNCIL, "council agents' dependencies not installed")
+    def test_council_prime_matches_streaming(self):
+        perf_file = meta_strategy.AGENT_PERF_FILE
+        meta_strategy.AGENT_PERF_FILE = os.path.join(self.tmp.name, 'agent_perf.json')  # Keep data/ untouched
+        self.addCleanup(setattr, meta_strategy, 'AGENT_PERF_FILE', perf_file)
+        make = lambda: meta_strategy.MetaStrategy([TrendAgent(), OscillatorAgent(), VolumeAgent(), NewtonAgent()])
+        streamed, primed, _, _ = self.primed_and_streamed(make)
+        np.testing.assert_array_equal(primed.indicators.array('close'), streamed.indicators.array('close'))
+        self.assertEqual(primed.current_regime, streamed.current_regime)
+        votes = lambda council: [[(v['agent'], v['vote'], v['confidence']) for v in e['votes']] for e in council.vote_history]
+        self.assertEqual(votes(primed), votes(streamed))  # Same ballots on the live candles
+
+    def test_repeated_candle_is_processed_once(self):
+        # The live loop feeds the forming candle again (updated) when no new one has opened
+        repeated = []
+        for candle in self.candles[:300]:
+            repeated += [dict(candle, close=candle['close'] * 1.01), candle]
+        newton, newton_once = NewtonAgent(), NewtonAgent()
+        live(newton, repeated)
+        live(newton_once, repeated[::2])
+        self.assertEqual(newton.candles_seen, 300)
+        self.assertAlmostEqual(newton.rsi.value, newton_once.rsi.value, places=12)
+
+        ml = MLStrategy(model_path=os.path.join(self.tmp.name, 'missing'),
+                        legacy_stats_path=os.path.join(self.tmp.name, 'vec_normalize.pkl'))
+        live(ml, repeated)
+        self.assertEqual((ml.features.candles_seen, len(ml.history)), (300, 200))
+        self.assertEqual(ml.history.last('close'), repeated[-2]['close'])  # The first version of each candle
+
+        primed = NewtonAgent()
+        primed.prime(self.df.iloc[:PRIMED])
+        live(primed, self.candles[PRIMED - 1:PRIMED + 1])  # The last primed candle is not fed twice
+        self.assertEqual(primed.candles_seen, PRIMED + 1)
+
+    @unittest.skipUnless(HAS_COUNCIL, "council agents' dependencies not installed")
+    def test_council_skips_repeated_candles_for_every_agent(self):
+        perf_file = meta_strategy.AGENT_PERF_FILE
+        meta_strategy.AGENT_PERF_FILE = os.path.join(self.tmp.name, 'agent_perf.json')  # Keep data/ untouched
+        self.addCleanup(setattr, meta_strategy, 'AGENT_PERF_FILE', perf_file)
+        council = meta_strategy.MetaStrategy([TrendAgent(), NewtonAgent()])
+        live(council, [c for candle in self.candles[:300] for c in (candle, dict(candle, close=1.0))])
+        self.assertEqual(len(council.indicators), 300)
+        self.assertEqual(council.agents[1].candles_seen, 300)  # Same candles as the shared cache
+        np.testing.assert_array_equal(council.indicators.array('close')[-5:], self.df['close'].to_numpy()[295:300])
+
+    def test_warmup_history_from_storage_and_fetch(self):
+        storage = DataStorage()
+        storage.storage_dir = self.tmp.name
+        ts = pd.date_range('2024-01-01', periods=300, freq='min')
+        stored = pd.DataFrame({'timestamp': ts, 'open': 1.0, 'high': 2.0, 'low': 0.5, 'close': np.arange(300.0), 'volume': 1.0})
+        stored = stored.drop(index=range(40, 60))  # 20-minute outage: older candles are unusable
+        stored.to_csv(os.path.join(self.tmp.name, 'BTC_USD_intraday.csv'), index=False)
+
+        fetched_ts = pd.date_range(ts[250], periods=60, freq='min')  # Overlaps the file, extends it
+        ohlcv = [[int(t.value // 1_000_000), 1.0, 2.0, 0.5, 1000.0 + i, 1.0] for i, t in enumerate(fetched_ts)]
+        history = storage.load_warmup_history('BTC/USD', ohlcv, '1m', limit=500, max_gap=5)
+
+        self.assertEqual(history['timestamp'].iloc[0], ts[60])
+        self.assertEqual(history['timestamp'].iloc[-1], fetched_ts[-2])  # The forming candle is left to the loop
+        self.assertTrue(history['timestamp'].is_unique)
+        self.assertEqual(history.loc[history['timestamp'] == ts[260], 'close'].item(), 1010.0)  # Fetched wins
+        self.assertEqual(len(storage.load_warmup_history('BTC/USD', ohlcv, '1m', limit=100)), 100)
+        self.assertEqual(len(storage.load_warmup_history('ETH/USD', ohlcv, '1m', limit=500)), 59)  # No file
+
+if __name__ == '__main__':
+    unittest.main()
@@ -5,18 +5,24 @@ import sys
 import pandas as pd
 from dotenv import load_dotenv
 from data.exchange_client import ExchangeClient
-from data.data_storage import fetch_and_save_historical_data, load_historical_data, DATA_DIR
+from data.data_storage import fetch_and_save_historical_data, DATA_DIR
 from ml.feature_engineer import FeatureEngineer
+from ml.dataset_builder import build_training_dataset, load_training_dataset
 from ml.rl_agent import RLAgent, MODELS_DIR
+from ml.feature_pipeline import FeaturePipeline, pipeline_path
 from utils.logger import setup_logger
 
 load_dotenv()
 logger = setup_logger("Trainer")
 
-async def fetch_training_data(symbols=['BTC/USD'], timeframe='1h', limit=10000):
+async def fetch_training_data(symbols=['BTC/USD'], timeframe='1h', limit=10000, require_continuous=False, n_workers=None, rsi_method='sma'):
+    """
+    Fetches each symbol to its own CSV, then builds a per-symbol feature dataset
+    (Parquet, one episode per symbol). Returns the dataset path.
+    """
     client = ExchangeClient('kraken') 
     if isinstance(symbols, str): symbols = [symbols]
-    all_data = []
+    sources = {}
     
     try:
         for symbol in symbols:
@@ -24,24 +30,31 @@ async def fetch_training_data(symbols=['BTC/USD'], timeframe='1h', limit=10000):
             logger.info(f"Fetching {limit} candles for {symbol}...")
             path = await fetch_and_save_historical_data(client, symbol, timeframe, limit, filename)
             if path:
-                df = load_historical_data(os.path.basename(path))
-                if not df.empty:
-                    df['symbol'] = symbol
-                    all_data.append(df)
-        
-        if not all_data: return None
-            
-        combined_df = pd.concat(all_data, ignore_index=True)
-        combined_filename = "combined_training_data.csv"
-        combined_path = os.path.join(DATA_DIR, combined_filename)
-        combined_df.to_csv(combined_path, index=False)
-        return combined_path
+                sources[symbol] = path
     finally:
         await client.close()
 
-def train_rl_model(df, model_name, timesteps=30000, reward_mode='profit', resume=False, n_envs=1, socratic=False, is_oracle=False):
-    fe = FeatureEngineer()
-    df = fe.add_technical_indicators(df)
+    if not sources: return None
+    dataset_path = os.path.join(DATA_DIR, f"training_dataset_{timeframe}.parquet")
+    return build_training_dataset(sources, dataset_path, require_continuous=require_continuous, n_workers=n_workers, rsi_method=rsi_method)
+
+def train_rl_model(df, model_name, timesteps=30000, reward_mode='profit', resume=False, n_envs=1, socratic=False, is_oracle=False, episode_bounds=None, rsi_method='sma'):
+    """
+    episode_bounds: Per-symbol row ranges of a built dataset (features already computed).
+    Without them, df is a single raw candle series and features are added here.
+    rsi_method: RSI variant the features were built with (recorded in the feature pipeline).
+    """
+    if episode_bounds is None:
+        fe = FeatureEngineer(rsi_method=rsi_method)
+        df = fe.add_technical_indicators(df)
+
+    # The feature pipeline (and its frozen scaler) is fitted on fresh runs and reused when resuming;
+    # models trained before pipelines existed keep observing unscaled features
+    existing = pipeline_path(os.path.join(MODELS_DIR, model_name))
+    if resume:
+        pipeline = FeaturePipeline.load(existing) if os.path.exists(existing) else FeaturePipeline.fit(df, rsi_method, scale=False)
+    else:
+        pipeline = FeaturePipeline.fit(df, rsi_method)
     
     # Default Hyperparams (GP3 Phase 3 optimized)
     hyperparams = {
@@ -62,29 +75,42 @@ def train_rl_model(df, model_name, timesteps=30000, reward_mode='profit', resume
             hyperparams.update(tuned)
     
     logger.info(f"Training PPO | Model: {model_name} | Steps: {timesteps} | Envs: {n_envs}")
-    agent = RLAgent(df, algorithm='PPO', reward_mode=reward_mode, resume=resume, model_path=model_name, n_envs=n_envs, socratic=socratic, is_oracle=is_oracle, **hyperparams)
+    agent = RLAgent(df, algorithm='PPO', reward_mode=reward_mode, resume=resume, model_path=model_name, n_envs=n_envs, socratic=socratic, is_oracle=is_oracle, episode_bounds=episode_bounds, pipeline=pipeline, **hyperparams)
     agent.train(total_timesteps=timesteps)
     agent.save(model_name)
     return agent
 
-def run_walk_forward_training(data_path, timesteps=30000, reward_mode='profit', windows=3):
-    """Implement Time-Traveler: Train on slices, validate on next."""
+def _window_slices(episodes, i, windows):
+    """Row ranges of walk-forward window i (train) and i+1 (val), cut inside every episode."""
+    train, val = [], []
+    for start, end in episodes:
+        size = (end - start) // (windows + 1)
+        train.append((start + i * size, start + (i + 1) * size))
+        val.append((start + (i + 1) * size, start + (i + 2) * size))
+    return train, val
+
+def _take(df, ranges):
+    """Concatenates row ranges and returns the frame with its re-based episode bounds."""
+    parts = [df.iloc[s:e] for s, e in ranges if e > s]
+    bounds, pos = [], 0
+    for p in parts:
+        bounds.append((pos, pos + len(p)))
+        pos += len(p)
+    return pd.concat(parts, ignore_index=True), bounds
+
+def run_walk_forward_training(data_path, timesteps=30000, reward_mode='profit', windows=3, rsi_method='sma'):
+    """Implement Time-Traveler: Train on slices, validate on next (per symbol episode)."""
     logger.info(f"🚀 Starting Walk-Forward Validation (Windows: {windows})")
-    full_df = load_historical_data(os.path.basename(data_path))
-    
-    window_size = len(full_df) // (windows + 1)
+    full_df, episodes = load_training_dataset(data_path)
     
     for i in range(windows):
-        train_start = i * window_size
-        train_end = (i + 1) * window_size
-        val_end = (i + 2) * window_size
-        
-        train_df = full_df.iloc[train_start:train_end]
-        val_df = full_df.iloc[train_end:val_end]
+        train_ranges, val_ranges = _window_slices(episodes, i, windows)
+        train_df, train_bounds = _take(full_df, train_ranges)
+        val_rows = sum(e - s for s, e in val_ranges)
         
-        logger.info(f"--- Window {i+1}/{windows}: Training on {len(train_df)} rows, Val on {len(val_df)} rows ---")
+        logger.info(f"--- Window {i+1}/{windows}: Training on {len(train_df)} rows, Val on {val_rows} rows ---")
         model_name = f"ppo_wf_win{i+1}"
-        train_rl_model(train_df, model_name, timesteps=timesteps//windows, reward_mode=reward_mode)
+        train_rl_model(train_df, model_name, timesteps=timesteps//windows, reward_mode=reward_mode, episode_bounds=train_bounds, rsi_method=rsi_method)
 
 if __name__ == "__main__":
     if sys.platform == 'win32':
@@ -101,6 +127,9 @@ if __name__ == "__main__":
     parser.add_argument("--walk-forward", action="store_true", help="Enable Rolling Window Training")
     parser.add_argument("--n-envs", type=int, default=1, help="Number of parallel environments for training")
     parser.add_argument("--philosophy", type=str, choices=["socrates", "plato", "heraclitus", "parmenides"], help="Philosophical training doctrine")
+    parser.add_argument("--require-continuous", action="store_true", help="Skip symbols whose candle series has gaps or duplicates")
+    parser.add_argument("--workers", type=int, default=None, help="Processes for per-symbol feature building (default: all cores)")
+    parser.add_argument("--rsi-method", type=str, default="sma", choices=["sma", "wilder"], help="RSI feature variant (models must be served with the same one)")
     
     args = parser.parse_args()
     
@@ -108,10 +137,10 @@ if __name__ == "__main__":
     symbols = args.symbol.split(',')
     if 'ALL' in [s.upper() for s in symbols]: symbols = TOP_10_CRYPTO
 
-    data_path = asyncio.run(fetch_training_data(symbols, args.timeframe, args.limit))
+    data_path = asyncio.run(fetch_training_data(symbols, args.timeframe, args.limit, require_continuous=args.require_continuous, n_workers=args.workers, rsi_method=args.rsi_method))
     
     if data_path:
-        df = load_historical_data(os.path.basename(data_path))
+        df, episodes = load_training_dataset(data_path)
         
         # Philosophical Routing
         socratic = (args.philosophy == "socrates")
@@ -124,7 +153,7 @@ if __name__ == "__main__":
             # Plato's Realm of Forms (Distillation)
             logger.info("🏛️ PLATO: Training Philosopher King (Oracle)...")
             king_name = f"{args.model_name}_king"
-            train_rl_model(df, king_name, timesteps=args.timesteps//2, reward_mode=reward_mode, n_envs=args.n_envs, is_oracle=True)
+            train_rl_model(df, king_name, timesteps=args.timesteps//2, reward_mode=reward_mode, n_envs=args.n_envs, is_oracle=True, episode_bounds=episodes, rsi_method=args.rsi_method)
             
             logger.info("🕯️ PLATO: Distilling to Cave Dweller (Student)...")
             # Student resumes from King but in a standard environment
@@ -132,9 +161,9 @@ if __name__ == "__main__":
             # Sequential loading from Oracle to Non-Oracle might crash due to shape mismatch.
             # So we train student fresh but maybe add a penalty if it deviates from King's actions.
             # Simplified for now: just training in standard env but with same reward mode.
-            train_rl_model(df, args.model_name, timesteps=args.timesteps//2, reward_mode=reward_mode, n_envs=args.n_envs)
+            train_rl_model(df, args.model_name, timesteps=args.timesteps//2, reward_mode=reward_mode, n_envs=args.n_envs, episode_bounds=episodes, rsi_method=args.rsi_method)
             
         elif args.walk_forward:
-            run_walk_forward_training(data_path, timesteps=args.timesteps, reward_mode=reward_mode)
+            run_walk_forward_training(data_path, timesteps=args.timesteps, reward_mode=reward_mode, rsi_method=args.rsi_method)
         else:
-            train_rl_model(df, args.model_name, timesteps=args.timesteps, reward_mode=reward_mode, resume=args.resume, n_envs=args.n_envs, socratic=socratic)
+            train_rl_model(df, args.model_name, timesteps=args.timesteps, reward_mode=reward_mode, resume=args.resume, n_envs=args.n_envs, socratic=socratic, episode_bounds=episodes, rsi_method=args.rsi_method)
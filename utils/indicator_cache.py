@@ -0,0 +1,164 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Callable, Dict, Optional
+from utils.vesper_math import (
+    v_sma, v_std_dev, v_rsi, v_ema, v_bollinger, v_atr,
+    v_zscore, v_rolling_max, v_rolling_min, v_percent_rank, v_roc, v_volume_spike,
+)
+from utils.ring_buffer import OHLCVBuffer
+
+DEFAULT_MAX_HISTORY = 500  # Candles kept per symbol (NewtonAgent needs 200)
+WILDER_TAIL = 40  # Windows of history behind a Wilder RSI value: older weight < (1 - 1/w)^(40w) ~ e^-40
+
+def _sma_latest(cache, window, field='close'):
+    return float(v_sma(cache.array(field)[-window:], window)[-1])
+
+def _std_latest(cache, window, field='close'):
+    return float(v_std_dev(cache.array(field)[-window:], window)[-1])
+
+def _rsi_latest(cache, window=14, method='sma'):
+    closes = cache.array('close')
+    # The SMA variant only looks at the last window diffs; Wilder's weights decay geometrically,
+    # so anything older than WILDER_TAIL windows is below float precision
+    span = WILDER_TAIL * window if method == 'wilder' else window
+    tail = closes[-(span + 1):]
+    return float(v_rsi(tail, window, method=method)[-1])
+
+def _tail_latest(kernel, span=lambda window: window):
+    """Newest value of a windowed kernel, computed on just the last span(window) values."""
+    def latest(cache, window, field='close'):
+        return float(kernel(cache.array(field)[-span(window):], window)[-1])
+    return latest
+
+# Indicator name -> fn(cache, *params). 'latest' kernels only compute the newest value.
+INDICATORS: Dict[str, Callable] = {
+    'sma': _sma_latest,
+    'std': _std_latest,
+    'rsi': _rsi_latest,
+    'zscore': _tail_latest(v_zscore),
+    'max': _tail_latest(v_rolling_max),
+    'min': _tail_latest(v_rolling_min),
+    'percent_rank': _tail_latest(v_percent_rank),
+    'roc': _tail_latest(v_roc, lambda period: period + 1),
+    'volume_spike': lambda cache, window=20: float(v_volume_spike(cache.array('volume')[-window:], window)[-1]),
+    'sma_series': lambda cache, window, field='close': v_sma(cache.array(field), window),
+    'std_series': lambda cache, window, field='close': v_std_dev(cache.array(field), window),
+    'rsi_series': lambda cache, window=14, method='sma': v_rsi(cache.array('close'), window, method=method),
+    'ema_series': lambda cache, window, field='close': v_ema(cache.array(field), window),
+    'bollinger': lambda cache, window=20, num_std=2.0: v_bollinger(cache.array('close'), window, num_std),
+    'atr_series': lambda cache, window=14: v_atr(cache.array('high'), cache.array('low'), cache.array('close'), window),
+}
+
+class IndicatorCache:
+    """
+    Per-symbol indicator cache shared by every agent of a MetaStrategy.
+    The owner feeds each candle once via update(); agents then query indicators,
+    which are computed on first request and memoized under
+    (indicator, params, last candle timestamp) until the next candle.
+    Candles live in a preallocated OHLCVBuffer, so history is bounded and
+    array() is a copy-free view.
+    """
+    def __init__(self, max_history: int = DEFAULT_MAX_HISTORY):
+        self.candles = OHLCVBuffer(max_history)
+        self.updates = 0
+        self._memo: Dict[tuple, Any] = {}
+        self.hits = 0
+        self.misses = 0
+        self.per_indicator: Dict[str, Dict[str, int]] = {}
+
+    def __len__(self):
+        return len(self.candles)
+
+    def __getstate__(self):
+        # Snapshots keep the candles and counters; memoized values are rebuilt on demand
+        state = self.__dict__.copy()
+        state['_memo'] = {}
+        return state
+
+    @property
+    def last_timestamp(self):
+        """Timestamp of the newest candle (the update count for candles without one)."""
+        if not len(self.candles):
+            return None
+        ts = self.candles.last('timestamp')
+        return ts if not np.isnan(ts) else self.updates
+
+    def update(self, candle: Dict[str, Any]):
+        """Appends a candle; a candle with the same timestamp as the last one replaces it."""
+        ts = candle.get('timestamp')
+        if ts is not None and len(self.candles) and self.candles.last('timestamp') == ts:
+            self.candles.replace_last(candle)
+        else:
+            self.candles.append(candle)
+        self.updates += 1
+        self._memo.clear()
+
+    def extend(self, history: pd.DataFrame):
+        """
+        Bulk-appends a candle history (startup warm-up) in one buffer write.
+        Candles not newer than the last cached one are skipped.
+        """
+        if len(self.candles) and 'timestamp' in history.columns and not np.isnan(self.candles.last('timestamp')):
+            ts = OHLCVBuffer._column(history, 'timestamp')
+            history = history[ts > self.candles.last('timestamp')]
+        if not len(history):
+            return
+        self.candles.extend(history)
+        self.updates += len(history)
+        self._memo.clear()
+
+    def array(self, field: str = 'close') -> np.ndarray:
+        """History of one candle field as a read-only float64 view (valid until the next update)."""
+        return self.candles.view(field)
+
+    def get(self, name: str, *params, compute: Optional[Callable] = None):
+        """
+        Returns indicator `name` with `params` for the current candle.
+        compute: fn(cache, *params) for indicators not in INDICATORS.
+        """
+        key = (name, params, self.last_timestamp)
+        stats = self.per_indicator.setdefault(name, {'hits': 0, 'misses': 0})
+        if key in self._memo:
+            self.hits += 1
+            stats['hits'] += 1
+            return self._memo[key]
+
+        self.misses += 1
+        stats['misses'] += 1
+        fn = compute or INDICATORS[name]
+        value = fn(self, *params)
+        self._memo[key] = value
+        return value
+
+    def latest(self, name: str, *params) -> float:
+        """Newest value of a scalar indicator ('sma', 'std', 'rsi', 'zscore', 'roc', ...)."""
+        return self.get(name, *params)
+
+    def frame(self, lookback: Optional[int] = None) -> pd.DataFrame:
+        """The last `lookback` candles as a DataFrame (a fresh copy, safe to modify)."""
+        return self.candles.to_frame(lookback)
+
+    def features(self, lookback: int = 100, rsi_method: str = 'sma') -> pd.DataFrame:
+        """
+        FeatureEngineer columns over the last `lookback` candles (batch counterpart of ml/feature_stream.py).
+        Returns a copy so callers can scale it in place.
+        """
+        def build(cache, lookback, rsi_method):
+            from ml.feature_engineer import FeatureEngineer
+            df = cache.frame(lookback)
+            if df['timestamp'].isna().all():
+                df = df.drop(columns='timestamp')  # Candles without timestamps
+            else:
+                df['timestamp'] = pd.to_datetime(df['timestamp'], unit='ms')
+            return FeatureEngineer(rsi_method=rsi_method).add_technical_indicators(df)
+        return self.get('features', lookback, rsi_method, compute=build).copy()
+
+    def stats(self) -> Dict[str, Any]:
+        total = self.hits + self.misses
+        return {
+            'hits': self.hits,
+            'misses': self.misses,
+            'hit_rate': round(self.hits / total, 4) if total else 0.0,
+            'candles': len(self.candles),
+            'indicators': {k: dict(v) for k, v in self.per_indicator.items()},
+        }
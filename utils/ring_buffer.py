@@ -0,0 +1,140 @@
+import numpy as np
+import pandas as pd
+from typing import Any, Dict, Iterable, Mapping, Optional, Sequence, Union
+
+"""
+RING BUFFER: Preallocated, bounded NumPy history for streaming agents
+---------------------------------------------------------------------
+Every row is written twice, at i and i + capacity, into a (fields, 2 * capacity)
+array, so the last k rows are always one contiguous slice. view() is O(1) and
+copy-free, append() is O(1), memory is fixed at construction.
+Views share the buffer: they are valid until the next write (copy to keep).
+"""
+
+OHLCV_FIELDS = ('timestamp', 'open', 'high', 'low', 'close', 'volume')
+
+class RingBuffer:
+    """Fixed-capacity float64 history of one or more named fields."""
+    def __init__(self, capacity: int, fields: Sequence[str] = ('value',)):
+        if capacity < 1:
+            raise ValueError(f"RingBuffer capacity must be >= 1, got {capacity}")
+        self.capacity = capacity
+        self.fields = tuple(fields)
+        self._index = {f: i for i, f in enumerate(self.fields)}
+        self._data = np.full((len(self.fields), 2 * capacity), np.nan)
+        self._pos = 0  # Next write slot in [0, capacity)
+        self._count = 0
+
+    def __len__(self):
+        return self._count
+
+    @property
+    def full(self) -> bool:
+        return self._count == self.capacity
+
+    def clear(self):
+        self._data.fill(np.nan)
+        self._pos = 0
+        self._count = 0
+
+    def _write(self, slot: int, row: np.ndarray):
+        self._data[:, slot] = row
+        self._data[:, slot + self.capacity] = row
+
+    def append_row(self, row: Sequence[float]):
+        """Appends one row (one value per field, in field order)."""
+        self._write(self._pos, np.asarray(row, dtype=float))
+        self._pos = (self._pos + 1) % self.capacity
+        self._count = min(self._count + 1, self.capacity)
+
+    def replace_last_row(self, row: Sequence[float]):
+        """Overwrites the newest row (e.g. an updated, still-open candle)."""
+        if not self._count:
+            return self.append_row(row)
+        self._write((self._pos - 1) % self.capacity, np.asarray(row, dtype=float))
+
+    def extend_rows(self, rows: np.ndarray):
+        """
+        Appends many rows at once: rows has shape (n, fields). Vectorized;
+        only the last `capacity` rows are kept.
+        """
+        rows = np.asarray(rows, dtype=float).reshape(-1, len(self.fields))[-self.capacity:]
+        n = len(rows)
+        if not n:
+            return
+        slots = (self._pos + np.arange(n)) % self.capacity
+        self._data[:, slots] = rows.T
+        self._data[:, slots + self.capacity] = rows.T
+        self._pos = (self._pos + n) % self.capacity
+        self._count = min(self._count + n, self.capacity)
+
+    def view(self, field: Optional[str] = None, n: Optional[int] = None) -> np.ndarray:
+        """
+        The last `n` values (default: all) of `field` (default: the first field),
+        oldest first, as a read-only contiguous view.
+        """
+        n = self._count if n is None else min(n, self._count)
+        end = self._pos + self.capacity
+        out = self._data[self._index[field or self.fields[0]], end - n:end]
+        out.flags.writeable = False
+        return out
+
+    def last(self, field: Optional[str] = None) -> float:
+        """Newest value of `field` (NaN when empty)."""
+        if not self._count:
+            return np.nan
+        return float(self._data[self._index[field or self.fields[0]], (self._pos - 1) % self.capacity])
+
+    def to_frame(self, n: Optional[int] = None) -> pd.DataFrame:
+        """The last `n` rows as a DataFrame (a copy)."""
+        return pd.DataFrame({f: self.view(f, n).copy() for f in self.fields})
+
+class OHLCVBuffer(RingBuffer):
+    """
+    Ring buffer of candles (timestamp, open, high, low, close, volume).
+    Missing candle fields are stored as NaN, datetime timestamps as epoch ms.
+    """
+    def __init__(self, capacity: int, fields: Sequence[str] = OHLCV_FIELDS):
+        super().__init__(capacity, fields)
+
+    @staticmethod
+    def _value(value: Any) -> float:
+        if value is None:
+            return np.nan
+        try:
+            return float(value)
+        except TypeError:
+            return float(pd.Timestamp(value).value // 1_000_000)  # Epoch ms, as in live candles
+
+    def _row(self, candle: Mapping[str, Any]) -> np.ndarray:
+        return np.array([self._value(candle.get(f)) for f in self.fields], dtype=float)
+
+    def append(self, candle: Mapping[str, Any]):
+        self.append_row(self._row(candle))
+
+    def replace_last(self, candle: Mapping[str, Any]):
+        self.replace_last_row(self._row(candle))
+
+    @staticmethod
+    def _column(df: pd.DataFrame, field: str) -> np.ndarray:
+        if field not in df.columns:
+            return np.full(len(df), np.nan)
+        col = df[field]
+        if pd.api.types.is_datetime64_any_dtype(col):
+            return col.astype('datetime64[ms]').astype('int64').to_numpy(dtype=float)  # Epoch ms, as in live candles
+        return col.to_numpy(dtype=float)
+
+    def extend(self, candles: Union[pd.DataFrame, Iterable[Mapping[str, Any]]]):
+        """Bulk-appends candles from a DataFrame (columns by field name) or an iterable of dicts."""
+        if isinstance(candles, pd.DataFrame):
+            if not len(candles):
+                return
+            rows = np.column_stack([self._column(candles, f) for f in self.fields])
+        else:
+            rows = np.array([self._row(c) for c in candles], dtype=float)
+        self.extend_rows(rows)
+
+    def last_candle(self) -> Optional[Dict[str, float]]:
+        if not len(self):
+            return None
+        return {f: self.last(f) for f in self.fields}
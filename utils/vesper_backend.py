@@ -0,0 +1,110 @@
+import os
+import time
+import numpy as np
+from scipy.signal import lfilter
+from utils.logger import setup_logger
+
+"""
+VESPER BACKEND: Pluggable implementations of the recursive Vesper kernels
+-------------------------------------------------------------------------
+The recursive filters behind v_ema, Wilder smoothing (ATR, ADX) and Wilder RSI
+run on one of two backends:
+    numpy - scipy.signal.lfilter (always available)
+    numba - JIT-compiled loops (used when Numba is installed)
+Select with the VESPER_BACKEND environment variable ('auto' | 'numpy' | 'numba')
+or set_backend(). Call warmup() at startup so the first candle never pays the
+compile cost; compiled code is cached on disk (cache=True).
+"""
+
+logger = setup_logger("VesperBackend")
+
+try:
+    import numba
+    HAS_NUMBA = True
+except ImportError:
+    HAS_NUMBA = False
+
+# --- NUMPY (lfilter) ---
+
+def _np_ewm_sum(x: np.ndarray, decay: float) -> np.ndarray:
+    """y[t] = x[t] + decay * y[t-1]"""
+    return lfilter([1.0], [1.0, -decay], x)
+
+def _np_ema(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """y[t] = alpha * x[t] + (1 - alpha) * y[t-1], with y[-1] = seed"""
+    y, _ = lfilter([alpha], [1.0, alpha - 1.0], x, zi=[(1.0 - alpha) * seed])
+    return y
+
+# --- NUMBA (compiled loops, same recurrences) ---
+
+if HAS_NUMBA:
+    @numba.njit(cache=True, fastmath=False)
+    def _nb_ewm_sum(x, decay):
+        y = np.empty(x.shape[0])
+        acc = 0.0
+        for i in range(x.shape[0]):
+            acc = x[i] + decay * acc
+            y[i] = acc
+        return y
+
+    @numba.njit(cache=True, fastmath=False)
+    def _nb_ema(x, alpha, seed):
+        y = np.empty(x.shape[0])
+        prev = seed
+        for i in range(x.shape[0]):
+            prev = alpha * x[i] + (1.0 - alpha) * prev
+            y[i] = prev
+        return y
+
+_KERNELS = {'numpy': {'ewm_sum': _np_ewm_sum, 'ema': _np_ema}}
+if HAS_NUMBA:
+    _KERNELS['numba'] = {'ewm_sum': _nb_ewm_sum, 'ema': _nb_ema}
+
+_active = 'numpy'
+
+def available_backends():
+    return list(_KERNELS)
+
+def get_backend() -> str:
+    return _active
+
+def set_backend(name: str = 'auto') -> str:
+    """
+    Selects the backend ('auto' picks numba when installed). Requesting numba without
+    Numba installed falls back to numpy with a warning. Returns the active backend.
+    """
+    global _active
+    name = (name or 'auto').lower()
+    if name not in ('auto', 'numpy', 'numba'):
+        raise ValueError(f"Unknown Vesper backend: {name}")
+    if name == 'auto':
+        name = 'numba' if HAS_NUMBA else 'numpy'
+    elif name == 'numba' and not HAS_NUMBA:
+        logger.warning("VESPER_BACKEND=numba but Numba is not installed. Falling back to numpy.")
+        name = 'numpy'
+    _active = name
+    return _active
+
+def ewm_sum(x: np.ndarray, decay: float) -> np.ndarray:
+    """Unnormalized exponential sum y[t] = x[t] + decay * y[t-1] (NaN propagates forward)."""
+    return _KERNELS[_active]['ewm_sum'](np.ascontiguousarray(x, dtype=np.float64), float(decay))
+
+def ema_filter(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """EMA recursion continuing from `seed`."""
+    return _KERNELS[_active]['ema'](np.ascontiguousarray(x, dtype=np.float64), float(alpha), float(seed))
+
+def warmup() -> float:
+    """
+    Compiles (or loads from cache) every kernel of the active backend on a tiny input.
+    Returns the seconds spent. A no-op for the numpy backend.
+    """
+    start = time.perf_counter()
+    if _active == 'numba':
+        x = np.linspace(1.0, 2.0, 16)
+        ewm_sum(x, 0.9)
+        ema_filter(x, 0.2, 1.0)
+    elapsed = time.perf_counter() - start
+    logger.info(f"Vesper backend: {_active} (warmup {elapsed:.3f}s)")
+    return elapsed
+
+set_backend(os.getenv('VESPER_BACKEND', 'auto'))
@@ -0,0 +1,248 @@
+import numpy as np
+from scipy.signal import lfilter
+from typing import Dict, Optional, Sequence, Tuple
+from utils.vesper_math import RSI_METHODS, STD_BLOCK_MIN, v_ema
+
+"""
+VESPER BATCH: 2D (n_symbols, n_bars) counterparts of the Vesper Core kernels
+----------------------------------------------------------------------------
+One call computes an indicator for the whole watchlist.
+Layout: rows are symbols, columns are bars, right-aligned so the last column is
+the latest candle for every symbol. Shorter series are NaN padded on the left
+(see stack_series). Each row matches the 1D kernel in utils/vesper_math.py
+applied to that symbol's own series.
+"""
+
+def stack_series(series: Sequence[np.ndarray], length: Optional[int] = None) -> np.ndarray:
+    """
+    Stacks 1D series of different lengths into a right-aligned, NaN-padded matrix.
+    length: Keep only the last `length` bars (default: longest series).
+    """
+    length = length or max((len(s) for s in series), default=0)
+    out = np.full((len(series), length), np.nan)
+    for i, s in enumerate(series):
+        s = np.asarray(s, dtype=float)[-length:] if length else np.empty(0)
+        if len(s):
+            out[i, length - len(s):] = s
+    return out
+
+def _leading_nans(x: np.ndarray) -> np.ndarray:
+    """Number of leading NaNs per row (n_bars for all-NaN rows)."""
+    valid = ~np.isnan(x)
+    return np.where(valid.any(axis=1), valid.argmax(axis=1), x.shape[1])
+
+def _shift_rows(x: np.ndarray, shift: np.ndarray) -> np.ndarray:
+    """Moves row i left by shift[i] columns (right if negative), filling with NaN."""
+    rows, n = x.shape
+    idx = np.arange(n)[None, :] + shift[:, None]
+    inside = (idx >= 0) & (idx < n)
+    return np.where(inside, x[np.arange(rows)[:, None], np.clip(idx, 0, n - 1)], np.nan)
+
+def _left_align(x: np.ndarray) -> Tuple[np.ndarray, np.ndarray]:
+    """Removes the left padding (padding moves to the right). Returns (aligned, pad)."""
+    pad = _leading_nans(x)
+    return _shift_rows(x, pad), pad
+
+def _right_align(y: np.ndarray, pad: np.ndarray) -> np.ndarray:
+    return _shift_rows(y, -pad)
+
+def _as_matrix(data) -> np.ndarray:
+    x = np.asarray(data, dtype=float)
+    return x[None, :] if x.ndim == 1 else x
+
+def _rolling_moments(x: np.ndarray, window: int) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    Rolling mean and population variance along the bars axis, O(n) for any window.
+    Same blocked, shifted cumulative sums as v_std_dev, with a per-row shift.
+    Windows containing a NaN (including padding) are NaN.
+    """
+    rows, n = x.shape
+    mean = np.full((rows, n), np.nan)
+    var = np.full((rows, n), np.nan)
+    if n < window:
+        return mean, var
+
+    nan_mask = np.isnan(x)
+    clean = np.where(nan_mask, 0.0, x)
+    nan_count = np.concatenate((np.zeros((rows, 1)), np.cumsum(nan_mask, axis=1)), axis=1)
+
+    block = max(4 * window, STD_BLOCK_MIN)
+    for start in range(window - 1, n, block):
+        end = min(start + block, n)
+        lo = start - window + 1
+        seg = clean[:, lo:end]
+        valid = ~nan_mask[:, lo:end]
+        counts = valid.sum(axis=1, keepdims=True)
+        shift = np.divide(np.where(valid, seg, 0.0).sum(axis=1, keepdims=True), counts,
+                          out=np.zeros((rows, 1)), where=counts > 0)
+        d = np.where(valid, seg - shift, 0.0)
+
+        zero = np.zeros((rows, 1))
+        s1 = np.concatenate((zero, np.cumsum(d, axis=1)), axis=1)
+        s2 = np.concatenate((zero, np.cumsum(d * d, axis=1)), axis=1)
+        m = (s1[:, window:] - s1[:, :-window]) / window
+        mean[:, start:end] = shift + m
+        var[:, start:end] = np.maximum((s2[:, window:] - s2[:, :-window]) / window - m * m, 0)
+
+    has_nan = (nan_count[:, window:] - nan_count[:, :-window]) > 0
+    mean[:, window - 1:][has_nan] = np.nan
+    var[:, window - 1:][has_nan] = np.nan
+    return mean, var
+
+def _rma(x: np.ndarray, window: int) -> np.ndarray:
+    """
+    Row-wise Wilder moving average (see vesper_math._rma); leading NaNs skipped per row.
+    Interior NaNs add nothing to either filtered sum (the value is held over them) and
+    min_periods counts each row's actual observations, as in the 1D kernel.
+    """
+    aligned, pad = _left_align(x)
+    valid = ~np.isnan(aligned)
+    decay = 1.0 - 1.0 / window
+    num = lfilter([1.0], [1.0, -decay], np.where(valid, aligned, 0.0), axis=-1)
+    den = lfilter([1.0], [1.0, -decay], valid.astype(float), axis=-1)
+    last = np.maximum.accumulate(np.where(den > 0, np.arange(den.shape[1]), 0), axis=1)  # window=1: hold over NaNs
+    num, den = np.take_along_axis(num, last, axis=1), np.take_along_axis(den, last, axis=1)
+    out = np.divide(num, den, out=np.full(num.shape, np.nan), where=den > 0)
+    out[np.cumsum(valid, axis=1) < window] = np.nan
+    return _right_align(out, pad)
+
+def b_sma(data: np.ndarray, window: int) -> np.ndarray:
+    """Batched Simple Moving Average."""
+    return _rolling_moments(_as_matrix(data), window)[0]
+
+def b_std_dev(data: np.ndarray, window: int) -> np.ndarray:
+    """Batched Rolling Standard Deviation (population)."""
+    return np.sqrt(_rolling_moments(_as_matrix(data), window)[1])
+
+def b_bollinger(data: np.ndarray, window: int, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched Bollinger Bands.
+    Returns: (Upper, Middle, Lower)
+    """
+    mid, var = _rolling_moments(_as_matrix(data), window)
+    std = np.sqrt(var)
+    return mid + std * num_std, mid, mid - std * num_std
+
+def b_rsi(data: np.ndarray, window: int = 14, method: str = 'sma') -> np.ndarray:
+    """Batched RSI; method as in v_rsi ('sma' or 'wilder')."""
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method: {method}")
+    aligned, pad = _left_align(_as_matrix(data))
+    rows, n = aligned.shape
+    rsi = np.full((rows, n), np.nan)
+    delta = np.diff(aligned, axis=1)
+
+    if method == 'wilder':
+        if n > window:
+            valid = ~np.isnan(delta)
+            delta = np.where(valid, delta, 0.0)  # NaN closes are skipped, as v_rsi
+            decay = 1.0 - 1.0 / window
+            gain_sum = lfilter([1.0], [1.0, -decay], np.maximum(delta, 0), axis=-1)
+            loss_sum = lfilter([1.0], [1.0, -decay], -np.minimum(delta, 0), axis=-1)
+            total = gain_sum + loss_sum
+            out = np.divide(100 * gain_sum, total, out=np.zeros_like(total), where=total != 0)
+            out[np.cumsum(valid, axis=1) < window] = np.nan
+            rsi[:, 1:] = out
+        return _right_align(rsi, pad)
+
+    # v_rsi pads the first diff with 0
+    delta = np.concatenate((np.zeros((rows, 1)), delta), axis=1)
+    delta[np.isnan(aligned)] = np.nan
+    avg_gain = _rolling_moments(np.maximum(delta, 0), window)[0]
+    avg_loss = _rolling_moments(-np.minimum(delta, 0), window)[0]
+    with np.errstate(divide='ignore', invalid='ignore'):
+        rsi = 100 - 100 / (1 + avg_gain / avg_loss)
+    rsi[avg_loss == 0] = 100
+    rsi[avg_gain == 0] = 0
+    return _right_align(rsi, pad)
+
+def b_ema(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Batched EMA, SMA-seeded per row (see v_ema): the seed is the mean of the window's
+    non-NaN values. Rows with NaNs after their seed window fall back to v_ema, which
+    holds the value over each gap; the others are one filter call.
+    """
+    x = _as_matrix(data)
+    aligned, pad = _left_align(x)
+    rows, n = aligned.shape
+    out = np.full((rows, n), np.nan)
+    if n < window:
+        return out
+
+    alpha = 2.0 / (window + 1)
+    head = aligned[:, :window]
+    counts = (~np.isnan(head)).sum(axis=1)
+    seed = np.divide(np.nansum(head, axis=1), counts, out=np.full(rows, np.nan), where=counts > 0)
+    out[:, window - 1] = seed
+    if n > window:
+        out[:, window:], _ = lfilter([alpha], [1.0, alpha - 1.0], aligned[:, window:], axis=-1,
+                                     zi=((1.0 - alpha) * seed)[:, None])
+    out = _right_align(out, pad)
+    # Interior gaps: any NaN after the seed window other than the left padding
+    gaps = (np.isnan(x) & (np.arange(n)[None, :] >= (pad + window)[:, None])).any(axis=1)
+    for i in np.flatnonzero(gaps):
+        out[i] = v_ema(x[i], window)
+    return out
+
+def b_macd(data: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched MACD.
+    Returns: (MACD, Histogram, Signal)
+    """
+    x = _as_matrix(data)
+    macd = b_ema(x, fast) - b_ema(x, slow)
+    signal_line = b_ema(macd, signal)
+    return macd, macd - signal_line, signal_line
+
+def _prev(x: np.ndarray) -> np.ndarray:
+    return np.concatenate((np.full((x.shape[0], 1), np.nan), x[:, :-1]), axis=1)
+
+def b_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """Batched True Range; NaN at each row's first bar."""
+    high, low, close = _as_matrix(high), _as_matrix(low), _as_matrix(close)
+    prev_close = _prev(close)
+    return np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+
+def b_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """Batched Average True Range (Wilder smoothing)."""
+    return _rma(b_true_range(high, low, close), window)
+
+def b_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Batched ADX.
+    Returns: (ADX, +DI, -DI)
+    """
+    high, low = _as_matrix(high), _as_matrix(low)
+    atr = b_atr(high, low, close, window)
+
+    up = high - _prev(high)
+    down = _prev(low) - low
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    undefined = np.isnan(up) | np.isnan(down)
+    plus_dm[undefined] = np.nan
+    minus_dm[undefined] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * _rma(plus_dm, window) / atr
+        minus_di = 100 * _rma(minus_dm, window) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return _rma(dx, window), plus_di, minus_di
+
+def b_technical_features(high: np.ndarray, low: np.ndarray, close: np.ndarray, rsi_method: str = 'sma') -> Dict[str, np.ndarray]:
+    """
+    FeatureEngineer's indicator columns for every symbol at once:
+    {column name: (n_symbols, n_bars) matrix}.
+    """
+    close = _as_matrix(close)
+    upper, mid, lower = b_bollinger(close, 20, 2.0)
+    macd, hist, signal = b_macd(close, 12, 26, 9)
+    adx, dmp, dmn = b_adx(high, low, close, 14)
+    return {
+        'RSI': b_rsi(close, 14, method=rsi_method),
+        'EMA_50': b_ema(close, 50),
+        'BBM_20_2.0': mid, 'BBU_20_2.0': upper, 'BBL_20_2.0': lower,
+        'MACD_12_26_9': macd, 'MACDh_12_26_9': hist, 'MACDs_12_26_9': signal,
+        'ATR': b_atr(high, low, close, 14),
+        'ADX_14': adx, 'DMP_14': dmp, 'DMN_14': dmn,
+    }
@@ -1,4 +1,5 @@
 import numpy as np
+from utils.vesper_backend import ewm_sum, ema_filter # Recursive filters (NumPy or Numba)
 from typing import Tuple, Union
 
 """
@@ -23,22 +24,46 @@ def v_sma(data: np.ndarray, window: int) -> np.ndarray:
     padding = np.full(window - 1, np.nan)
     return np.concatenate((padding, sma))
 
+STD_BLOCK_MIN = 2048  # Minimum rows per shifted block in v_std_dev
+
 def v_std_dev(data: np.ndarray, window: int) -> np.ndarray:
     """
-    Vectorized Rolling Standard Deviation.
+    Vectorized Rolling Standard Deviation (population, ddof=0).
+    O(n) for any window: windowed sums come from cumulative sums, computed block by
+    block on data shifted by the block mean. Shifting keeps E[X^2] - E[X]^2 from
+    cancelling catastrophically at large price levels (e.g. BTC ~87k), and blocking
+    stops the cumulative sums (and their rounding error) from growing with n.
+    Windows containing a NaN are NaN.
     """
-    if len(data) < window:
-        return np.full_like(data, np.nan)
-        
-    # E[X^2] - (E[X])^2
-    avg_sq = v_sma(data ** 2, window)
-    sq_avg = v_sma(data, window) ** 2
-    
-    variance = avg_sq - sq_avg
-    # Clip negative variance due to floating point precision
-    variance = np.maximum(variance, 0)
-    
-    return np.sqrt(variance)
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+
+    nan_mask = np.isnan(data)
+    clean = np.where(nan_mask, 0.0, data)
+    nan_count = np.concatenate(([0], np.cumsum(nan_mask)))
+
+    block = max(4 * window, STD_BLOCK_MIN)
+    for start in range(window - 1, n, block):
+        end = min(start + block, n)
+        lo = start - window + 1  # First input row of the first window ending in this block
+        seg = clean[lo:end]
+        valid = ~nan_mask[lo:end]
+        shift = seg[valid].mean() if valid.any() else 0.0
+        d = np.where(valid, seg - shift, 0.0)
+
+        s1 = np.concatenate(([0.0], np.cumsum(d)))
+        s2 = np.concatenate(([0.0], np.cumsum(d * d)))
+        mean = (s1[window:] - s1[:-window]) / window
+        variance = (s2[window:] - s2[:-window]) / window - mean * mean
+        # Clip negative variance due to floating point precision
+        out[start:end] = np.sqrt(np.maximum(variance, 0))
+
+    has_nan = (nan_count[window:] - nan_count[:-window]) > 0
+    out[window - 1:][has_nan] = np.nan
+    return out
 
 def v_bollinger(data: np.ndarray, window: int, num_std: float = 2.0) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
     """
@@ -53,10 +78,39 @@ def v_bollinger(data: np.ndarray, window: int, num_std: float = 2.0) -> Tuple[np
     
     return upper, mid, lower
 
-def v_rsi(data: np.ndarray, window: int = 14) -> np.ndarray:
+RSI_METHODS = ('sma', 'wilder')
+
+def v_rsi(data: np.ndarray, window: int = 14, method: str = 'sma') -> np.ndarray:
     """
     Vectorized Relative Strength Index (RSI).
+    method='sma':    SMA of gains/losses (the original Vesper v1 approximation; the
+                     RSI feature of existing models).
+    method='wilder': Exact Wilder smoothing, as in pandas_ta: ewm(alpha=1/window, adjust=True)
+                     of gains and losses, valid from index `window`. NaN closes are skipped
+                     like pandas does (ignore_na=False): the value is held over them.
     """
+    if method not in RSI_METHODS:
+        raise ValueError(f"Unknown RSI method: {method}")
+    data = np.asarray(data, dtype=float)
+
+    if method == 'wilder':
+        rsi = np.full(len(data), np.nan)
+        if len(data) <= window:
+            return rsi
+        delta = np.diff(data)
+        valid = ~np.isnan(delta)
+        delta = np.where(valid, delta, 0.0)
+        decay = 1.0 - 1.0 / window
+        # Gains and losses share the ewm denominator, so it cancels in the ratio:
+        # RSI = 100 * G / (G + L) with G, L the filtered (unnormalized) sums
+        gain_sum = ewm_sum(np.maximum(delta, 0), decay)
+        loss_sum = ewm_sum(-np.minimum(delta, 0), decay)
+        total = gain_sum + loss_sum
+        out = np.divide(100 * gain_sum, total, out=np.zeros_like(total), where=total != 0)
+        out[np.cumsum(valid) < window] = np.nan  # min_periods counts actual observations
+        rsi[1:] = out
+        return rsi
+
     delta = np.diff(data)
     # Pad delta to match data length (diff reduces length by 1)
     delta = np.concatenate(([0], delta))
@@ -64,11 +118,7 @@ def v_rsi(data: np.ndarray, window: int = 14) -> np.ndarray:
     gains = np.maximum(delta, 0)
     losses = -np.minimum(delta, 0)
     
-    # Calculate initial averages
-    # Note: RSI typically uses Wilder's Smoothing, but SMA is often used for approximation in HFT
-    # For strict compliance we can implement Wilder's loop later or use EMA approximation
-    # Here we use standard SMA for pure vectorization speed
-    
+    # Standard SMA for pure vectorization speed
     avg_gain = v_sma(gains, window)
     avg_loss = v_sma(losses, window)
     
@@ -109,3 +159,211 @@ def v_keltner(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int
     lower = mid_line - (atr * atr_mult)
     
     return upper, mid_line, lower
+
+def _first_valid(data: np.ndarray) -> int:
+    """Index of the first non-NaN value (len(data) if none)."""
+    valid = np.flatnonzero(~np.isnan(data))
+    return int(valid[0]) if valid.size else len(data)
+
+def _rma(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Wilder's moving average as an IIR filter: ewm(alpha=1/window, adjust=True, min_periods=window).
+    The adjusted mean is a filtered numerator over a filtered denominator of ones.
+    NaNs are skipped as pandas does (ignore_na=False): they add nothing to either sum,
+    so the value is held over them and later weights still decay by position.
+    """
+    data = np.asarray(data, dtype=float)
+    out = np.full(len(data), np.nan)
+    start = _first_valid(data)
+    if len(data) - start < window:
+        return out
+
+    decay = 1.0 - 1.0 / window
+    x = data[start:]
+    valid = ~np.isnan(x)
+    num = ewm_sum(np.where(valid, x, 0.0), decay)
+    den = ewm_sum(valid.astype(float), decay)
+    # window=1 has no decay: a NaN empties both sums, so hold the last value (as pandas does)
+    last = np.maximum.accumulate(np.where(den > 0, np.arange(len(x)), 0))
+    smoothed = num[last] / den[last]
+    smoothed[np.cumsum(valid) < window] = np.nan  # min_periods counts actual observations
+    out[start:] = smoothed
+    return out
+
+def _ema_over_gaps(x: np.ndarray, alpha: float, seed: float) -> np.ndarray:
+    """
+    ema_filter() for input with NaNs, as pandas ewm(adjust=False, ignore_na=False): the
+    value is held over a NaN run of length k, and the next observation is weighted
+    against the held value decayed by (1 - alpha)^(k + 1). Each valid run is one filter call.
+    """
+    out = np.empty(len(x))
+    valid = ~np.isnan(x)
+    prev, i, n = seed, 0, len(x)
+    while i < n:
+        if not valid[i]:
+            j = i + int(np.argmax(valid[i:])) if valid[i:].any() else n
+            out[i:j] = prev
+            if j < n:
+                old_wt = (1.0 - alpha) ** (j - i + 1)
+                prev = (old_wt * prev + alpha * x[j]) / (old_wt + alpha)
+                out[j] = prev
+                j += 1
+            i = j
+            continue
+        j = i + int(np.argmax(~valid[i:])) if (~valid[i:]).any() else n
+        out[i:j] = ema_filter(x[i:j], alpha, prev)
+        prev = out[j - 1]
+        i = j
+    return out
+
+def v_ema(data: np.ndarray, window: int) -> np.ndarray:
+    """
+    Vectorized Exponential Moving Average (alpha = 2 / (window + 1)).
+    Seeded with the SMA of the first `window` values, then a first-order IIR filter
+    (pandas_ta convention). Leading NaNs are skipped; later NaNs are skipped as pandas
+    ewm(adjust=False) does, holding the value over them.
+    """
+    data = np.asarray(data, dtype=float)
+    out = np.full(len(data), np.nan)
+    start = _first_valid(data)
+    if len(data) - start < window:
+        return out
+
+    alpha = 2.0 / (window + 1)
+    seed = np.nanmean(data[start:start + window])  # pandas mean() skips NaN
+    out[start + window - 1] = seed
+    rest = data[start + window:]
+    if len(rest):
+        out[start + window:] = _ema_over_gaps(rest, alpha, seed) if np.isnan(rest).any() else ema_filter(rest, alpha, seed)
+    return out
+
+def v_macd(data: np.ndarray, fast: int = 12, slow: int = 26, signal: int = 9) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized MACD.
+    Returns: (MACD, Histogram, Signal) - the pandas_ta column order.
+    """
+    macd = v_ema(data, fast) - v_ema(data, slow)
+    signal_line = v_ema(macd, signal)
+    return macd, macd - signal_line, signal_line
+
+def v_true_range(high: np.ndarray, low: np.ndarray, close: np.ndarray) -> np.ndarray:
+    """
+    Vectorized True Range. The first value is NaN (no previous close).
+    """
+    high, low, close = (np.asarray(a, dtype=float) for a in (high, low, close))
+    prev_close = np.concatenate(([np.nan], close[:-1]))
+    tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+    tr[0] = np.nan
+    return tr
+
+def v_atr(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> np.ndarray:
+    """
+    Vectorized Average True Range (Wilder smoothing).
+    """
+    return _rma(v_true_range(high, low, close), window)
+
+def v_adx(high: np.ndarray, low: np.ndarray, close: np.ndarray, window: int = 14) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    Vectorized Average Directional Index with the directional indicators.
+    Returns: (ADX, +DI, -DI) - the pandas_ta column order (ADX, DMP, DMN).
+    """
+    high, low = np.asarray(high, dtype=float), np.asarray(low, dtype=float)
+    atr = v_atr(high, low, close, window)
+
+    up = np.concatenate(([np.nan], np.diff(high)))
+    down = np.concatenate(([np.nan], -np.diff(low)))
+    plus_dm = np.where((up > down) & (up > 0), up, 0.0)
+    minus_dm = np.where((down > up) & (down > 0), down, 0.0)
+    # Undefined moves (first bar, NaN highs/lows) stay NaN so the DM smoothing starts with the ATR's
+    undefined = np.isnan(up) | np.isnan(down)
+    plus_dm[undefined] = minus_dm[undefined] = np.nan
+
+    with np.errstate(divide='ignore', invalid='ignore'):
+        plus_di = 100 * _rma(plus_dm, window) / atr
+        minus_di = 100 * _rma(minus_dm, window) / atr
+        dx = 100 * np.abs(plus_di - minus_di) / (plus_di + minus_di)
+    return _rma(dx, window), plus_di, minus_di
+
+# --- ROLLING STATISTICS (anomaly detection) ---
+
+def v_zscore(data: np.ndarray, window: int = 20) -> np.ndarray:
+    """
+    Vectorized rolling z-score: (x - SMA) / population std over `window`.
+    0 where the window is flat (std == 0).
+    """
+    data = np.asarray(data, dtype=float)
+    mean = v_sma(data, window)
+    std = v_std_dev(data, window)
+    return np.divide(data - mean, std, out=np.where(np.isnan(std), np.nan, 0.0), where=std > 0)
+
+def _rolling_extreme(data: np.ndarray, window: int, op: np.ufunc) -> np.ndarray:
+    """
+    Rolling max/min in O(n) for any window (van Herk / Gil-Werman): split the series into
+    blocks of `window`, take running extremes forward and backward within each block; every
+    window spans at most two blocks, so its extreme is op(backward[i], forward[i + window - 1]).
+    Windows containing a NaN are NaN.
+    """
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    fill = -np.inf if op is np.maximum else np.inf
+    x = np.concatenate((data, np.full(-n % window, fill))).reshape(-1, window)
+    forward = op.accumulate(x, axis=1).ravel()
+    backward = op.accumulate(x[:, ::-1], axis=1)[:, ::-1].ravel()
+    out[window - 1:] = op(backward[:n - window + 1], forward[window - 1:n])
+    return out
+
+def v_rolling_max(data: np.ndarray, window: int) -> np.ndarray:
+    """Vectorized rolling maximum, O(n)."""
+    return _rolling_extreme(data, window, np.maximum)
+
+def v_rolling_min(data: np.ndarray, window: int) -> np.ndarray:
+    """Vectorized rolling minimum, O(n)."""
+    return _rolling_extreme(data, window, np.minimum)
+
+PERCENT_RANK_CHUNK = 65536  # Windows compared per chunk in v_percent_rank (bounds memory)
+
+def v_percent_rank(data: np.ndarray, window: int = 100) -> np.ndarray:
+    """
+    Rolling percentile rank of the latest value within its window, in (0, 1]:
+    average rank / window, as pandas rolling(window).rank(pct=True).
+    """
+    data = np.asarray(data, dtype=float)
+    n = len(data)
+    out = np.full(n, np.nan)
+    if n < window:
+        return out
+    windows = np.lib.stride_tricks.sliding_window_view(data, window)
+    for start in range(0, len(windows), PERCENT_RANK_CHUNK):
+        win = windows[start:start + PERCENT_RANK_CHUNK]
+        last = win[:, -1:]
+        less = (win < last).sum(axis=1)
+        equal = (win == last).sum(axis=1)
+        rank = (less + (equal + 1) / 2) / window
+        rank[np.isnan(win).any(axis=1)] = np.nan
+        out[window - 1 + start:window - 1 + start + len(win)] = rank
+    return out
+
+def v_roc(data: np.ndarray, period: int = 5) -> np.ndarray:
+    """
+    Vectorized rate of change over `period` bars, as a fraction: (x[t] - x[t-period]) / x[t-period].
+    (pandas_ta ROC / 100.)
+    """
+    data = np.asarray(data, dtype=float)
+    out = np.full(len(data), np.nan)
+    if len(data) <= period:
+        return out
+    prev = data[:-period]
+    out[period:] = np.divide(data[period:] - prev, prev, out=np.full(len(prev), np.nan), where=prev != 0)
+    return out
+
+def v_volume_spike(volume: np.ndarray, window: int = 20) -> np.ndarray:
+    """
+    Vectorized volume spike ratio: volume / SMA(volume, window), the current bar included.
+    0 where the average volume is 0.
+    """
+    volume = np.asarray(volume, dtype=float)
+    avg = v_sma(volume, window)
+    return np.divide(volume, avg, out=np.where(np.isnan(avg), np.nan, 0.0), where=avg > 0)
@@ -0,0 +1,631 @@
+import math
+import bisect
+import numpy as np
+from collections import deque
+from typing import Iterable, Tuple
+
+"""
+VESPER STREAM: Incremental (O(1) per update) counterparts of the Vesper Core kernels
+------------------------------------------------------------------------------------
+Every indicator shares the same interface:
+    ind.update(x) -> current value (NaN until warmed up)
+    ind.value     -> last value
+    ind.ready     -> True once the value is defined
+    ind.prime(xs) -> bulk warm-up: the state update() over xs would leave, without
+                     the intermediate values (vectorized where the math allows)
+Agents feed one value per candle instead of recomputing over their whole history.
+Outputs match the batch kernels in utils/vesper_math.py (see tests/test_vesper_stream.py).
+"""
+
+RESYNC_INTERVAL = 1024  # Updates between exact recomputes of running sums (bounds float drift)
+
+class StreamingIndicator:
+    """Base class for streaming indicators."""
+    def __init__(self):
+        self._value = np.nan
+
+    @property
+    def value(self):
+        return self._value
+
+    @property
+    def ready(self) -> bool:
+        return not np.isnan(self._value)
+
+    def update(self, x):
+        raise NotImplementedError
+
+    def update_many(self, values: Iterable) -> np.ndarray:
+        """Feeds a sequence and returns the value after each update (for priming/tests)."""
+        return np.array([self.update(x) for x in values], dtype=float)
+
+    def prime(self, values: Iterable):
+        """
+        Brings the state to where update() over `values` would leave it, without producing
+        the intermediate values (startup warm-up). The default feeds them one by one;
+        indicators whose state has a closed form override it.
+        """
+        for x in values:
+            self.update(x)
+
+def _finite(values: Iterable) -> list:
+    """The non-NaN values."""
+    return [v for v in values if not math.isnan(v)]
+
+class StreamingSMA(StreamingIndicator):
+    """
+    Rolling mean over `window` values via a running sum. Matches v_sma.
+    NaNs are counted, never summed: the mean is NaN while one is inside the window.
+    """
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self._buf = deque(maxlen=window)
+        self._sum = 0.0
+        self._nans = 0
+        self._count = 0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if len(self._buf) == self.window:
+            old = self._buf[0]
+            if math.isnan(old):
+                self._nans -= 1
+            else:
+                self._sum -= old
+        self._buf.append(x)
+        if math.isnan(x):
+            self._nans += 1
+        else:
+            self._sum += x
+        self._count += 1
+        if self._count % RESYNC_INTERVAL == 0:
+            self._sum = math.fsum(_finite(self._buf))
+        self._set_value()
+        return self._value
+
+    def prime(self, values: Iterable):
+        """Only the last `window` values matter: keep them and sum them exactly."""
+        arr = np.asarray(values, dtype=float).ravel()
+        self._buf.extend(arr[-self.window:].tolist())
+        finite = _finite(self._buf)
+        self._sum = math.fsum(finite)
+        self._nans = len(self._buf) - len(finite)
+        self._count += len(arr)
+        self._set_value()
+
+    def _set_value(self):
+        full = len(self._buf) == self.window and not self._nans
+        self._value = self._sum / self.window if full else np.nan
+
+class StreamingStdDev(StreamingIndicator):
+    """
+    Rolling population standard deviation (ddof=0). Matches v_std_dev.
+    Sliding-window Welford update: keeps the mean and the sum of squared deviations
+    rather than E[X^2] - E[X]^2, so it stays precise at large price levels.
+    As v_std_dev, the value is NaN while a NaN is inside the window; the mean / M2
+    are recomputed from the window once the last one leaves it.
+    """
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self._buf = deque(maxlen=window)
+        self._mean = 0.0
+        self._m2 = 0.0
+        self._nans = 0
+        self._count = 0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        n = len(self._buf)
+        old = self._buf[0] if n == self.window else 0.0
+        self._buf.append(x)
+        self._count += 1
+        entered, left = math.isnan(x), math.isnan(old)
+        if entered or left:
+            self._nans += entered - left
+            if not self._nans:
+                self._resync()  # The last NaN just left the window
+        elif self._nans:
+            pass  # Mean / M2 are recomputed once the window is NaN-free
+        elif n < self.window:
+            delta = x - self._mean
+            self._mean += delta / (n + 1)
+            self._m2 += delta * (x - self._mean)
+        else:
+            old_mean = self._mean
+            self._mean += (x - old) / self.window
+            self._m2 += (x - old) * (x - self._mean + old - old_mean)
+        if self._count % RESYNC_INTERVAL == 0 and not self._nans:
+            self._resync()
+        self._set_value()
+        return self._value
+
+    def prime(self, values: Iterable):
+        """Only the last `window` values matter: keep them and recompute mean / M2."""
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        self._buf.extend(arr[-self.window:].tolist())
+        self._nans = sum(math.isnan(v) for v in self._buf)
+        self._count += len(arr)
+        if not self._nans:
+            self._resync()
+        self._set_value()
+
+    def _resync(self):
+        window = np.fromiter(self._buf, dtype=float)
+        self._mean = float(window.mean()) if len(window) else 0.0
+        self._m2 = float(((window - self._mean) ** 2).sum())
+
+    def _set_value(self):
+        if len(self._buf) == self.window and not self._nans:
+            self._value = math.sqrt(max(self._m2, 0.0) / self.window)
+        else:
+            self._value = np.nan
+
+class StreamingEMA(StreamingIndicator):
+    """
+    Exponential moving average, alpha = 2 / (window + 1).
+    Seeded with the SMA of the first `window` values (pandas_ta convention).
+    NaNs are handled as v_ema: leading ones are skipped, the seed is the mean of the
+    window's non-NaN values, and the value is held over a gap, the next observation
+    weighted as ewm(adjust=False) weights it.
+    """
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self.alpha = 2.0 / (window + 1)
+        self._seed = []
+        self._gap = 0  # NaNs since the last observation
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if self._seed is not None:
+            if not self._seed and math.isnan(x):
+                return self._value  # Leading NaN
+            self._seed.append(x)
+            if len(self._seed) == self.window:
+                finite = _finite(self._seed)
+                self._value = math.fsum(finite) / len(finite)
+                self._seed = None
+            return self._value
+        if math.isnan(x):
+            self._gap += 1
+            return self._value
+        if self._gap:
+            old_wt = (1.0 - self.alpha) ** (self._gap + 1)
+            self._value = (old_wt * self._value + self.alpha * x) / (old_wt + self.alpha)
+            self._gap = 0
+        else:
+            self._value += self.alpha * (x - self._value)
+        return self._value
+
+    def prime(self, values: Iterable):
+        """Seed, then the closed form: ema_n = d^n * ema_0 + sum(alpha * d^(n-1-i) * x_i), d = 1 - alpha."""
+        arr = np.asarray(values, dtype=float).ravel()
+        if self._gap or np.isnan(arr).any():
+            return super().prime(arr)  # Gaps reweight the recursion: no closed form
+        if self._seed is not None:
+            need = self.window - len(self._seed)
+            self._seed.extend(arr[:need].tolist())
+            arr = arr[need:]
+            if len(self._seed) < self.window:
+                return
+            self._value = math.fsum(self._seed) / self.window
+            self._seed = None
+        if len(arr):
+            decay = 1.0 - self.alpha
+            weights = self.alpha * decay ** np.arange(len(arr) - 1, -1, -1)
+            self._value = decay ** len(arr) * self._value + float(weights @ arr)
+
+class StreamingRMA(StreamingIndicator):
+    """
+    Wilder's moving average: ewm(alpha=1/window, adjust=True, min_periods=window).
+    Kept as a weighted numerator/denominator pair so it equals the pandas definition exactly.
+    As _rma, a NaN only decays the pair (the value is held) and min_periods counts
+    observations.
+    """
+    def __init__(self, window: int):
+        super().__init__()
+        self.window = window
+        self._decay = 1.0 - 1.0 / window
+        self._num = 0.0
+        self._den = 0.0
+        self._count = 0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        self._num *= self._decay
+        self._den *= self._decay
+        if math.isnan(x):
+            return self._value  # Held (with window=1 the pair is now empty)
+        self._num += x
+        self._den += 1.0
+        self._count += 1
+        self._value = self._num / self._den if self._count >= self.window else np.nan
+        return self._value
+
+    def prime(self, values: Iterable):
+        """Closed form of the recursion: one dot product for the numerator, one sum for the denominator."""
+        arr = np.asarray(values, dtype=float).ravel()
+        n = len(arr)
+        if not n:
+            return
+        valid = ~np.isnan(arr)
+        powers = self._decay ** np.arange(n - 1, -1, -1)
+        self._num = float(powers @ np.where(valid, arr, 0.0)) + self._decay ** n * self._num
+        self._den = float(powers @ valid) + self._decay ** n * self._den
+        self._count += int(valid.sum())
+        if self._den > 0:
+            self._value = self._num / self._den if self._count >= self.window else np.nan
+        elif valid.any():
+            self._value = float(arr[valid][-1])  # window=1 ending on NaNs: the last value is held
+
+class StreamingRSI(StreamingIndicator):
+    """
+    Relative Strength Index.
+    method='sma':    SMA of gains/losses, matches v_rsi(method='sma').
+    method='wilder': Wilder smoothing (RMA), matches v_rsi(method='wilder') and pandas_ta.
+    """
+    def __init__(self, window: int = 14, method: str = 'sma'):
+        super().__init__()
+        if method not in ('sma', 'wilder'):
+            raise ValueError(f"Unknown RSI method: {method}")
+        self.window = window
+        self.method = method
+        self._prev = None
+        if method == 'sma':
+            self._gain, self._loss = StreamingSMA(window), StreamingSMA(window)
+        else:
+            self._gain, self._loss = StreamingRMA(window), StreamingRMA(window)
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if self._prev is None:
+            self._prev = x
+            if self.method == 'wilder':
+                return self._value  # First diff is undefined
+            delta = 0.0  # v_rsi pads the first diff with 0
+        else:
+            delta = x - self._prev
+            self._prev = x
+
+        if math.isnan(delta):  # A NaN close: no gain or loss for the averages to skip over
+            avg_gain, avg_loss = self._gain.update(delta), self._loss.update(delta)
+        else:
+            avg_gain = self._gain.update(max(delta, 0.0))
+            avg_loss = self._loss.update(-min(delta, 0.0))
+        return self._set_value(avg_gain, avg_loss)
+
+    def prime(self, values: Iterable):
+        """Price changes in one np.diff, then the gain / loss averages are primed in bulk."""
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        if self._prev is None:
+            deltas = np.diff(arr)
+            if self.method == 'sma':
+                deltas = np.concatenate(([0.0], deltas))  # v_rsi pads the first diff with 0
+        else:
+            deltas = np.diff(np.concatenate(([self._prev], arr)))
+        self._prev = float(arr[-1])
+        if len(deltas):
+            self._gain.prime(np.maximum(deltas, 0.0))
+            self._loss.prime(-np.minimum(deltas, 0.0))
+            self._set_value(self._gain.value, self._loss.value)
+
+    def _set_value(self, avg_gain: float, avg_loss: float) -> float:
+        if np.isnan(avg_gain) or np.isnan(avg_loss):
+            self._value = np.nan
+        elif avg_gain == 0:
+            self._value = 0.0
+        elif avg_loss == 0:
+            self._value = 100.0
+        else:
+            self._value = 100.0 - 100.0 / (1.0 + avg_gain / avg_loss)
+        return self._value
+
+class StreamingATR(StreamingIndicator):
+    """
+    Average True Range with Wilder smoothing (pandas_ta default).
+    update(x) takes x = (high, low, close); the first candle has no true range.
+    """
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self._rma = StreamingRMA(window)
+        self._prev_close = None
+
+    def update(self, x: Tuple[float, float, float]) -> float:
+        high, low, close = (float(v) for v in x)
+        if self._prev_close is not None:
+            ranges = (high - low, abs(high - self._prev_close), abs(low - self._prev_close))
+            tr = np.nan if any(math.isnan(r) for r in ranges) else max(ranges)  # NaN-propagating, as v_true_range
+            self._value = self._rma.update(tr)
+        self._prev_close = close
+        return self._value
+
+    def prime(self, values: Iterable):
+        """values: (high, low, close) rows. True ranges in one array operation, then the RMA in bulk."""
+        hlc = np.array(values if isinstance(values, np.ndarray) else list(values), dtype=float).reshape(-1, 3)
+        if not len(hlc):
+            return
+        high, low, close = hlc.T
+        if self._prev_close is None:
+            prev_close, high, low = close[:-1], high[1:], low[1:]  # First candle: no true range
+        else:
+            prev_close = np.concatenate(([self._prev_close], close[:-1]))
+        if len(prev_close):
+            tr = np.maximum(high - low, np.maximum(np.abs(high - prev_close), np.abs(low - prev_close)))
+            self._rma.prime(tr)
+            self._value = self._rma.value
+        self._prev_close = float(close[-1])
+
+class StreamingBollinger(StreamingIndicator):
+    """Bollinger Bands; value is (upper, middle, lower). Matches v_bollinger."""
+    def __init__(self, window: int = 20, num_std: float = 2.0):
+        super().__init__()
+        self.num_std = num_std
+        self._sma = StreamingSMA(window)
+        self._std = StreamingStdDev(window)
+        self._value = (np.nan, np.nan, np.nan)
+
+    @property
+    def ready(self) -> bool:
+        return not np.isnan(self._value[1])
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        mid = self._sma.update(x)
+        std = self._std.update(x)
+        self._value = (mid + std * self.num_std, mid, mid - std * self.num_std)
+        return self._value
+
+    def prime(self, values: Iterable):
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        self._sma.prime(arr)
+        self._std.prime(arr)
+        mid, std = self._sma.value, self._std.value
+        self._value = (mid + std * self.num_std, mid, mid - std * self.num_std)
+
+    def update_many(self, values: Iterable) -> np.ndarray:
+        return np.array([self.update(x) for x in values], dtype=float)
+
+class StreamingMACD(StreamingIndicator):
+    """
+    MACD; value is (macd, histogram, signal), the v_macd order. Matches v_macd.
+    The signal EMA starts once the slow EMA is seeded.
+    """
+    def __init__(self, fast: int = 12, slow: int = 26, signal: int = 9):
+        super().__init__()
+        self._fast = StreamingEMA(fast)
+        self._slow = StreamingEMA(slow)
+        self._signal = StreamingEMA(signal)
+        self._value = (np.nan, np.nan, np.nan)
+
+    @property
+    def ready(self) -> bool:
+        return not np.isnan(self._value[2])
+
+    def update(self, x: float) -> Tuple[float, float, float]:
+        fast = self._fast.update(x)
+        slow = self._slow.update(x)
+        macd = fast - slow
+        signal = self._signal.update(macd) if not np.isnan(macd) else np.nan
+        self._value = (macd, macd - signal, signal)
+        return self._value
+
+    def update_many(self, values: Iterable) -> np.ndarray:
+        return np.array([self.update(x) for x in values], dtype=float)
+
+class StreamingADX(StreamingIndicator):
+    """
+    Average Directional Index with Wilder smoothing; value is (adx, +DI, -DI), the v_adx order.
+    update(x) takes x = (high, low, close). Matches v_adx.
+    """
+    def __init__(self, window: int = 14):
+        super().__init__()
+        self.window = window
+        self._atr = StreamingATR(window)
+        self._plus = StreamingRMA(window)
+        self._minus = StreamingRMA(window)
+        self._adx = StreamingRMA(window)
+        self._prev = None  # (high, low)
+        self._value = (np.nan, np.nan, np.nan)
+
+    @property
+    def ready(self) -> bool:
+        return not np.isnan(self._value[0])
+
+    def update(self, x: Tuple[float, float, float]) -> Tuple[float, float, float]:
+        high, low, close = (float(v) for v in x)
+        atr = self._atr.update((high, low, close))
+        if self._prev is None:
+            self._prev = (high, low)
+            return self._value  # First bar: no directional move
+        up, down = high - self._prev[0], self._prev[1] - low
+        self._prev = (high, low)
+
+        if math.isnan(up) or math.isnan(down):
+            plus_dm = minus_dm = np.nan  # Undefined move: skipped by the smoothing, as v_adx
+        else:
+            plus_dm = up if up > down and up > 0 else 0.0
+            minus_dm = down if down > up and down > 0 else 0.0
+        plus, minus = self._plus.update(plus_dm), self._minus.update(minus_dm)
+        with np.errstate(divide='ignore', invalid='ignore'):  # Flat bars: 0 / 0 -> NaN, as v_adx
+            plus_di = float(np.float64(100 * plus) / atr)
+            minus_di = float(np.float64(100 * minus) / atr)
+            dx = float(np.float64(100 * abs(plus_di - minus_di)) / (plus_di + minus_di))
+        self._adx.update(dx)  # Undefined DX (flat bars) is skipped, as v_adx
+        self._value = (self._adx.value, plus_di, minus_di)
+        return self._value
+
+# --- ROLLING STATISTICS (anomaly detection) ---
+
+class StreamingZScore(StreamingIndicator):
+    """
+    Rolling z-score (x - SMA) / std. Matches v_zscore (0 on a flat window).
+    The window mean and std are exposed as .mean and .std.
+    """
+    def __init__(self, window: int = 20):
+        super().__init__()
+        self._sma = StreamingSMA(window)
+        self._std = StreamingStdDev(window)
+
+    @property
+    def mean(self) -> float:
+        return self._sma.value
+
+    @property
+    def std(self) -> float:
+        return self._std.value
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        mean = self._sma.update(x)
+        std = self._std.update(x)
+        if np.isnan(mean) or np.isnan(std):
+            self._value = np.nan
+        else:
+            self._value = (x - mean) / std if std > 0 else 0.0
+        return self._value
+
+    def prime(self, values: Iterable):
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        self._sma.prime(arr)
+        self._std.prime(arr)
+        mean, std = self._sma.value, self._std.value
+        if np.isnan(mean) or np.isnan(std):
+            self._value = np.nan
+        else:
+            self._value = (arr[-1] - mean) / std if std > 0 else 0.0
+
+class _StreamingExtreme(StreamingIndicator):
+    """Rolling max/min via a monotonic deque: amortized O(1) per update."""
+    def __init__(self, window: int, better):
+        super().__init__()
+        self.window = window
+        self._better = better  # better(a, b): a dominates b
+        self._deque = deque()  # (index, value), values monotonic from the front
+        self._count = 0
+        self._last_nan = -1
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        i = self._count
+        self._count += 1
+        if math.isnan(x):
+            self._last_nan = i
+        else:
+            while self._deque and not self._better(self._deque[-1][1], x):
+                self._deque.pop()
+            self._deque.append((i, x))
+        while self._deque and self._deque[0][0] <= i - self.window:
+            self._deque.popleft()
+        if self._count < self.window or self._last_nan > i - self.window:
+            self._value = np.nan  # Warming up, or a NaN inside the window (as v_rolling_max/min)
+        else:
+            self._value = self._deque[0][1]
+        return self._value
+
+class StreamingMax(_StreamingExtreme):
+    """Rolling maximum. Matches v_rolling_max."""
+    def __init__(self, window: int):
+        super().__init__(window, lambda a, b: a > b)
+
+class StreamingMin(_StreamingExtreme):
+    """Rolling minimum. Matches v_rolling_min."""
+    def __init__(self, window: int):
+        super().__init__(window, lambda a, b: a < b)
+
+class StreamingPercentRank(StreamingIndicator):
+    """
+    Rolling percentile rank of the latest value in its window. Matches v_percent_rank.
+    Keeps the window sorted (bisect), so each update is O(log window) plus a memmove.
+    """
+    def __init__(self, window: int = 100):
+        super().__init__()
+        self.window = window
+        self._buf = deque(maxlen=window)
+        self._sorted = []
+        self._nans = 0
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        if len(self._buf) == self.window:
+            old = self._buf[0]
+            if math.isnan(old):
+                self._nans -= 1
+            else:
+                del self._sorted[bisect.bisect_left(self._sorted, old)]
+        self._buf.append(x)
+        if math.isnan(x):
+            self._nans += 1
+        else:
+            bisect.insort(self._sorted, x)
+
+        if len(self._buf) < self.window or self._nans:
+            self._value = np.nan
+        else:
+            less = bisect.bisect_left(self._sorted, x)
+            equal = bisect.bisect_right(self._sorted, x) - less
+            self._value = (less + (equal + 1) / 2) / self.window
+        return self._value
+
+class StreamingROC(StreamingIndicator):
+    """Rate of change over `period` updates, as a fraction. Matches v_roc."""
+    def __init__(self, period: int = 5):
+        super().__init__()
+        self.period = period
+        self._buf = deque(maxlen=period + 1)
+
+    def update(self, x: float) -> float:
+        self._buf.append(float(x))
+        prev = self._buf[0]
+        if len(self._buf) <= self.period or prev == 0:
+            self._value = np.nan
+        else:
+            self._value = (self._buf[-1] - prev) / prev
+        return self._value
+
+    def prime(self, values: Iterable):
+        """Only the last period + 1 values matter."""
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        self._buf.extend(arr[-(self.period + 1):].tolist())
+        prev = self._buf[0]
+        if len(self._buf) <= self.period or prev == 0:
+            self._value = np.nan
+        else:
+            self._value = (self._buf[-1] - prev) / prev
+
+class StreamingVolumeSpike(StreamingIndicator):
+    """Volume / SMA(volume), the current bar included. Matches v_volume_spike."""
+    def __init__(self, window: int = 20):
+        super().__init__()
+        self._avg = StreamingSMA(window)
+
+    def update(self, x: float) -> float:
+        x = float(x)
+        avg = self._avg.update(x)
+        if np.isnan(avg):
+            self._value = np.nan
+        else:
+            self._value = x / avg if avg > 0 else 0.0
+        return self._value
+
+    def prime(self, values: Iterable):
+        arr = np.asarray(values, dtype=float).ravel()
+        if not len(arr):
+            return
+        self._avg.prime(arr)
+        avg = self._avg.value
+        if np.isnan(avg):
+            self._value = np.nan
+        else:
+            self._value = arr[-1] / avg if avg > 0 else 0.0